@@ -0,0 +1,57 @@
+"""Sequential vs. parallel comment fan-out against the in-process mock upstream.
+
+    python -m benchmarks.bench_comment_fanout --posts 80 --latency 0.05 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("RAPIDAPI_RATE_LIMIT", "0")
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+
+
+async def run(posts: int, latency: float, concurrency: int, count: int):
+    transport = httpx.ASGITransport(app=create_app(latency=latency))
+    client = httpx.AsyncClient(transport=transport, base_url="http://mock-upstream")
+    manager = AsyncLinkedInAPIManager(client=client)
+    urns = [f"urn:li:activity:{i}" for i in range(posts)]
+
+    session = manager.session("bypass")
+    started = time.perf_counter()
+    sequential = [await session.fetch_comments_by_post_urn(urn, count) for urn in urns]
+    sequential_time = time.perf_counter() - started
+    sequential_calls = session.get_credit_usage()
+
+    session = manager.session("bypass")
+    started = time.perf_counter()
+    parallel = await session.fetch_comments_by_post_urns(urns, count, concurrency)
+    parallel_time = time.perf_counter() - started
+
+    await manager.aclose()
+    assert parallel == sequential, "parallel fan-out changed the output"
+
+    print(f"posts={posts} latency={latency * 1000:.0f}ms concurrency={concurrency} count={count}")
+    print(f"sequential: {sequential_time:8.3f}s  upstream calls={sequential_calls}")
+    print(f"parallel:   {parallel_time:8.3f}s  upstream calls={session.get_credit_usage()}")
+    print(f"speedup:    {sequential_time / parallel_time:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--count", type=int, default=10, help="comments per post")
+    args = parser.parse_args()
+    asyncio.run(run(args.posts, args.latency, args.concurrency, args.count))
+
+
+if __name__ == "__main__":
+    main()
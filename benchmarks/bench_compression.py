@@ -0,0 +1,71 @@
+"""Upstream bytes for a posts walk: identity vs. gzip, then conditional revalidation.
+
+    python -m benchmarks.bench_compression --post-pages 4
+
+Bytes are read from the linkedin_upstream_response_bytes_total counter, so they
+are what the manager actually received, not the mock's own accounting.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("RAPIDAPI_RATE_LIMIT", "0")
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.cache import ResponseCache
+from src.linkedin_extractor.services.metrics import UPSTREAM_BYTES
+
+
+def upstream_bytes() -> dict[str, float]:
+    totals = {"wire": 0.0, "decoded": 0.0}
+    for _, labels, value in UPSTREAM_BYTES.samples():
+        totals[labels["stage"]] += value
+    return totals
+
+
+async def walk(manager: AsyncLinkedInAPIManager, cache_mode: str) -> tuple[dict[str, float], int]:
+    before = upstream_bytes()
+    session = manager.session(cache_mode)
+    await session.fetch_recent_posts_by_username("benchmark-user")
+    after = upstream_bytes()
+    return {stage: after[stage] - before[stage] for stage in after}, session.get_credit_usage()
+
+
+async def run(post_pages: int):
+    transport = httpx.ASGITransport(app=create_app(latency=0, post_pages=post_pages, gzip=True, etags=True))
+    client = httpx.AsyncClient(transport=transport, base_url="http://mock-upstream")
+    ttl = 0.2
+    cache = ResponseCache(64 * 1024 * 1024, None, 0, {"posts": ttl}, revalidate_window=3600)
+    manager = AsyncLinkedInAPIManager(client=client, cache=cache)
+
+    rows = []
+    settings.HTTP_COMPRESSION = False
+    rows.append(("identity", *await walk(manager, "bypass")))
+    settings.HTTP_COMPRESSION = True
+    rows.append(("gzip", *await walk(manager, "use")))
+    time.sleep(ttl)
+    rows.append(("gzip + revalidate", *await walk(manager, "use")))
+    await manager.aclose()
+
+    print(f"post_pages={post_pages}")
+    for label, sizes, calls in rows:
+        print(f"{label:18} wire={sizes['wire']:>10,.0f} B  decoded={sizes['decoded']:>10,.0f} B  upstream calls={calls}")
+    print(f"gzip saves {1 - rows[1][1]['wire'] / rows[0][1]['wire']:.1%} of wire bytes; "
+          f"{cache.stats()['revalidations']} pages revalidated with 304")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--post-pages", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.post_pages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Interactive profile lookups during a bulk run, with and without scheduler lanes.
+
+    python -m benchmarks.bench_lanes --bulk 400 --interactive 20 --rate 100
+
+A bulk lane floods the manager with profile fetches while interactive lookups
+arrive every --interval seconds. With UPSTREAM_CONCURRENCY=0 every request goes
+straight to the rate limiter and interactive ones wait behind the whole batch;
+with the scheduler only a few bulk attempts hold rate-limit tokens at a time.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("CACHE_ENABLED", "false")
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.resilience import RetryPolicy, TokenBucket, UpstreamGuard
+from src.linkedin_extractor.services.scheduler import UpstreamScheduler
+
+
+async def run_case(scheduler: UpstreamScheduler, bulk: int, interactive: int, interval: float, rate: float, latency: float):
+    transport = httpx.ASGITransport(app=create_app(latency=latency))
+    client = httpx.AsyncClient(transport=transport, base_url="http://mock-upstream")
+    guard = UpstreamGuard(TokenBucket(rate, 1), RetryPolicy(1, 0.1, 1), None)
+    manager = AsyncLinkedInAPIManager(client=client, guard=guard, scheduler=scheduler)
+
+    async def lookup(username: str, lane: str) -> float:
+        started = time.perf_counter()
+        await manager.session("bypass", lane).fetch_profile_data_by_username(username)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    bulk_task = asyncio.gather(*(lookup(f"bulk-{i}", "bulk") for i in range(bulk)))
+    latencies = []
+    for i in range(interactive):
+        await asyncio.sleep(interval)
+        latencies.append(await lookup(f"interactive-{i}", "interactive"))
+    await bulk_task
+    elapsed = time.perf_counter() - started
+    await manager.aclose()
+    return latencies, elapsed
+
+
+async def run(bulk: int, interactive: int, interval: float, rate: float, latency: float, capacity: int):
+    print(f"bulk={bulk} interactive={interactive} every {interval * 1000:.0f}ms rate={rate}/s latency={latency * 1000:.0f}ms")
+    cases = (
+        ("no lanes", UpstreamScheduler(0, {})),
+        ("lanes", UpstreamScheduler(capacity, {"interactive": 8, "bulk": 1}, reserved=max(1, capacity // 4))),
+    )
+    for label, scheduler in cases:
+        latencies, elapsed = await run_case(scheduler, bulk, interactive, interval, rate, latency)
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{label:9} interactive p50={statistics.median(latencies) * 1000:7.0f}ms  p99={p99 * 1000:7.0f}ms  "
+            f"bulk run={elapsed:6.2f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bulk", type=int, default=400)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between interactive lookups")
+    parser.add_argument("--rate", type=float, default=100, help="upstream rate limit (requests/second)")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    parser.add_argument("--capacity", type=int, default=8, help="UPSTREAM_CONCURRENCY for the lanes case")
+    args = parser.parse_args()
+    asyncio.run(run(args.bulk, args.interactive, args.interval, args.rate, args.latency, args.capacity))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cost of building upstream items as models: strict validation vs. trusted construction.
+
+    python -m benchmarks.bench_models --posts 10000 --repeat 5
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+
+from benchmarks.mock_upstream import load_fixture
+from src.linkedin_extractor.schemas.profile import PostOutput
+from src.linkedin_extractor.services import parsers
+
+
+def raw_posts(count: int) -> list[dict]:
+    fixture = load_fixture("profile_posts")["data"]
+    now = datetime.utcnow()
+    items = []
+    for index in range(count):
+        item = dict(fixture[index % len(fixture)])
+        item["postedDate"] = (now - timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S.000 +0000 UTC")
+        item["urn"] = f"bench-{index}"
+        items.append(item)
+    return items
+
+
+def time_build(items: list[dict], trusted: bool, repeat: int) -> float:
+    parsers.TRUSTED = trusted
+    cutoff = datetime.utcnow() - timedelta(days=3650)
+    best = float("inf")
+    for _ in range(repeat):
+        posts, reposts = [], []
+        started = time.perf_counter()
+        parsers.parse_posts_page(items, cutoff, posts, reposts)
+        parsers.build(PostOutput, {"posts": posts, "reposts": reposts})
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = raw_posts(args.posts)
+    strict = time_build(items, False, args.repeat)
+    trusted = time_build(items, True, args.repeat)
+
+    print(f"posts={args.posts} best of {args.repeat}")
+    print(f"strict:  {strict * 1000:8.1f}ms  ({strict / args.posts * 1e6:.2f}us/post)")
+    print(f"trusted: {trusted * 1000:8.1f}ms  ({trusted / args.posts * 1e6:.2f}us/post)")
+    print(f"speedup: {strict / trusted:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""/extract-all with comments, fan-out after pagination vs. prefetched per posts page.
+
+    python -m benchmarks.bench_prefetch --post-pages 6 --latency 0.05 --concurrency 8
+
+The gain is bounded by how long pagination and the other sections take compared
+with the comment fan-out: prefetching hides the shorter of the two.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("RAPIDAPI_RATE_LIMIT", "0")
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.extraction import extract_all_for_username
+
+
+async def run(post_pages: int, latency: float, concurrency: int, count: int):
+    transport = httpx.ASGITransport(app=create_app(latency=latency, post_pages=post_pages))
+    client = httpx.AsyncClient(transport=transport, base_url="http://mock-upstream")
+    manager = AsyncLinkedInAPIManager(client=client)
+
+    timings = {}
+    outputs = {}
+    for prefetch in (False, True):
+        settings.COMMENTS_PREFETCH = prefetch
+        session = manager.session("bypass")
+        started = time.perf_counter()
+        outputs[prefetch] = await extract_all_for_username(
+            session, "benchmark-user", extract_comments=True, count=count, comments_concurrency=concurrency
+        )
+        timings[prefetch] = (time.perf_counter() - started, session.get_credit_usage())
+
+    await manager.aclose()
+    assert outputs[True]["posts"] == outputs[False]["posts"], "prefetch changed the output"
+
+    print(f"post_pages={post_pages} latency={latency * 1000:.0f}ms concurrency={concurrency} count={count}")
+    print(f"posts={len(outputs[True]['posts'])}")
+    for prefetch, label in ((False, "after pagination"), (True, "prefetched")):
+        elapsed, calls = timings[prefetch]
+        print(f"{label:17} {elapsed:8.3f}s  upstream calls={calls}")
+    print(f"speedup:          {timings[False][0] / timings[True][0]:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--post-pages", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--count", type=int, default=10, help="comments per post")
+    args = parser.parse_args()
+    asyncio.run(run(args.post_pages, args.latency, args.concurrency, args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Keyword search over extracted posts: scanning the models in Python vs. the FTS5 index.
+
+    python -m benchmarks.bench_search --usernames 200 --posts 500
+
+The scan is what re-extracting gives you today (after paying for the extraction);
+the index answers from local data. Both must find the same items; the index is
+timed for a page of 50, as /search returns.
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+
+from src.linkedin_extractor.schemas.profile import PostData, PostOutput
+from src.linkedin_extractor.services.searchIndex import SearchIndex
+
+TOPICS = (
+    "latency cache python rust throughput hiring launch release platform pipeline "
+    "observability incident kubernetes postgres reliability"
+).split()
+FILLER = [f"word{i}" for i in range(5000)]
+QUERIES = ("python", "#kubernetes", "postgres incident", "observ*")
+
+
+def make_posts(username: str, count: int, rng: random.Random) -> PostOutput:
+    posts = []
+    for i in range(count):
+        # Each topic word shows up in about 2% of posts, one hashtag each
+        words = rng.choices(FILLER, k=40) + [topic for topic in TOPICS if rng.random() < 0.02]
+        words.append("#" + rng.choice(TOPICS))
+        posts.append(PostData(
+            postedDate=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00",
+            totalReactionCount=rng.randint(0, 500),
+            commentsCount=rng.randint(0, 50),
+            urn=f"{username}-{i}",
+            text=" ".join(words),
+        ))
+    return PostOutput(posts=posts, reposts=[])
+
+
+def scan(results: dict[str, PostOutput], query: str) -> set[str]:
+    # The Python-side equivalent of the index's query: every word, prefix for word*
+    patterns = []
+    for word in query.split():
+        for token in re.findall(r"\w+", word):
+            suffix = r"\w*" if word.endswith("*") else r"\b"
+            patterns.append(re.compile(rf"\b{re.escape(token)}{suffix}", re.IGNORECASE))
+    return {
+        post.urn
+        for output in results.values()
+        for post in output.posts
+        if all(pattern.search(post.text) for pattern in patterns)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--usernames", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=500, help="posts per username")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    results = {f"user-{i}": make_posts(f"user-{i}", args.posts, rng) for i in range(args.usernames)}
+    index = SearchIndex(os.path.join(tempfile.mkdtemp(), "search.sqlite3"))
+    started = time.perf_counter()
+    for username, output in results.items():
+        index.record(username, output)
+    print(f"indexed {args.usernames * args.posts:,} posts in {time.perf_counter() - started:.2f}s")
+
+    for query in QUERIES:
+        started = time.perf_counter()
+        scanned = scan(results, query)
+        scan_time = time.perf_counter() - started
+        found = {hit["item"]["urn"] for hit in index.search(query, limit=len(scanned) + 1)}
+        assert found == scanned, f"{query}: index and scan disagree"
+        # What /search does: the best page of results
+        started = time.perf_counter()
+        index.search(query, limit=50)
+        index_time = time.perf_counter() - started
+        print(f"{query!r:22} matches={len(found):6,}  scan={scan_time * 1000:8.1f}ms  index (top 50)={index_time * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Several worker processes extracting the same profiles, per-process vs. shared state.
+
+    python -m benchmarks.bench_shared_state --workers 4 --usernames 50 --rate 100
+
+Each process builds its own managers the way main.py does and fetches the same
+profiles. Without shared state every process pays for every profile and gets the
+full rate limit to itself; with SHARED_STATE_BACKEND=sqlite the upstream sees
+each profile about once and the combined request rate stays under --rate.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+
+
+def worker(env: dict, usernames: list[str], start_at: float, finished):
+    os.environ.update(env)
+    from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+    from src.linkedin_extractor.services.cache import build_response_cache
+    from src.linkedin_extractor.services.keyPool import build_key_pool
+    from src.linkedin_extractor.services.resilience import build_upstream_guard
+    from src.linkedin_extractor.services.sharedState import build_shared_state, shared_cache_tier
+
+    async def run():
+        state = build_shared_state()
+        key_pool = build_key_pool(state)
+        manager = AsyncLinkedInAPIManager(
+            cache=build_response_cache(shared_cache_tier(state)),
+            guard=build_upstream_guard(len(key_pool), state),
+            key_pool=key_pool,
+            state=state,
+        )
+        time.sleep(max(0.0, start_at - time.time()))
+        session = manager.session()
+        await asyncio.gather(*(session.fetch_profile_data_by_username(username) for username in usernames))
+        finished.put(time.time())
+        await manager.aclose()
+
+    asyncio.run(run())
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_case(backend: str, workers: int, usernames: list[str], rate: float, latency: float):
+    import uvicorn
+    from benchmarks.mock_upstream import create_app
+
+    port = free_port()
+    app = create_app(latency=latency)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    data_dir = tempfile.mkdtemp()
+    env = {
+        "RAPIDAPI_KEY": "benchmark",
+        "RAPIDAPI_BASE_URL": f"http://127.0.0.1:{port}",
+        "RAPIDAPI_RATE_LIMIT": str(rate),
+        "RAPIDAPI_BURST": "1",
+        "DATA_DIR": data_dir,
+        "CACHE_DB_PATH": os.path.join(data_dir, "cache.sqlite3") if backend else "",
+        "KEY_POOL_DB_PATH": "",
+        "SHARED_STATE_BACKEND": backend,
+        "LOG_LEVEL": "WARNING",
+    }
+    ctx = multiprocessing.get_context("spawn")
+    # Every process starts fetching at the same moment, after its imports
+    start_at = time.time() + 5.0
+    finished = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(env, usernames, start_at, finished)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = max(finished.get() for _ in processes) - start_at
+
+    server.should_exit = True
+    thread.join()
+    requests = sum(app.state.requests.values())
+    label = backend or "per-process"
+    print(f"{label:12} upstream requests={requests:5d}  elapsed={elapsed:6.2f}s  rate={requests / elapsed:7.1f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--usernames", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=100, help="RAPIDAPI_RATE_LIMIT (requests/second)")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock upstream latency in seconds")
+    args = parser.parse_args()
+    usernames = [f"user-{i}" for i in range(args.usernames)]
+    print(f"workers={args.workers} usernames={args.usernames} rate limit={args.rate}/s")
+    for backend in ("", "sqlite"):
+        run_case(backend, args.workers, usernames, args.rate, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Drive the extractor's FastAPI endpoints at fixed concurrency levels.
+
+By default both the extractor and the mock upstream run in-process (no sockets,
+no real credits). Pass ``--url`` to load a running deployment instead, e.g. one
+started with ``RAPIDAPI_BASE_URL`` pointing at ``python -m benchmarks.mock_upstream``.
+
+    python -m benchmarks.load --endpoint /extract-all --param extract_comments=yes \\
+        --concurrency 1,8,32 --requests 200 --usernames 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+# In-process runs measure the extractor, not our quota: no limiter, no persisted state
+# unless the caller sets these explicitly.
+os.environ.setdefault("RAPIDAPI_KEY", "benchmark")
+os.environ.setdefault("RAPIDAPI_RATE_LIMIT", "0")
+os.environ.setdefault("CACHE_ENABLED", "false")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="linkedin-extractor-bench-"))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    params: dict[str, str],
+    usernames: list[str],
+    concurrency: int,
+    requests: int
+) -> dict:
+    latencies = []
+    credits = []
+    errors = 0
+    issued = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in issued:
+            started = time.perf_counter()
+            try:
+                res = await client.get(endpoint, params={"username": usernames[i % len(usernames)], **params})
+                ok = res.status_code == 200
+                body = res.json() if ok else None
+            except httpx.HTTPError:
+                ok, body = False, None
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+            elif isinstance(body, dict) and "credits_used" in body:
+                credits.append(body["credits_used"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "credits_per_request": statistics.fmean(credits) if credits else None,
+    }
+
+
+def in_process_client(args) -> tuple[httpx.AsyncClient, object]:
+    from benchmarks.mock_upstream import create_app
+    from src.linkedin_extractor import main as extractor
+
+    upstream = create_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        post_pages=args.post_pages,
+        comment_pages=args.comment_pages,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=0,
+    )
+    extractor.api_manager.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=upstream), base_url="http://mock-upstream"
+    )
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=extractor.app), base_url="http://extractor", timeout=None
+    )
+    return client, upstream
+
+
+async def run(args):
+    params = dict(param.split("=", 1) for param in args.param)
+    usernames = [f"bench-user-{i}" for i in range(args.usernames)]
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None, limits=httpx.Limits(max_connections=None))
+        upstream = None
+    else:
+        client, upstream = in_process_client(args)
+
+    results = []
+    async with client:
+        for concurrency in args.concurrency:
+            result = await run_level(client, args.endpoint, params, usernames, concurrency, args.requests)
+            results.append(result)
+            credits = result["credits_per_request"]
+            print(
+                f"c={concurrency:<4} n={result['requests']:<6} err={result['errors']:<4} "
+                f"rps={result['throughput_rps']:8.1f}  p50={result['p50_ms']:8.1f}ms  "
+                f"p95={result['p95_ms']:8.1f}ms  p99={result['p99_ms']:8.1f}ms  "
+                f"credits/req={'n/a' if credits is None else f'{credits:.2f}'}"
+            )
+
+    if upstream is not None:
+        print("upstream requests by path:", dict(upstream.state.requests))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"endpoint": args.endpoint, "params": params, "results": results}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running extractor; default runs it in-process")
+    parser.add_argument("--endpoint", default="/extract-all")
+    parser.add_argument("--param", action="append", default=[], help="extra query parameter, key=value")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--usernames", type=int, default=50, help="distinct usernames to rotate through")
+    parser.add_argument("--json", help="write results to this file")
+    upstream = parser.add_argument_group("mock upstream (in-process mode)")
+    upstream.add_argument("--latency", type=float, default=0.05)
+    upstream.add_argument("--jitter", type=float, default=0.0)
+    upstream.add_argument("--post-pages", type=int, default=4)
+    upstream.add_argument("--comment-pages", type=int, default=3)
+    upstream.add_argument("--error-rate", type=float, default=0.0)
+    upstream.add_argument("--throttle-rate", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Local stand-in for linkedin-data-api.p.rapidapi.com.
+
+Replays the recorded payloads in ``benchmarks/fixtures`` for every endpoint the
+managers call, with configurable latency, pagination depth and injected errors.
+Run it as a server and point the extractor at it:
+
+    python -m benchmarks.mock_upstream --port 9000 --latency 0.05 --error-rate 0.01
+    RAPIDAPI_BASE_URL=http://127.0.0.1:9000 uvicorn src.linkedin_extractor.main:app
+
+or build it in-process with ``create_app()`` and an ``httpx.ASGITransport``.
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+POSTS_PAGE_SIZE = 50
+
+
+def load_fixture(name: str, fixtures_dir: str = FIXTURES_DIR) -> dict:
+    with open(os.path.join(fixtures_dir, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def create_app(
+    latency: float = 0.05,
+    jitter: float = 0.0,
+    post_pages: int = 4,
+    post_interval_hours: float = 12,
+    comment_pages: int = 3,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    fixtures_dir: str = FIXTURES_DIR,
+    seed: int | None = None,
+    gzip: bool = False,
+    etags: bool = False
+) -> FastAPI:
+    """Build the mock upstream.
+
+    ``post_pages`` and ``comment_pages`` set how many pages the paginated endpoints
+    return; ``error_rate`` and ``throttle_rate`` are the fractions of requests answered
+    with a 503 or a 429 (with ``Retry-After``) instead of data. ``gzip`` compresses
+    responses for clients that accept it; ``etags`` adds an ETag and answers a
+    matching If-None-Match with a 304.
+
+    ``app.state.published`` counts posts published since the app was built; tests
+    raise it to put that many new posts ahead of the recorded ones.
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    profile = load_fixture("profile", fixtures_dir)
+    posts = load_fixture("profile_posts", fixtures_dir)["data"]
+    profile_comments = load_fixture("profile_comments", fixtures_dir)
+    profile_likes = load_fixture("profile_likes", fixtures_dir)
+    post_comments = load_fixture("post_comments", fixtures_dir)["data"]
+    app.state.requests = Counter()
+    app.state.published = 0
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next):
+        app.state.requests[request.url.path] += 1
+        delay = latency + (rng.uniform(-jitter, jitter) if jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = rng.random()
+        if roll < throttle_rate:
+            return JSONResponse({"message": "Too many requests"}, status_code=429, headers={"Retry-After": "1"})
+        if roll < throttle_rate + error_rate:
+            return JSONResponse({"message": "Service unavailable"}, status_code=503)
+        response = await call_next(request)
+        if not etags or response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, headers={**response.headers, "ETag": etag})
+
+    if gzip:
+        app.add_middleware(GZipMiddleware, minimum_size=500)
+
+    @app.get("/")
+    async def get_profile(username: str):
+        data = copy.deepcopy(profile)
+        data["username"] = username
+        return data
+
+    @app.get("/get-profile-posts")
+    async def get_profile_posts(username: str, start: int = 0, paginationToken: str | None = None):
+        page = start // POSTS_PAGE_SIZE
+        if page >= post_pages:
+            return {"success": True, "message": "", "data": []}
+        data = []
+        for offset in range(POSTS_PAGE_SIZE):
+            # New posts take the negative indexes, newest first
+            index = start + offset - app.state.published
+            item = copy.deepcopy(posts[index % len(posts)])
+            posted_at = now - timedelta(hours=index * post_interval_hours)
+            item["postedDate"] = posted_at.strftime("%Y-%m-%d %H:%M:%S.000 +0000 UTC")
+            item["urn"] = f"{username}-{index}"
+            data.append(item)
+        next_token = f"page-{page + 1}" if page + 1 < post_pages else None
+        return {"success": True, "message": "", "data": data, "nextToken": next_token}
+
+    @app.get("/get-profile-comments")
+    async def get_profile_comments(username: str):
+        return profile_comments
+
+    @app.get("/get-profile-likes")
+    async def get_profile_likes(username: str):
+        return profile_likes
+
+    @app.get("/get-profile-posts-comments")
+    async def get_profile_posts_comments(
+        urn: str,
+        sort: str = "mostRelevant",
+        page: int = 1,
+        paginationToken: str | None = None
+    ):
+        data = []
+        for item in post_comments:
+            item = copy.deepcopy(item)
+            item["text"] = f"{item['text']} ({urn} p{page})"
+            data.append(item)
+        next_token = f"page-{page + 1}" if page < comment_pages else None
+        return {"success": True, "message": "", "data": data, "paginationToken": next_token}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the mock RapidAPI upstream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--post-pages", type=int, default=4)
+    parser.add_argument("--comment-pages", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--gzip", action="store_true", help="gzip responses when the client accepts it")
+    parser.add_argument("--etags", action="store_true", help="send ETags and answer If-None-Match with 304")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    app = create_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        post_pages=args.post_pages,
+        comment_pages=args.comment_pages,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        fixtures_dir=args.fixtures,
+        gzip=args.gzip,
+        etags=args.etags,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,5 +6,129 @@ load_dotenv()
 class Settings:
     RAPIDAPI_KEY: str = os.getenv("RAPIDAPI_KEY")
     RAPIDAPI_HOST: str = os.getenv("RAPIDAPI_HOST", "linkedin-data-api.p.rapidapi.com")
+    RAPIDAPI_BASE_URL: str = os.getenv("RAPIDAPI_BASE_URL", f"https://{RAPIDAPI_HOST}")
+
+    # Key pool: comma-separated RAPIDAPI_KEYS or a RAPIDAPI_KEYS_FILE (JSON or one key per line)
+    # take precedence over RAPIDAPI_KEY. Quota is per key per month, 0 = rely on RapidAPI's headers.
+    RAPIDAPI_KEYS: str = os.getenv("RAPIDAPI_KEYS", "")
+    RAPIDAPI_KEYS_FILE: str = os.getenv("RAPIDAPI_KEYS_FILE", "")
+    RAPIDAPI_KEY_MONTHLY_QUOTA: int = int(os.getenv("RAPIDAPI_KEY_MONTHLY_QUOTA", "0"))
+
+    # Upstream connection pool
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    # Ask upstream for compressed (gzip, deflate, br with the "compression" extra) responses
+    HTTP_COMPRESSION: bool = os.getenv("HTTP_COMPRESSION", "true").lower() == "true"
+
+    # Upstream rate limit (requests/second per key, 0 disables) shared by all sessions
+    RAPIDAPI_RATE_LIMIT: float = float(os.getenv("RAPIDAPI_RATE_LIMIT", "10"))
+    RAPIDAPI_BURST: int = int(os.getenv("RAPIDAPI_BURST", "20"))
+
+    # Upstream scheduler: at most UPSTREAM_CONCURRENCY attempts in flight per process (0 = unlimited).
+    # Freed slots go to the interactive (API routes) and bulk (batch, jobs) lanes by weight; the last
+    # UPSTREAM_INTERACTIVE_RESERVED slots are interactive only, and a lane refuses new requests once its
+    # queue limit is reached (0 = unlimited)
+    UPSTREAM_CONCURRENCY: int = int(os.getenv("UPSTREAM_CONCURRENCY", "32"))
+    UPSTREAM_INTERACTIVE_RESERVED: int = int(os.getenv("UPSTREAM_INTERACTIVE_RESERVED", "4"))
+    UPSTREAM_LANE_WEIGHTS: str = os.getenv("UPSTREAM_LANE_WEIGHTS", "interactive=8,bulk=1")
+    UPSTREAM_LANE_QUEUE_LIMITS: str = os.getenv("UPSTREAM_LANE_QUEUE_LIMITS", "interactive=256,bulk=0")
+
+    # Retries on 429/5xx/network errors with jittered exponential backoff
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+    RETRY_BASE_DELAY: float = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+    RETRY_MAX_DELAY: float = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+    # Circuit breaker: open after N consecutive upstream failures (0 disables)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "10"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+    # JSON backend for upstream decoding and responses: auto (orjson if installed) or json
+    JSON_BACKEND: str = os.getenv("JSON_BACKEND", "auto")
+
+    # Upstream items are fully validated ("strict") or built with model_construct ("trusted");
+    # on pydantic 2 model_construct is slower than validating these flat models, so strict is
+    # the default. DEBUG forces strict
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    SCHEMA_VALIDATION: str = "strict" if DEBUG else os.getenv("SCHEMA_VALIDATION", "strict")
+    # Fraction of trusted items still validated, so upstream schema drift shows up in logs and metrics
+    SCHEMA_VALIDATION_SAMPLE_RATE: float = float(os.getenv("SCHEMA_VALIDATION_SAMPLE_RATE", "0.01"))
+
+    # Structured logs; hot-path debug events are sampled at LOG_SAMPLE_RATE
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+    # Local state (caches, stores) lives under DATA_DIR
+    DATA_DIR: str = os.getenv("DATA_DIR", ".data")
+
+    # Default post window when a request gives no `since`
+    POSTS_WINDOW_DAYS: int = int(os.getenv("POSTS_WINDOW_DAYS", "365"))
+
+    # Max concurrent comment-thread fetches per /extract-all request
+    COMMENTS_FANOUT_CONCURRENCY: int = int(os.getenv("COMMENTS_FANOUT_CONCURRENCY", "8"))
+    # Start a post's comment fetch as soon as its posts page is parsed instead of after pagination
+    COMMENTS_PREFETCH: bool = os.getenv("COMMENTS_PREFETCH", "true").lower() == "true"
+
+    # /extract-all and /extract-all-threading deadlines in seconds (0 = none): per section and for
+    # the whole response; EXTRACT_SECTION_TIMEOUTS overrides single sections, e.g. "post_comments=40"
+    # (commented_posts and reacted_posts apply to the threading route's comments and likes too)
+    EXTRACT_SECTION_TIMEOUT: float = float(os.getenv("EXTRACT_SECTION_TIMEOUT", "0"))
+    EXTRACT_SECTION_TIMEOUTS: str = os.getenv("EXTRACT_SECTION_TIMEOUTS", "")
+    EXTRACT_TIMEOUT: float = float(os.getenv("EXTRACT_TIMEOUT", "0"))
+
+    # Usernames extracted in parallel by /extract-batch
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
+    # Share one execution between identical concurrent upstream paths / fetch_* calls
+    SINGLEFLIGHT_ENABLED: bool = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+
+    # Known posts per username for incremental syncs
+    POST_STORE_ENABLED: bool = os.getenv("POST_STORE_ENABLED", "true").lower() == "true"
+    POST_STORE_PATH: str = os.getenv("POST_STORE_PATH", os.path.join(DATA_DIR, "posts.sqlite3"))
+
+    # Credits used per key and quota period, kept across restarts
+    KEY_POOL_DB_PATH: str = os.getenv("KEY_POOL_DB_PATH", os.path.join(DATA_DIR, "keys.sqlite3"))
+    # How often a worker re-reads key usage written by other workers
+    KEY_POOL_SYNC_INTERVAL: float = float(os.getenv("KEY_POOL_SYNC_INTERVAL", "1"))
+
+    # State shared by all worker processes (rate limit, key credits, response cache, in-flight
+    # upstream paths): "sqlite" for one host, "redis" (SHARED_STATE_URL, "local" is an in-process
+    # stand-in) for several; empty keeps it per process
+    SHARED_STATE_BACKEND: str = os.getenv("SHARED_STATE_BACKEND", "")
+    SHARED_STATE_PATH: str = os.getenv("SHARED_STATE_PATH", os.path.join(DATA_DIR, "shared_state.sqlite3"))
+    SHARED_STATE_URL: str = os.getenv("SHARED_STATE_URL", "redis://localhost:6379/0")
+    # Seconds a worker's claim on an upstream path holds off the others
+    SHARED_FLIGHT_LEASE: float = float(os.getenv("SHARED_FLIGHT_LEASE", "30"))
+
+    # Append-only history of extracted results, exported via /export or `python -m src.linkedin_extractor.export`
+    SNAPSHOTS_ENABLED: bool = os.getenv("SNAPSHOTS_ENABLED", "true").lower() == "true"
+    SNAPSHOT_DB_PATH: str = os.getenv("SNAPSHOT_DB_PATH", os.path.join(DATA_DIR, "snapshots.sqlite3"))
+
+    # Full-text index (SQLite FTS5) of extracted posts, comments and likes, queried by /search
+    SEARCH_INDEX_ENABLED: bool = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+    SEARCH_INDEX_PATH: str = os.getenv("SEARCH_INDEX_PATH", os.path.join(DATA_DIR, "search.sqlite3"))
+
+    # Background jobs (SQLite queue); JOB_WORKERS=0 leaves them to `python -m src.linkedin_extractor.worker`
+    JOBS_ENABLED: bool = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETENTION_DAYS: float = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+    # Upstream response cache; TTLs are seconds per endpoint type
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MEMORY_MAX_BYTES: int = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_DB_PATH: str = os.getenv("CACHE_DB_PATH", os.path.join(DATA_DIR, "response_cache.sqlite3"))
+    CACHE_DISK_MAX_BYTES: int = int(os.getenv("CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+    CACHE_TTL_PROFILE: float = float(os.getenv("CACHE_TTL_PROFILE", "86400"))
+    CACHE_TTL_POSTS: float = float(os.getenv("CACHE_TTL_POSTS", "3600"))
+    CACHE_TTL_COMMENTS: float = float(os.getenv("CACHE_TTL_COMMENTS", "3600"))
+    CACHE_TTL_LIKES: float = float(os.getenv("CACHE_TTL_LIKES", "900"))
+    CACHE_TTL_POST_COMMENTS: float = float(os.getenv("CACHE_TTL_POST_COMMENTS", "1800"))
+    # Expired entries with an ETag/Last-Modified are kept this long and revalidated with a conditional request
+    CACHE_REVALIDATE_WINDOW: float = float(os.getenv("CACHE_REVALIDATE_WINDOW", str(7 * 86400)))
 
 settings = Settings()
@@ -0,0 +1,50 @@
+"""Export stored snapshots without going through the API.
+
+    python -m src.linkedin_extractor.export posts -o posts.parquet
+    python -m src.linkedin_extractor.export likes --format ndjson --username some-user -o likes.ndjson.gz
+
+Parquet and Arrow need pyarrow (pip install "linkedin-extractor[export]"); the
+default picks Parquet when it is installed and gzipped NDJSON otherwise.
+"""
+import argparse
+import sys
+from datetime import datetime
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.snapshotStore import (
+    EXPORT_FORMATS,
+    EXPORT_KINDS,
+    EXPORT_MEDIA_TYPES,
+    SnapshotStore,
+    export_chunks,
+    resolve_export_format
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(EXPORT_KINDS))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="auto")
+    parser.add_argument("--username")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="oldest snapshot time, ISO 8601")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="newest snapshot time, ISO 8601")
+    parser.add_argument("--db", default=settings.SNAPSHOT_DB_PATH)
+    parser.add_argument("-o", "--output", help="output file (default: <kind>.<ext>)")
+    args = parser.parse_args()
+
+    try:
+        fmt = resolve_export_format(args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    output = args.output or f"{args.kind}.{EXPORT_MEDIA_TYPES[fmt][1]}"
+
+    store = SnapshotStore(args.db)
+    written = 0
+    with open(output, "wb") as f:
+        for chunk in export_chunks(store.iter_rows(args.kind, args.username, args.since, args.until), args.kind, fmt):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"wrote {written} bytes to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,131 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from fastapi import FastAPI, Query
+import math
+from datetime import datetime
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from src.linkedin_extractor.schemas.profile import BatchExtractInput, ExtractAllJobInput, PostCommentsBatchInput
+from src.linkedin_extractor.services.aggregation import (
+    DeadlineExceededError,
+    gather_sections_threaded,
+    overall_timeout,
+    section_timeouts
+)
 from src.linkedin_extractor.services.apiManager import LinkedInAPIManager
-from typing import Any
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.cache import build_response_cache
+from src.linkedin_extractor.services.keyPool import KeyPoolExhaustedError, build_key_pool
+from src.linkedin_extractor.services.postStore import build_post_store
+from src.linkedin_extractor.services.resilience import (
+    CircuitOpenError,
+    UpstreamHTTPError,
+    UpstreamUnavailableError,
+    build_upstream_guard
+)
+from src.linkedin_extractor.services.scheduler import UpstreamBusyError, build_upstream_scheduler
+from src.linkedin_extractor.services.searchIndex import SEARCH_KINDS, SEARCH_SORTS, build_search_index
+from src.linkedin_extractor.services.sharedState import build_shared_state, shared_cache_tier
+from src.linkedin_extractor.services.snapshotStore import (
+    EXPORT_MEDIA_TYPES,
+    build_snapshot_store,
+    export_chunks,
+    resolve_export_format
+)
+from src.linkedin_extractor.services.extractionPlan import ExtractionPlan
+from src.linkedin_extractor.services.extraction import (
+    extract_all_for_username,
+    extract_all_job_runner,
+    iter_batch_extractions
+)
+from src.linkedin_extractor.services.jobQueue import build_job_store, build_job_worker_pool
+from src.linkedin_extractor.services.jsonCodec import FastJSONResponse, dumps
+from src.linkedin_extractor.services.logs import configure_logging
+from src.linkedin_extractor.services.metrics import (
+    REGISTRY,
+    MetricsMiddleware,
+    register_cache,
+    register_job_store,
+    register_key_pool,
+    register_scheduler,
+    register_singleflight
+)
+from typing import Literal
+
+# Each uvicorn/gunicorn worker builds its own managers; shared_state is what they have in common
+shared_state = build_shared_state()
+response_cache = build_response_cache(shared_cache_tier(shared_state))
+key_pool = build_key_pool(shared_state)
+upstream_guard = build_upstream_guard(len(key_pool), shared_state)
+upstream_scheduler = build_upstream_scheduler()
+post_store = build_post_store()
+snapshot_store = build_snapshot_store()
+search_index = build_search_index()
+api_manager = AsyncLinkedInAPIManager(
+    cache=response_cache,
+    guard=upstream_guard,
+    post_store=post_store,
+    key_pool=key_pool,
+    snapshot_store=snapshot_store,
+    state=shared_state,
+    scheduler=upstream_scheduler,
+    search_index=search_index,
+)
+threaded_api_manager = LinkedInAPIManager(
+    cache=response_cache,
+    guard=upstream_guard,
+    post_store=post_store,
+    key_pool=key_pool,
+    snapshot_store=snapshot_store,
+    state=shared_state,
+    scheduler=upstream_scheduler,
+    search_index=search_index,
+)
+job_store = build_job_store()
+job_workers = build_job_worker_pool(job_store, {"extract_all": extract_all_job_runner(api_manager)}) if job_store else None
+
+configure_logging()
+if response_cache is not None:
+    register_cache(REGISTRY, response_cache)
+register_singleflight(REGISTRY, {"async": api_manager.singleflight, "threaded": threaded_api_manager.singleflight})
+register_key_pool(REGISTRY, key_pool)
+register_scheduler(REGISTRY, upstream_scheduler)
+if job_store is not None:
+    register_job_store(REGISTRY, job_store)
+
+INCREMENTAL_QUERY = Query(False, description="Only fetch posts newer than the last stored sync")
+SINCE_QUERY = Query(None, description="Oldest post date to include (default: 12 months ago)")
+UNTIL_QUERY = Query(None, description="Newest post date to include")
+MAX_POSTS_QUERY = Query(None, ge=1, description="Stop after this many posts and reposts")
+
+SECTION_TIMEOUT_QUERY = Query(None, ge=0, description="Seconds each section may take (default EXTRACT_SECTION_TIMEOUT, 0 = no limit)")
+TIMEOUT_QUERY = Query(None, ge=0, description="Seconds the whole response may take (default EXTRACT_TIMEOUT, 0 = no limit)")
+SECTIONS_QUERY = Query(None, description="Comma-separated sections to fetch (default: all); the rest are never requested upstream")
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, as section.field or field, e.g. posts.urn,posts.postedDate,headline")
+EXTRACT_ALL_SECTIONS = ("profile", "posts", "commented_posts", "reacted_posts", "post_comments")
+
+CacheMode = Literal["use", "bypass", "refresh"]
+CACHE_QUERY = Query("use", description="use, bypass (skip the cache) or refresh (refetch and store)")
+
+
+def extraction_plan(sections: str | None, fields: str | None) -> ExtractionPlan:
+    try:
+        return ExtractionPlan.parse(sections, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-app = FastAPI()
-api_manager = LinkedInAPIManager()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if job_workers is not None:
+        job_workers.start()
+    yield
+    if job_workers is not None:
+        await job_workers.stop()
+    await api_manager.aclose()
+    threaded_api_manager.pool.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,88 +134,306 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(UpstreamHTTPError)
+async def upstream_http_error(request, exc: UpstreamHTTPError):
+    # An upstream 404 (unknown profile or post) passes through; other statuses are a bad gateway
+    return FastJSONResponse(
+        {"detail": str(exc), "upstream_status": exc.status}, status_code=404 if exc.status == 404 else 502
+    )
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable(request, exc: UpstreamUnavailableError):
+    # Retries used up on errors, 5xx or 429s
+    return FastJSONResponse({"detail": str(exc), "upstream_status": exc.status}, status_code=502)
+
+@app.exception_handler(CircuitOpenError)
+async def upstream_circuit_open(request, exc: CircuitOpenError):
+    return FastJSONResponse(
+        {"detail": str(exc)}, status_code=503, headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+@app.exception_handler(KeyPoolExhaustedError)
+async def key_pool_exhausted(request, exc: KeyPoolExhaustedError):
+    headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after)))} if exc.retry_after is not None else None
+    return FastJSONResponse({"detail": str(exc)}, status_code=503, headers=headers)
+
+@app.exception_handler(UpstreamBusyError)
+async def upstream_busy(request, exc: UpstreamBusyError):
+    return FastJSONResponse({"detail": str(exc), "lane": exc.lane}, status_code=503, headers={"Retry-After": "1"})
 
 @app.get("/")
-def home():
+async def home():
     return {"message": "LinkedIn Extractor API is live!"}
 
+@app.get("/cache-stats")
+async def cache_stats():
+    return response_cache.stats() if response_cache else {"enabled": False}
+
+@app.get("/key-stats")
+async def key_stats():
+    return key_pool.stats()
+
+@app.get("/coalescing-stats")
+async def coalescing_stats():
+    return {
+        "async": api_manager.singleflight.stats() if api_manager.singleflight else None,
+        "threaded": threaded_api_manager.singleflight.stats() if threaded_api_manager.singleflight else None,
+    }
+
+@app.get("/scheduler-stats")
+async def scheduler_stats():
+    return upstream_scheduler.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/extract-profile")
-def extract(username: str):
-    result = api_manager.fetch_profile_data_by_username(username)
-    return result
+async def extract(username: str, cache: CacheMode = CACHE_QUERY):
+    result = await api_manager.session(cache).fetch_profile_data_by_username(username)
+    return FastJSONResponse(result)
 
 @app.get("/extract-posts")
-def extract_posts(username: str = Query(..., description="LinkedIn username")):
-    posts = api_manager.fetch_recent_posts_by_username(username)
-    return posts
+async def extract_posts(
+    username: str = Query(..., description="LinkedIn username"),
+    incremental: bool = INCREMENTAL_QUERY,
+    since: datetime | None = SINCE_QUERY,
+    until: datetime | None = UNTIL_QUERY,
+    max_posts: int | None = MAX_POSTS_QUERY,
+    cache: CacheMode = CACHE_QUERY
+):
+    session = api_manager.session(cache)
+    posts = await session.fetch_recent_posts_by_username(username, incremental, since, until, max_posts)
+    return FastJSONResponse({
+        "posts": posts.posts,
+        "reposts": posts.reposts,
+        "pages_fetched": posts.pages_fetched,
+        "credits_used": session.get_credit_usage()
+    })
+
+@app.get("/extract-posts-stream")
+async def extract_posts_stream(
+    username: str = Query(..., description="LinkedIn username"),
+    since: datetime | None = SINCE_QUERY,
+    max_posts: int | None = MAX_POSTS_QUERY,
+    reposts: Literal["include", "exclude", "only"] = Query("include"),
+    cache: CacheMode = CACHE_QUERY
+):
+    posts = api_manager.session(cache).iter_posts_by_username(username, since, max_posts, reposts)
+    # Pull the first page before answering, so upstream errors still get their status code
+    first = await anext(posts, None)
+
+    async def ndjson():
+        if first is None:
+            return
+        yield first.model_dump_json() + "\n"
+        async for post in posts:
+            yield post.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @app.get("/extract-comments")
-def extract_comments(username: str = Query(..., description="LinkedIn username")):
-    comments = api_manager.fetch_profile_comments_by_username(username)
-    return comments
+async def extract_comments(username: str = Query(..., description="LinkedIn username"), cache: CacheMode = CACHE_QUERY):
+    comments = await api_manager.session(cache).fetch_profile_comments_by_username(username)
+    return FastJSONResponse(comments)
 
 @app.get("/extract-likes")
-def extract_likes(username: str = Query(..., description="LinkedIn username")):
-    likes = api_manager.fetch_profile_likes_by_username(username)
-    return likes
+async def extract_likes(username: str = Query(..., description="LinkedIn username"), cache: CacheMode = CACHE_QUERY):
+    likes = await api_manager.session(cache).fetch_profile_likes_by_username(username)
+    return FastJSONResponse(likes)
 
 @app.get("/extract-post-comments")
-def extract_post_comments(urn: str = Query(...), count: int = Query(10)):
-    comments = api_manager.fetch_comments_by_post_urn(urn, count)
-    return comments
+async def extract_post_comments(urn: str = Query(...), count: int = Query(10), cache: CacheMode = CACHE_QUERY):
+    comments = await api_manager.session(cache).fetch_comments_by_post_urn(urn, count)
+    return FastJSONResponse(comments)
+
+@app.post("/extract-post-comments-batch")
+async def extract_post_comments_batch(request: PostCommentsBatchInput, cache: CacheMode = CACHE_QUERY):
+    # Many threads per call: fetched in the bulk lane like /extract-batch
+    session = api_manager.session(cache, lane="bulk")
+    result = await session.fetch_comment_records_by_post_urns(request.urns, request.count, request.concurrency)
+    return FastJSONResponse({**result, "credits_used": session.get_credit_usage()})
     
 @app.get("/extract-all")
-def extract_all(
+async def extract_all(
     username: str = Query(..., description="LinkedIn username"),
     extract_comments: str = Query("no", description="yes or no"),
-    count: int = Query(10, description="Number of comments per post if extract_comments is yes")
-) -> dict[str, Any]:
-    api_manager.api_calls = 0
-    profile = api_manager.fetch_profile_data_by_username(username)
-    print(profile)
-    posts_result =  api_manager.fetch_recent_posts_by_username(username)
-    comments =  api_manager.fetch_profile_comments_by_username(username)
-    likes =  api_manager.fetch_profile_likes_by_username(username)
-
-    posts = posts_result.posts
-    reposts = posts_result.reposts
-
-    posts_output = []
-
-    if extract_comments.lower() == "yes":
-        for post in posts:
-            post_dict = post.dict()
-            post_dict["comments"] =  api_manager.fetch_comments_by_post_urn(post.urn, count)
-            posts_output.append(post_dict)
-    else:
-        posts_output = [post.dict() for post in posts]
-        
+    count: int = Query(10, description="Number of comments per post if extract_comments is yes"),
+    comments_concurrency: int | None = Query(None, ge=1, le=64, description="Parallel comment-thread fetches"),
+    incremental: bool = INCREMENTAL_QUERY,
+    since: datetime | None = SINCE_QUERY,
+    until: datetime | None = UNTIL_QUERY,
+    max_posts: int | None = MAX_POSTS_QUERY,
+    cache: CacheMode = CACHE_QUERY,
+    section_timeout: float | None = SECTION_TIMEOUT_QUERY,
+    timeout: float | None = TIMEOUT_QUERY,
+    sections: str | None = SECTIONS_QUERY,
+    fields: str | None = FIELDS_QUERY
+) -> FastJSONResponse:
+    plan = extraction_plan(sections, fields)
+    session = api_manager.session(cache)
+    try:
+        result = await extract_all_for_username(
+            session,
+            username,
+            extract_comments.lower() == "yes",
+            count,
+            comments_concurrency,
+            incremental,
+            since,
+            until,
+            max_posts,
+            section_timeouts=section_timeouts(EXTRACT_ALL_SECTIONS, section_timeout),
+            timeout=overall_timeout(timeout),
+            plan=plan,
+        )
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    return FastJSONResponse(result)
 
-    return {
-        "profile": profile.dict(),
-        "posts": posts_output,
-        "reposts": reposts,
-        "commented_posts": comments,
-        "reacted_posts": likes,
-        "credits_used": api_manager.get_credit_usage()
-    }
-    
+@app.post("/extract-batch")
+async def extract_batch(request: BatchExtractInput, cache: CacheMode = CACHE_QUERY):
+    plan = extraction_plan(request.sections, request.fields)
+
+    async def ndjson():
+        records = iter_batch_extractions(
+            api_manager,
+            request.usernames,
+            request.concurrency,
+            cache,
+            extract_comments=request.extract_comments,
+            count=request.count,
+            incremental=request.incremental,
+            since=request.since,
+            until=request.until,
+            max_posts=request.max_posts,
+            plan=plan,
+        )
+        async for record in records:
+            yield dumps(record) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.get("/export/{kind}")
+async def export_snapshots(
+    kind: Literal["profiles", "posts", "comments", "likes"],
+    format: Literal["auto", "parquet", "arrow", "ndjson"] = Query("auto", description="auto: parquet if pyarrow is installed, else gzipped NDJSON"),
+    username: str | None = Query(None),
+    since: datetime | None = Query(None, description="Oldest snapshot time to include"),
+    until: datetime | None = Query(None, description="Newest snapshot time to include")
+):
+    if snapshot_store is None:
+        raise HTTPException(status_code=404, detail="Snapshots are disabled (SNAPSHOTS_ENABLED=false)")
+    try:
+        fmt = resolve_export_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    media_type, extension = EXPORT_MEDIA_TYPES[fmt]
+    chunks = export_chunks(snapshot_store.iter_rows(kind, username, since, until), kind, fmt)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{extension}"'},
+    )
+
+@app.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description="Words to find (all must match); word* matches a prefix"),
+    username: str | None = Query(None),
+    type: list[Literal[SEARCH_KINDS]] | None = Query(None, description="Content types to include (default: all)"),
+    since: datetime | None = Query(None, description="Oldest post, comment or like date to include"),
+    until: datetime | None = Query(None, description="Newest post, comment or like date to include"),
+    sort: Literal[SEARCH_SORTS] = Query("relevance"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    # Local data only: no upstream requests, no credits
+    if search_index is None:
+        raise HTTPException(status_code=404, detail="Search is disabled (SEARCH_INDEX_ENABLED=false)")
+    results = search_index.search(q, username, type, since, until, sort, limit, offset)
+    return FastJSONResponse({"query": q, "count": len(results), "results": results})
+
+@app.get("/search-stats")
+async def search_stats():
+    return search_index.stats() if search_index else {"enabled": False}
+
+def require_job_store():
+    if job_store is None:
+        raise HTTPException(status_code=404, detail="Background jobs are disabled (JOBS_ENABLED=false)")
+    return job_store
+
+@app.post("/jobs/extract-all", status_code=202)
+async def submit_extract_all_job(request: ExtractAllJobInput):
+    store = require_job_store()
+    extraction_plan(request.sections, request.fields)
+    job_id, deduplicated = store.submit("extract_all", request.model_dump(mode="json"))
+    job_workers.notify()
+    return FastJSONResponse({"job_id": job_id, "deduplicated": deduplicated, **store.status(job_id)}, status_code=202)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    status = require_job_store().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return FastJSONResponse(status)
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    store = require_job_store()
+    status = store.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if status["status"] == "failed":
+        return FastJSONResponse(status, status_code=409)
+    if status["status"] != "done":
+        # Not finished yet: poll again; progress shows how far it got
+        return FastJSONResponse(status, status_code=202)
+    return Response(store.result(job_id), media_type="application/json")
+
+# Kept on the blocking manager: runs in FastAPI's threadpool and fans out over its own threads.
 @app.get("/extract-all-threading")
-def extract_all(username: str = Query(..., description="LinkedIn username")):
-    result = {}
-    with ThreadPoolExecutor() as executor:
-        futures = {
-            "profile": executor.submit(api_manager.fetch_profile_data_by_username, username),
-            "posts": executor.submit(api_manager.fetch_recent_posts_by_username, username),
-            "comments": executor.submit(api_manager.fetch_profile_comments_by_username, username),
-            "likes": executor.submit(api_manager.fetch_profile_likes_by_username, username)
-        }
-
-        for key, future in futures.items():
-            try:
-                result[key] = future.result()
-            except Exception as e:
-                result[key] = {"error": str(e)}
-
-    return result
+def extract_all(
+    username: str = Query(..., description="LinkedIn username"),
+    cache: CacheMode = CACHE_QUERY,
+    section_timeout: float | None = SECTION_TIMEOUT_QUERY,
+    timeout: float | None = TIMEOUT_QUERY,
+    sections: str | None = SECTIONS_QUERY,
+    fields: str | None = FIELDS_QUERY
+):
+    plan = extraction_plan(sections, fields)
+    fetchers = {
+        "profile": LinkedInAPIManager.fetch_profile_data_by_username,
+        "posts": LinkedInAPIManager.fetch_recent_posts_by_username,
+        "comments": LinkedInAPIManager.fetch_profile_comments_by_username,
+        "likes": LinkedInAPIManager.fetch_profile_likes_by_username
+    }
+    fetchers = {name: fetch for name, fetch in fetchers.items() if plan.wants(name)}
+    # One session per section so an abandoned section stops at its own deadline
+    sessions = {name: threaded_api_manager.session(cache) for name in fetchers}
+
+    def section(name):
+        def run(deadline):
+            sessions[name].deadline = deadline
+            return fetchers[name](sessions[name], username)
+        return run
 
+    aggregate = gather_sections_threaded(
+        {name: section(name) for name in fetchers},
+        section_timeouts(fetchers, section_timeout),
+        overall_timeout(timeout),
+    )
+    try:
+        aggregate.raise_if_empty()
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    result = {}
+    for name in fetchers:
+        if aggregate.complete(name):
+            result[name] = plan.project(name, aggregate.values[name])
+        else:
+            result[name] = {"error": aggregate.report[name].get("error")}
+    result["sections"] = aggregate.report
+    result["credits_used"] = sum(session.get_credit_usage() for session in sessions.values())
+    return FastJSONResponse(result)
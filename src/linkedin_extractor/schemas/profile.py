@@ -26,8 +26,9 @@
 #     posts: List[Post]
 #     reposts: List[Post]
 
+from datetime import datetime
 from pydantic import BaseModel, Field, RootModel
-from typing import Optional, List, TypedDict
+from typing import Literal, Optional, List, TypedDict
 
 
 # Input Schemas
@@ -35,6 +36,39 @@ class UsernameInput(BaseModel):
     username: str
 
 
+class BatchExtractInput(BaseModel):
+    usernames: List[str] = Field(..., min_length=1)
+    extract_comments: bool = False
+    count: int = Field(10, ge=1, description="Number of comments per post if extract_comments is set")
+    concurrency: Optional[int] = Field(None, ge=1, le=256, description="Usernames extracted in parallel")
+    incremental: bool = Field(False, description="Only fetch posts newer than the last stored sync")
+    since: Optional[datetime] = Field(None, description="Oldest post date to include (default: 12 months ago)")
+    until: Optional[datetime] = Field(None, description="Newest post date to include")
+    max_posts: Optional[int] = Field(None, ge=1, description="Stop after this many posts and reposts")
+    sections: Optional[str] = Field(None, description="Comma-separated sections to fetch (default: all)")
+    fields: Optional[str] = Field(None, description="Comma-separated fields to return, e.g. posts.urn,headline")
+
+
+class PostCommentsBatchInput(BaseModel):
+    urns: List[str] = Field(..., min_length=1)
+    count: int = Field(10, ge=1, description="Number of comments per post")
+    concurrency: Optional[int] = Field(None, ge=1, le=64, description="Parallel comment-thread fetches")
+
+
+class ExtractAllJobInput(BaseModel):
+    username: str
+    extract_comments: bool = False
+    count: int = Field(10, ge=1, description="Number of comments per post if extract_comments is set")
+    comments_concurrency: Optional[int] = Field(None, ge=1, le=64, description="Parallel comment-thread fetches")
+    incremental: bool = Field(False, description="Only fetch posts newer than the last stored sync")
+    since: Optional[datetime] = Field(None, description="Oldest post date to include (default: 12 months ago)")
+    until: Optional[datetime] = Field(None, description="Newest post date to include")
+    max_posts: Optional[int] = Field(None, ge=1, description="Stop after this many posts and reposts")
+    sections: Optional[str] = Field(None, description="Comma-separated sections to fetch (default: all)")
+    fields: Optional[str] = Field(None, description="Comma-separated fields to return, e.g. posts.urn,headline")
+    cache: Literal["use", "bypass", "refresh"] = "use"
+
+
 # Output Schemas
 
 class ProfileOutput(BaseModel):
@@ -56,6 +90,7 @@ class PostData(BaseModel):
 class PostOutput(BaseModel):
     posts: List[PostData]
     reposts: List[PostData]
+    pages_fetched: int = 0
 
 
 class CommentData(BaseModel):
@@ -79,4 +114,16 @@ class LikeData(BaseModel):
 
 
 class LikesOutput(RootModel[List[LikeData]]):
-    pass
\ No newline at end of file
+    pass
+
+
+class PostCommentData(BaseModel):
+    text: Optional[str]
+    authorName: Optional[str]
+    authorUsername: Optional[str]
+    authorTitle: Optional[str]
+    authorUrl: Optional[str]
+    commentedDate: Optional[str]
+    totalReactionCount: Optional[int]
+    permalink: Optional[str]
+
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.extractionPlan import section_name
+from src.linkedin_extractor.services.logs import log_event
+from src.linkedin_extractor.services.metrics import SECTION_OUTCOMES
+
+SECTION_STATUSES = ("complete", "timed_out", "failed", "skipped")
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+def section_timeouts(sections, section_timeout: float | None = None) -> dict[str, float | None]:
+    """Per-section timeouts: ``section_timeout`` (or EXTRACT_SECTION_TIMEOUT) unless
+    EXTRACT_SECTION_TIMEOUTS names the section (by either of its names, see
+    SECTION_ALIASES); 0 means no limit."""
+    default = settings.EXTRACT_SECTION_TIMEOUT if section_timeout is None else section_timeout
+    overrides = {}
+    for entry in settings.EXTRACT_SECTION_TIMEOUTS.split(","):
+        name, _, seconds = entry.partition("=")
+        if name.strip() and seconds.strip():
+            overrides[section_name(name.strip())] = float(seconds)
+    return {name: overrides.get(section_name(name), default) or None for name in sections}
+
+
+def overall_timeout(timeout: float | None = None) -> float | None:
+    return (settings.EXTRACT_TIMEOUT if timeout is None else timeout) or None
+
+
+def _deadline(*deadlines: float | None) -> float | None:
+    deadlines = [d for d in deadlines if d is not None]
+    return min(deadlines) if deadlines else None
+
+
+class Aggregate:
+    """Outcome of a set of sections: values of the ones that completed and a
+    report entry (status, elapsed time, error) for every section."""
+
+    def __init__(self):
+        self.values: dict[str, Any] = {}
+        self.report: dict[str, dict] = {}
+        self.errors: dict[str, BaseException] = {}
+
+    def complete(self, name: str) -> bool:
+        return name in self.values
+
+    def finish(self, name: str, status: str, started: float, value=None, error: BaseException | None = None):
+        if status not in SECTION_STATUSES:
+            raise ValueError(f"Unknown section status: {status}")
+        entry = {"status": status, "elapsed_ms": round((time.monotonic() - started) * 1000)}
+        if status == "complete":
+            self.values[name] = value
+        elif error is not None:
+            self.errors[name] = error
+            entry["error"] = str(error) or type(error).__name__
+        self.report[name] = entry
+        SECTION_OUTCOMES.inc(section=section_name(name), status=status)
+        if status != "complete":
+            log_event("section_incomplete", logging.WARNING, section=name, **entry)
+
+    def order(self, names):
+        self.report = {name: self.report[name] for name in names if name in self.report}
+
+    def raise_if_empty(self):
+        """Nothing completed: surface the first failure, or a timeout, instead of an empty result."""
+        if self.values:
+            return
+        for error in self.errors.values():
+            if not isinstance(error, TimeoutError):
+                raise error
+        raise DeadlineExceededError("No section finished before its deadline")
+
+
+async def gather_sections(
+    sections: dict[str, Callable[..., Awaitable[Any]]],
+    timeouts: dict[str, float | None],
+    timeout: float | None = None,
+    depends_on: dict[str, str] | None = None,
+    on_complete: Callable[[str, Any], None] | None = None
+) -> Aggregate:
+    """Run ``sections`` concurrently, each within its own timeout and all within ``timeout``.
+
+    A section listed in ``depends_on`` starts once the section it names completes
+    and is called with that section's value; it is skipped if that section does
+    not complete. Sections still running at their deadline are cancelled.
+    """
+    depends_on = depends_on or {}
+    loop = asyncio.get_running_loop()
+    overall_deadline = loop.time() + timeout if timeout else None
+    aggregate = Aggregate()
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(name: str):
+        args = ()
+        dependency = depends_on.get(name)
+        if dependency is not None:
+            # asyncio.wait does not cancel the dependency if this section is cancelled
+            await asyncio.wait([tasks[dependency]])
+            if not aggregate.complete(dependency):
+                aggregate.finish(name, "skipped", time.monotonic())
+                return
+            args = (aggregate.values[dependency],)
+
+        started = time.monotonic()
+        section_timeout = timeouts.get(name)
+        deadline = _deadline(overall_deadline, loop.time() + section_timeout if section_timeout else None)
+        try:
+            async with asyncio.timeout_at(deadline):
+                value = await sections[name](*args)
+        except TimeoutError:
+            aggregate.finish(name, "timed_out", started, error=DeadlineExceededError(f"{name} timed out"))
+        except Exception as e:
+            aggregate.finish(name, "failed", started, error=e)
+        else:
+            aggregate.finish(name, "complete", started, value)
+            if on_complete is not None:
+                on_complete(name, value)
+
+    tasks.update((name, asyncio.create_task(run(name))) for name in sections)
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        # The caller was cancelled (e.g. client disconnect): stop every section
+        for task in tasks.values():
+            task.cancel()
+    aggregate.order(sections)
+    return aggregate
+
+
+def gather_sections_threaded(
+    sections: dict[str, Callable[[float | None], Any]],
+    timeouts: dict[str, float | None],
+    timeout: float | None = None
+) -> Aggregate:
+    """Blocking counterpart of :func:`gather_sections`, one thread per section.
+
+    Threads cannot be interrupted, so each callable gets its ``time.monotonic()``
+    deadline and should stop starting upstream requests once it passes; sections
+    still running then are abandoned rather than waited for.
+    """
+    started = time.monotonic()
+    overall_deadline = started + timeout if timeout else None
+    deadlines = {
+        name: _deadline(overall_deadline, started + timeouts[name] if timeouts.get(name) else None)
+        for name in sections
+    }
+    aggregate = Aggregate()
+    executor = ThreadPoolExecutor(max_workers=len(sections) or 1)
+    try:
+        futures = {executor.submit(fn, deadlines[name]): name for name, fn in sections.items()}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if (deadlines[futures[f]] or float("inf")) <= now]:
+                pending.discard(future)
+                name = futures[future]
+                aggregate.finish(name, "timed_out", started, error=DeadlineExceededError(f"{name} timed out"))
+            if not pending:
+                break
+            next_deadline = _deadline(*(deadlines[futures[f]] for f in pending))
+            done, pending = wait(
+                pending,
+                timeout=None if next_deadline is None else max(0.0, next_deadline - now),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                name = futures[future]
+                try:
+                    aggregate.finish(name, "complete", started, future.result())
+                except Exception as e:
+                    aggregate.finish(name, "failed", started, error=e)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    aggregate.order(sections)
+    return aggregate
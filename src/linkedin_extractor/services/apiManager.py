@@ -1,6 +1,8 @@
-import http.client
+import copy
+import logging
+import time
 from datetime import datetime, timedelta
-import json
+from typing import Iterator
 from src.linkedin_extractor.config.config import settings
 from src.linkedin_extractor.schemas.profile import (
     UsernameInput,
@@ -10,192 +12,269 @@ from src.linkedin_extractor.schemas.profile import (
     CommentsOutput,
     LikesOutput
 )
+from src.linkedin_extractor.services.cache import CACHE_MODES, ResponseCache
+from src.linkedin_extractor.services.keyPool import KeyPool, build_key_pool
+from src.linkedin_extractor.services.postStore import PostStore
+from src.linkedin_extractor.services.postsWalk import PostsWalk
+from src.linkedin_extractor.services.connectionPool import ConnectionPool
+from src.linkedin_extractor.services.jsonCodec import loads
+from src.linkedin_extractor.services.logs import log_event
+from src.linkedin_extractor.services.metrics import upstream_timer
+from src.linkedin_extractor.services.resilience import UpstreamGuard, build_upstream_guard
+from src.linkedin_extractor.services.scheduler import UpstreamScheduler, build_upstream_scheduler
+from src.linkedin_extractor.services.searchIndex import SearchIndex, indexed
+from src.linkedin_extractor.services.sharedState import SharedFlight, SharedState
+from src.linkedin_extractor.services.snapshotStore import SnapshotStore, snapshot
+from src.linkedin_extractor.services.singleflight import SingleFlight, coalesce
+from src.linkedin_extractor.services.upstreamAttempts import (
+    CallCounter,
+    UpstreamAttempts,
+    cached_response,
+    shared_flight
+)
+from src.linkedin_extractor.services.parsers import (
+    POSTS_PAGE_SIZE,
+    profile_path,
+    posts_path,
+    profile_comments_path,
+    profile_likes_path,
+    post_comments_path,
+    parse_profile,
+    parse_post,
+    include_post,
+    to_naive_utc,
+    parse_profile_comments,
+    parse_profile_likes,
+    parse_post_comments
+)
 
 class LinkedInAPIManager:
     
-    def __init__(self):
+    def __init__(
+        self,
+        pool: ConnectionPool | None = None,
+        cache: ResponseCache | None = None,
+        guard: UpstreamGuard | None = None,
+        post_store: PostStore | None = None,
+        key_pool: KeyPool | None = None,
+        snapshot_store: SnapshotStore | None = None,
+        state: SharedState | None = None,
+        scheduler: UpstreamScheduler | None = None,
+        search_index: SearchIndex | None = None
+    ):
         self.headers = {
-            'x-rapidapi-key': settings.RAPIDAPI_KEY,
             'x-rapidapi-host': settings.RAPIDAPI_HOST
         }
-        self.api_calls = 0
-        self.conn = http.client.HTTPSConnection(settings.RAPIDAPI_HOST)
+        self.calls = CallCounter()
+        self.pool = pool or ConnectionPool(
+            settings.RAPIDAPI_BASE_URL,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_idle=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            timeout=settings.HTTP_TIMEOUT,
+        )
+        self.cache = cache
+        self.cache_mode = "use"
+        self.singleflight = SingleFlight() if settings.SINGLEFLIGHT_ENABLED else None
+        self.guard = guard or build_upstream_guard()
+        self.post_store = post_store
+        self.key_pool = key_pool or build_key_pool()
+        self.snapshot_store = snapshot_store
+        self.search_index = search_index
+        # Cross-worker dedupe of upstream paths; within this process singleflight does it
+        self.shared_flight = SharedFlight(state, settings.SHARED_FLIGHT_LEASE) if state is not None else None
+        self.scheduler = scheduler or build_upstream_scheduler()
+        self.lane = "interactive"
+        # time.monotonic() after which no new upstream request is started, so an
+        # abandoned /extract-all-threading section stops paginating
+        self.deadline: float | None = None
+
+    def session(self, cache_mode: str = "use", lane: str = "interactive") -> "LinkedInAPIManager":
+        # Request-scoped view: shares the connection pool and cache, counts its own credits
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {cache_mode}")
+        session = copy.copy(self)
+        session.calls = CallCounter()
+        session.cache_mode = cache_mode
+        session.lane = lane
+        session.deadline = None
+        return session
         
+    def _revalidating(self) -> "LinkedInAPIManager":
+        """This session, fetching paths again (conditionally, if cached) instead of serving them from the cache."""
+        if self.cache_mode != "use":
+            return self
+        view = copy.copy(self)
+        view.cache_mode = "refresh"
+        return view
+
     def get_credit_usage(self) -> int:
-        return self.api_calls
+        return self.calls.value
 
     def _make_api_request(self, path: str):
+        cached, stale = cached_response(self, path)
+        if cached is not None:
+            return loads(cached)
+        # Keyed by lane too: an interactive request never waits on a bulk one's queued attempt
+        if self.singleflight is not None:
+            data = self.singleflight.do(("upstream", self.lane, path), lambda: self._fetch_shared(path, stale))
+        else:
+            data = self._fetch_shared(path, stale)
+        return loads(data)
+
+    def _fetch_shared(self, path: str, stale: tuple[bytes, dict] | None) -> bytes:
+        # Another worker fetching the same cacheable path: take its result from the shared cache
+        flight = shared_flight(self, path)
+        if flight is None:
+            return self._fetch_upstream(path, stale)
+        cached = flight.wait(path, self.cache)
+        if cached is not None:
+            return cached
         try:
-            # Create a fresh connection every time
-            self.api_calls += 1
-            # conn = http.client.HTTPSConnection(settings.RAPIDAPI_HOST)
-            self.conn.request("GET", path, headers=self.headers)
-            res = self.conn.getresponse()
-            data = res.read()
-            self.conn.close()
-            return json.loads(data.decode("utf-8"))
-        except Exception as e:
-            print("Error",e)
-            raise ValueError(f"API request failed: {e}")
+            return self._fetch_upstream(path, stale)
+        finally:
+            flight.release(path)
+
+    def _fetch_upstream(self, path: str, stale: tuple[bytes, dict] | None = None) -> bytes:
+        """Fetch ``path``, revalidating the ``(body, validators)`` of a cached copy if given."""
+        attempts = UpstreamAttempts(self, path, stale)
+        while True:
+            # The slot covers the rate-limit wait too, so bulk requests cannot queue tokens ahead of interactive ones
+            with self.scheduler.slot(self.lane, self.deadline):
+                time.sleep(attempts.start())
+                headers = attempts.request_headers()
+                try:
+                    with upstream_timer(attempts.endpoint):
+                        status, response_headers, data, wire_bytes = self.pool.request("GET", path, headers)
+                except Exception as e:
+                    attempts.failed(e)
+                else:
+                    if attempts.responded(status, response_headers):
+                        break
+                finally:
+                    attempts.abandoned()
+            time.sleep(attempts.retry_delay())
+        return attempts.result(status, response_headers, data, wire_bytes)
 
+    @coalesce
+    @snapshot
     def fetch_profile_data_by_username(self, username: str) -> ProfileOutput:
         validated_input = UsernameInput(username=username)
-        path = f"/?username={validated_input.username}"
-        decoded_data = self._make_api_request(path)
-        output_data = {
-            "headline": decoded_data.get("headline"),
-            "location": decoded_data.get("geo", {}).get("full"),
-            "job_title": None,
-            "company_name": None,
-        }
-        
-        position = decoded_data.get("position", [])
-        first_position = position[0] if position else {}
-        output_data["job_title"] = first_position.get("title")
-        output_data["company_name"] = first_position.get("companyName")
-        
-        validated_output = ProfileOutput(**output_data)
-        return validated_output
+        decoded_data = self._make_api_request(profile_path(validated_input.username))
+        return parse_profile(decoded_data)
 
-   
-    
-    def fetch_recent_posts_by_username(self, username: str) -> PostOutput:
-        validated_input = UsernameInput(username=username)
-        posts = []
-        reposts = []
+    def _iter_post_pages(self, username: str) -> Iterator[list[dict]]:
         start = 0
         pagination_token = None
-        now = datetime.utcnow()
-        twelve_months_ago = now - timedelta(days=365)  # fixed to 12 months, adjust if needed
 
         while True:
-            query = f"/get-profile-posts?username={validated_input.username}&start={start}"
-            if pagination_token:
-                query += f"&paginationToken={pagination_token}"
-
+            query = posts_path(username, start, pagination_token)
             decoded_data = self._make_api_request(query)
-            print(decoded_data)
             raw_posts = decoded_data.get("data", [])
             pagination_token = decoded_data.get("nextToken")
+            log_event(
+                "posts_page",
+                logging.DEBUG,
+                settings.LOG_SAMPLE_RATE,
+                username=username,
+                start=start,
+                items=len(raw_posts),
+                has_next=bool(pagination_token),
+            )
 
             if not raw_posts:
-                break
+                return
+
+            yield raw_posts
 
-            stop_fetching = False
+            if not pagination_token:
+                return
+
+            start += POSTS_PAGE_SIZE
+
+    def iter_posts_by_username(
+        self,
+        username: str,
+        since: datetime | None = None,
+        max_items: int | None = None,
+        reposts: str = "include"
+    ) -> Iterator[PostData]:
+        """Yield posts newest first, fetching the next page only when the caller gets to it."""
+        validated_input = UsernameInput(username=username)
+        cutoff = to_naive_utc(since) if since else datetime.utcnow() - timedelta(days=settings.POSTS_WINDOW_DAYS)
+        yielded = 0
+
+        for raw_posts in self._iter_post_pages(validated_input.username):
             for post in raw_posts:
-                posted_at_str = post.get("postedDate")
-                if not posted_at_str:
+                parsed = parse_post(post)
+                if parsed is None:
                     continue
 
-                try:
-                    posted_at = datetime.strptime(posted_at_str[:19], "%Y-%m-%d %H:%M:%S")
-                except Exception:
+                posted_at, is_repost, post_data = parsed
+                if posted_at < cutoff:
+                    return
+                if not include_post(is_repost, reposts):
                     continue
 
-                if posted_at < twelve_months_ago:
-                    stop_fetching = True
-                    break
-
-                is_repost = "reposted" in post
-                original_text = None
-
-                if is_repost:
-                    reshared = post.get("resharedPost", {})
-                    original_text = reshared.get("text") or post.get("text")
-
-                base_data = {
-                    "postedDate": posted_at_str,
-                    "totalReactionCount": post.get("totalReactionCount"),
-                    "commentsCount": post.get("commentsCount"),
-                    "urn": post.get("urn"),
-                    "text": post.get("text"),
-                    "original_text": original_text
-                }
-
-                if is_repost:
-                    reposts.append(PostData(**base_data))
-                else:
-                    posts.append(PostData(**base_data))
-
-            if stop_fetching or not pagination_token:
+                yield post_data
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+
+    @coalesce
+    @snapshot
+    @indexed
+    def fetch_recent_posts_by_username(
+        self,
+        username: str,
+        incremental: bool = False,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        max_posts: int | None = None
+    ) -> PostOutput:
+        validated_input = UsernameInput(username=username)
+        walk = PostsWalk(self.post_store, validated_input.username, incremental, since, until, max_posts)
+        for raw_posts in walk.pages(self)._iter_post_pages(validated_input.username):
+            if walk.add(raw_posts):
                 break
+        return walk.result()
 
-            start += 50
-
-        output_data = {"posts": posts, "reposts": reposts}
-        validated_output = PostOutput(**output_data)
-        return validated_output
-
+    @coalesce
+    @snapshot
+    @indexed
     def fetch_profile_comments_by_username(self, username: str) -> CommentsOutput:
         validated_input = UsernameInput(username=username)
-        path = f"/get-profile-comments?username={validated_input.username}"
-        decoded_data = self._make_api_request(path)
-        raw_comments = decoded_data.get("data", [])
-
-        output_data = [
-            {
-                "highlightedComments": item.get("highlightedComments")[0],
-                "text": item.get("text"),
-                "postedDate": item.get("postedDate"),
-                "commentedDate": item.get("commentedDate"),
-                "postUrl": item.get("postUrl"),
-            }
-            for item in raw_comments
-        ]
-
-        validated_output = CommentsOutput.parse_obj(output_data)
-        return validated_output
+        decoded_data = self._make_api_request(profile_comments_path(validated_input.username))
+        return parse_profile_comments(decoded_data)
 
+    @coalesce
+    @snapshot
+    @indexed
     def fetch_profile_likes_by_username(self, username: str) -> LikesOutput:
         validated_input = UsernameInput(username=username)
-        path = f"/get-profile-likes?username={validated_input.username}"
-        decoded_data = self._make_api_request(path)
-        items = decoded_data.get("data", {}).get("items", [])[:50]
-
-        output_data = [
-            {
-                "text": item.get("text"),
-                "action": item.get("action"),
-                "postedDate": item.get("postedDate"),
-                "totalReactionCount": item.get("totalReactionCount"),
-                "commentsCount": item.get("commentsCount")
-            }
-            for item in items
-        ]
-
-        validated_output = LikesOutput.parse_obj(output_data)
-        return validated_output
-    
-   
+        decoded_data = self._make_api_request(profile_likes_path(validated_input.username))
+        return parse_profile_likes(decoded_data)
     
+    @coalesce
     def fetch_comments_by_post_urn(self, urn: str, count: int = 50) -> list[str]:
         comments = []
         page = 1
-        fetched = 0
         pagination_token = ""
 
-        while fetched < count:
-            path = f"/get-profile-posts-comments?urn={urn}&sort=mostRelevant&page={page}"
-            if pagination_token:
-                path += f"&paginationToken={pagination_token}"
+        while len(comments) < count:
+            path = post_comments_path(urn, page, pagination_token)
 
             try:
                 decoded_data = self._make_api_request(path)
             except Exception as e:
-                # Stop fetching if API errors out (optional: log error)
+                # Retries are exhausted at this point; keep the comments fetched so far
+                log_event("post_comments_failed", logging.WARNING, urn=urn, page=page, error=str(e))
                 break
 
             data = decoded_data.get("data", [])
             if not data:
                 break  # No more data to fetch
 
-            for item in data:
-                text = item.get("text")
-                if text:
-                    comments.append(text)
-                    fetched += 1
-                    if fetched >= count:
-                        break
+            comments.extend(parse_post_comments(data, count - len(comments)))
 
             pagination_token = decoded_data.get("paginationToken")
             if not pagination_token:
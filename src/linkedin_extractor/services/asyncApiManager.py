@@ -0,0 +1,473 @@
+import asyncio
+import copy
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable
+import httpx
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import (
+    UsernameInput,
+    ProfileOutput,
+    PostOutput,
+    PostData,
+    CommentsOutput,
+    LikesOutput,
+    PostCommentData
+)
+from src.linkedin_extractor.services.cache import CACHE_MODES, ResponseCache
+from src.linkedin_extractor.services.jsonCodec import dumps, loads
+from src.linkedin_extractor.services.logs import log_event
+from src.linkedin_extractor.services.metrics import upstream_timer
+from src.linkedin_extractor.services.keyPool import KeyPool, build_key_pool
+from src.linkedin_extractor.services.postStore import PostStore
+from src.linkedin_extractor.services.postsWalk import PostsWalk
+from src.linkedin_extractor.services.resilience import UpstreamGuard, build_upstream_guard
+from src.linkedin_extractor.services.scheduler import UpstreamScheduler, build_upstream_scheduler
+from src.linkedin_extractor.services.searchIndex import SearchIndex, indexed
+from src.linkedin_extractor.services.sharedState import SharedFlight, SharedState, offloaded
+from src.linkedin_extractor.services.snapshotStore import SnapshotStore, snapshot
+from src.linkedin_extractor.services.singleflight import AsyncSingleFlight, coalesce
+from src.linkedin_extractor.services.upstreamAttempts import (
+    CallCounter,
+    UpstreamAttempts,
+    cached_response,
+    shared_flight
+)
+from src.linkedin_extractor.services.parsers import (
+    POSTS_PAGE_SIZE,
+    build,
+    profile_path,
+    posts_path,
+    profile_comments_path,
+    profile_likes_path,
+    post_comments_path,
+    post_comment_thread_key,
+    parse_profile,
+    parse_post,
+    include_post,
+    to_naive_utc,
+    parse_profile_comments,
+    parse_profile_likes,
+    parse_post_comments,
+    parse_post_comment_records
+)
+
+
+def build_async_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    # pool=None: callers beyond max_connections queue for a socket instead of failing
+    timeout = httpx.Timeout(settings.HTTP_TIMEOUT, pool=None)
+    return httpx.AsyncClient(base_url=settings.RAPIDAPI_BASE_URL, limits=limits, timeout=timeout)
+
+
+class AsyncLinkedInAPIManager:
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        cache: ResponseCache | None = None,
+        guard: UpstreamGuard | None = None,
+        post_store: PostStore | None = None,
+        key_pool: KeyPool | None = None,
+        snapshot_store: SnapshotStore | None = None,
+        state: SharedState | None = None,
+        scheduler: UpstreamScheduler | None = None,
+        search_index: SearchIndex | None = None
+    ):
+        self.headers = {
+            'x-rapidapi-host': settings.RAPIDAPI_HOST
+        }
+        self.calls = CallCounter()
+        self.client = client or build_async_client()
+        self.cache = cache
+        self.cache_mode = "use"
+        self.singleflight = AsyncSingleFlight() if settings.SINGLEFLIGHT_ENABLED else None
+        self.guard = guard or build_upstream_guard()
+        self.post_store = post_store
+        self.key_pool = key_pool or build_key_pool()
+        self.snapshot_store = snapshot_store
+        self.search_index = search_index
+        # Cross-worker dedupe of upstream paths; within this process singleflight does it
+        self.shared_flight = SharedFlight(state, settings.SHARED_FLIGHT_LEASE) if state is not None else None
+        # With shared state the key pool, rate limiter and cache tier make round trips to it
+        # (SQLite or Redis): those calls run in worker threads, off the event loop
+        self.offload = state is not None
+        self.scheduler = scheduler or build_upstream_scheduler()
+        self.lane = "interactive"
+        # time.monotonic() after which no new upstream request is started
+        self.deadline: float | None = None
+
+    def session(self, cache_mode: str = "use", lane: str = "interactive") -> "AsyncLinkedInAPIManager":
+        # Request-scoped view: shares the pooled client and cache, counts its own credits
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {cache_mode}")
+        session = copy.copy(self)
+        session.calls = CallCounter()
+        session.cache_mode = cache_mode
+        session.lane = lane
+        session.deadline = None
+        return session
+
+    def _revalidating(self) -> "AsyncLinkedInAPIManager":
+        """This session, fetching paths again (conditionally, if cached) instead of serving them from the cache."""
+        if self.cache_mode != "use":
+            return self
+        view = copy.copy(self)
+        view.cache_mode = "refresh"
+        return view
+
+    def get_credit_usage(self) -> int:
+        return self.calls.value
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _state_call(self, fn, *args, undo=None):
+        if not self.offload:
+            return fn(*args)
+        return await offloaded(fn, *args, undo=undo)
+
+    async def _make_api_request(self, path: str):
+        cached, stale = await self._state_call(cached_response, self, path)
+        if cached is not None:
+            return loads(cached)
+        # Keyed by lane too: an interactive request never waits on a bulk one's queued attempt
+        if self.singleflight is not None:
+            data = await self.singleflight.do(("upstream", self.lane, path), lambda: self._fetch_shared(path, stale))
+        else:
+            data = await self._fetch_shared(path, stale)
+        return loads(data)
+
+    async def _fetch_shared(self, path: str, stale: tuple[bytes, dict] | None) -> bytes:
+        # Another worker fetching the same cacheable path: take its result from the shared cache
+        flight = shared_flight(self, path)
+        if flight is None:
+            return await self._fetch_upstream(path, stale)
+        cached = await flight.async_wait(path, self.cache)
+        if cached is not None:
+            return cached
+        try:
+            return await self._fetch_upstream(path, stale)
+        finally:
+            await flight.async_release(path)
+
+    async def _fetch_upstream(self, path: str, stale: tuple[bytes, dict] | None = None) -> bytes:
+        """Fetch ``path``, revalidating the ``(body, validators)`` of a cached copy if given."""
+        attempts = UpstreamAttempts(self, path, stale)
+        while True:
+            # The slot covers the rate-limit wait too, so bulk requests cannot queue tokens ahead of interactive ones
+            async with self.scheduler.async_slot(self.lane, self.deadline):
+                wait = await self._state_call(attempts.start)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                # Cancelled while a thread takes the key: the key is handed back once it has it
+                headers = await self._state_call(attempts.request_headers, undo=lambda _: attempts.abandoned())
+                try:
+                    with upstream_timer(attempts.endpoint):
+                        res = await self.client.get(path, headers=headers)
+                except Exception as e:
+                    await self._state_call(attempts.failed, e)
+                else:
+                    if await self._state_call(attempts.responded, res.status_code, res.headers):
+                        break
+                finally:
+                    # Cancelled mid-request, e.g. by a section timeout
+                    attempts.abandoned()
+            await asyncio.sleep(attempts.retry_delay())
+        return await self._state_call(attempts.result, res.status_code, res.headers, res.content, res.num_bytes_downloaded)
+
+    @coalesce
+    @snapshot
+    async def fetch_profile_data_by_username(self, username: str) -> ProfileOutput:
+        validated_input = UsernameInput(username=username)
+        decoded_data = await self._make_api_request(profile_path(validated_input.username))
+        return parse_profile(decoded_data)
+
+    async def _iter_post_pages(self, username: str) -> AsyncIterator[list[dict]]:
+        start = 0
+        pagination_token = None
+
+        while True:
+            query = posts_path(username, start, pagination_token)
+            decoded_data = await self._make_api_request(query)
+            raw_posts = decoded_data.get("data", [])
+            pagination_token = decoded_data.get("nextToken")
+            log_event(
+                "posts_page",
+                logging.DEBUG,
+                settings.LOG_SAMPLE_RATE,
+                username=username,
+                start=start,
+                items=len(raw_posts),
+                has_next=bool(pagination_token),
+            )
+
+            if not raw_posts:
+                return
+
+            yield raw_posts
+
+            if not pagination_token:
+                return
+
+            start += POSTS_PAGE_SIZE
+
+    async def iter_posts_by_username(
+        self,
+        username: str,
+        since: datetime | None = None,
+        max_items: int | None = None,
+        reposts: str = "include"
+    ) -> AsyncIterator[PostData]:
+        """Yield posts newest first, fetching the next page only when the caller gets to it."""
+        validated_input = UsernameInput(username=username)
+        cutoff = to_naive_utc(since) if since else datetime.utcnow() - timedelta(days=settings.POSTS_WINDOW_DAYS)
+        yielded = 0
+
+        async for raw_posts in self._iter_post_pages(validated_input.username):
+            for post in raw_posts:
+                parsed = parse_post(post)
+                if parsed is None:
+                    continue
+
+                posted_at, is_repost, post_data = parsed
+                if posted_at < cutoff:
+                    return
+                if not include_post(is_repost, reposts):
+                    continue
+
+                yield post_data
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+
+    @coalesce
+    @snapshot
+    @indexed
+    async def fetch_recent_posts_by_username(
+        self,
+        username: str,
+        incremental: bool = False,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        max_posts: int | None = None,
+        on_page: Callable[[list[PostData]], None] | None = None
+    ) -> PostOutput:
+        """Posts and reposts in the window, newest first.
+
+        ``on_page`` is called with each page's new (non-repost) posts as soon as the
+        page is parsed, so callers can start per-post work during pagination. It is
+        not called in incremental mode, where the output comes from the post store
+        rather than from the pages walked.
+        """
+        validated_input = UsernameInput(username=username)
+        walk = PostsWalk(self.post_store, validated_input.username, incremental, since, until, max_posts, on_page)
+        async for raw_posts in walk.pages(self)._iter_post_pages(validated_input.username):
+            if walk.add(raw_posts):
+                break
+        return walk.result()
+
+    @coalesce
+    @snapshot
+    @indexed
+    async def fetch_profile_comments_by_username(self, username: str) -> CommentsOutput:
+        validated_input = UsernameInput(username=username)
+        decoded_data = await self._make_api_request(profile_comments_path(validated_input.username))
+        return parse_profile_comments(decoded_data)
+
+    @coalesce
+    @snapshot
+    @indexed
+    async def fetch_profile_likes_by_username(self, username: str) -> LikesOutput:
+        validated_input = UsernameInput(username=username)
+        decoded_data = await self._make_api_request(profile_likes_path(validated_input.username))
+        return parse_profile_likes(decoded_data)
+
+    async def _walk_post_comments(
+        self,
+        urn: str,
+        count: int,
+        parse: Callable[[list[dict], int], list]
+    ) -> tuple[list, str | None]:
+        """Comments of one post, page by page until ``count``, with the error that
+        cut the walk short (None if it finished)."""
+        comments = []
+        page = 1
+        pagination_token = ""
+
+        while len(comments) < count:
+            path = post_comments_path(urn, page, pagination_token)
+
+            try:
+                decoded_data = await self._make_api_request(path)
+            except Exception as e:
+                # Retries are exhausted at this point; keep the comments fetched so far
+                log_event("post_comments_failed", logging.WARNING, urn=urn, page=page, error=str(e))
+                return comments, str(e)
+
+            data = decoded_data.get("data", [])
+            if not data:
+                break
+
+            comments.extend(parse(data, count - len(comments)))
+
+            pagination_token = decoded_data.get("paginationToken")
+            if not pagination_token:
+                break
+
+            page += 1
+
+        return comments, None
+
+    @coalesce
+    async def fetch_comments_by_post_urn(self, urn: str, count: int = 50) -> list[str]:
+        comments, _ = await self._walk_post_comments(urn, count, parse_post_comments)
+        return comments
+
+    def _cached_comment_thread(self, urn: str, count: int, count_miss: bool = True) -> list[PostCommentData] | None:
+        if self.cache is None or self.cache_mode != "use":
+            return None
+        cached = self.cache.get(post_comment_thread_key(urn), count_miss)
+        if cached is None:
+            return None
+        thread = loads(cached)
+        # A thread stored with fewer comments than asked for only serves if it had no more
+        if not thread["exhausted"] and len(thread["comments"]) < count:
+            return None
+        return [build(PostCommentData, comment) for comment in thread["comments"][:count]]
+
+    def _cached_comment_threads(self, urns: list[str], count: int) -> dict[str, list[PostCommentData]]:
+        threads = {}
+        for urn in urns:
+            cached = self._cached_comment_thread(urn, count, count_miss=False)
+            if cached is not None:
+                threads[urn] = cached
+        return threads
+
+    @coalesce
+    async def fetch_comment_records_by_post_urn(self, urn: str, count: int = 50) -> list[PostCommentData]:
+        """Comments of one post with author and date, cached per urn as a parsed thread.
+
+        Raises if not even the first page could be fetched; a thread cut short later
+        is returned as far as it got and not cached.
+        """
+        cached = await self._state_call(self._cached_comment_thread, urn, count)
+        if cached is not None:
+            return cached
+        comments, error = await self._walk_post_comments(urn, count, parse_post_comment_records)
+        if error is not None and not comments:
+            raise ValueError(error)
+        if error is None and self.cache is not None and self.cache_mode != "bypass":
+            thread = {"exhausted": len(comments) < count, "comments": comments}
+            await self._state_call(self.cache.set, post_comment_thread_key(urn), dumps(thread))
+        return comments
+
+    async def fetch_comment_records_by_post_urns(
+        self,
+        urns: list[str],
+        count: int = 50,
+        concurrency: int | None = None
+    ) -> dict:
+        """Comment threads for many posts, keyed by urn.
+
+        Repeated urns are fetched once, threads already in the cache are not
+        fetched at all, and the rest are fetched ``concurrency`` at a time.
+        Urns whose first page fails are listed under ``failed`` (counted in
+        ``failures``, not in ``fetched``).
+        """
+        unique = list(dict.fromkeys(urns))
+        threads = await self._state_call(self._cached_comment_threads, unique, count)
+        missing = [urn for urn in unique if urn not in threads]
+
+        semaphore = asyncio.Semaphore(concurrency or settings.COMMENTS_FANOUT_CONCURRENCY)
+
+        async def fetch(urn: str):
+            async with semaphore:
+                return await self.fetch_comment_records_by_post_urn(urn, count)
+
+        failed = {}
+        results = await asyncio.gather(*(fetch(urn) for urn in missing), return_exceptions=True)
+        for urn, result in zip(missing, results):
+            if isinstance(result, Exception):
+                failed[urn] = str(result)
+            else:
+                threads[urn] = result
+        return {
+            "threads": {urn: threads[urn] for urn in unique if urn in threads},
+            "failed": failed,
+            "requested": len(urns),
+            "unique": len(unique),
+            "cached": len(unique) - len(missing),
+            "fetched": len(missing) - len(failed),
+            "failures": len(failed),
+        }
+
+    async def fetch_comments_by_post_urns(
+        self,
+        urns: list[str],
+        count: int = 50,
+        concurrency: int | None = None,
+        on_done: Callable[[], None] | None = None
+    ) -> list[list[str]]:
+        # Results come back in the order of ``urns``; each fetch still goes through
+        # _make_api_request so cache, coalescing and upstream limits apply per page.
+        return await CommentPrefetcher(self, count, concurrency, on_done).gather(urns)
+
+
+class CommentPrefetcher:
+    """Bounded comment-thread fan-out that accepts urns as they are discovered.
+
+    ``schedule`` starts fetches right away (at most ``concurrency`` at a time);
+    ``gather`` returns the threads for a list of urns in its order, fetching any
+    not scheduled yet. Call ``cancel`` to drop fetches nobody will gather.
+    """
+
+    def __init__(
+        self,
+        session: AsyncLinkedInAPIManager,
+        count: int,
+        concurrency: int | None = None,
+        on_done: Callable[[], None] | None = None
+    ):
+        self.session = session
+        self.count = count
+        self.on_done = on_done
+        self._semaphore = asyncio.Semaphore(concurrency or settings.COMMENTS_FANOUT_CONCURRENCY)
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def _fetch(self, urn: str) -> list[str]:
+        async with self._semaphore:
+            comments = await self.session.fetch_comments_by_post_urn(urn, self.count)
+        if self.on_done is not None:
+            self.on_done()
+        return comments
+
+    @property
+    def scheduled(self) -> int:
+        return len(self._tasks)
+
+    def schedule(self, urns: list[str]):
+        for urn in urns:
+            if urn not in self._tasks:
+                self._tasks[urn] = asyncio.ensure_future(self._fetch(urn))
+
+    async def gather(self, urns: list[str]) -> list[list[str]]:
+        self.schedule(urns)
+        return await asyncio.gather(*(self._tasks[urn] for urn in urns))
+
+    def completed(self, urns: list[str]) -> list[list[str] | None]:
+        """Threads fetched so far, in the order of ``urns``; None where not finished."""
+        results = []
+        for urn in urns:
+            task = self._tasks.get(urn)
+            done = task is not None and task.done() and not task.cancelled() and task.exception() is None
+            results.append(task.result() if done else None)
+        return results
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.parsers import endpoint_type
+
+CACHE_MODES = ("use", "bypass", "refresh")
+
+
+class MemoryLRU:
+    """Bounded in-process LRU of raw response bodies, evicted by total byte size.
+
+    An entry is fresh until ``expires_at``; one with validators is kept until
+    ``stale_until`` so it can be revalidated instead of downloaded again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: str, now: float) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stale_until, value, _ = entry
+        if stale_until <= now:
+            self._remove(key)
+            return None
+        if expires_at <= now:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def stale(self, key: str, now: float) -> tuple[bytes, dict] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[3] is None or entry[1] <= now:
+            return None
+        return entry[2], entry[3]
+
+    def set(self, key: str, value: bytes, expires_at: float, stale_until: float, validators: dict | None = None):
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, stale_until, value, validators)
+        self.bytes += len(value)
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        _, _, value, _ = self._entries.pop(key)
+        self.bytes -= len(value)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "evictions": self.evictions}
+
+
+class DiskStore:
+    """Persistent SQLite tier; evicts least recently used rows once ``max_bytes`` is exceeded."""
+
+    def __init__(self, path: str, max_bytes: int):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.evictions = 0
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(responses)")}
+        if "stale_until" not in columns:
+            # Caches created before conditional revalidation
+            self.db.execute("ALTER TABLE responses ADD COLUMN stale_until REAL")
+            self.db.execute("ALTER TABLE responses ADD COLUMN validators TEXT")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.db.execute("DELETE FROM responses WHERE COALESCE(stale_until, expires_at) <= ?", (time.time(),))
+        self.bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _row(self, key: str, now: float) -> tuple | None:
+        row = self.db.execute(
+            "SELECT value, expires_at, COALESCE(stale_until, expires_at), validators FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[2] <= now:
+            self.delete(key)
+            return None
+        return row
+
+    def get(self, key: str, now: float) -> tuple[bytes, float, float, dict | None] | None:
+        row = self._row(key, now)
+        if row is None or row[1] <= now:
+            return None
+        self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        value, expires_at, stale_until, validators = row
+        return value, expires_at, stale_until, json.loads(validators) if validators else None
+
+    def stale(self, key: str, now: float) -> tuple[bytes, dict] | None:
+        row = self._row(key, now)
+        if row is None or not row[3]:
+            return None
+        return row[0], json.loads(row[3])
+
+    def set(self, key: str, value: bytes, expires_at: float, stale_until: float, now: float, validators: dict | None = None):
+        if len(value) > self.max_bytes:
+            return
+        self.delete(key)
+        self.db.execute(
+            "INSERT INTO responses (key, value, size, expires_at, stale_until, validators, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, value, len(value), expires_at, stale_until, json.dumps(validators) if validators else None, now),
+        )
+        self.bytes += len(value)
+        while self.bytes > self.max_bytes:
+            oldest = self.db.execute("SELECT key FROM responses ORDER BY accessed_at LIMIT 1").fetchone()
+            if oldest is None:
+                break
+            self.delete(oldest[0])
+            self.evictions += 1
+
+    def delete(self, key: str):
+        row = self.db.execute("DELETE FROM responses WHERE key = ? RETURNING size", (key,)).fetchone()
+        if row:
+            self.bytes -= row[0]
+
+    def stats(self) -> dict:
+        entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self.bytes, "hits": self.hits, "evictions": self.evictions}
+
+
+class ResponseCache:
+    """Two-tier cache of upstream response bodies keyed by RapidAPI path.
+
+    Lookups go memory first, then disk (promoting disk hits into memory). Entries
+    expire after a per-endpoint TTL. Entries stored with validators (ETag,
+    Last-Modified) stay around for ``revalidate_window`` seconds after expiring
+    so :meth:`stale` can hand them out for a conditional request. Safe to share
+    between threads and managers.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_path: str | None,
+        disk_max_bytes: int,
+        ttls: dict[str, float],
+        revalidate_window: float = 0,
+        shared_tier=None
+    ):
+        self.memory = MemoryLRU(memory_max_bytes)
+        # ``shared_tier`` (e.g. a SharedCacheTier) takes the disk tier's place
+        self.disk = shared_tier or (DiskStore(disk_path, disk_max_bytes) if disk_path else None)
+        self.ttls = ttls
+        self.revalidate_window = revalidate_window
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    def ttl_for(self, path: str) -> float:
+        return self.ttls.get(endpoint_type(path), 0)
+
+    def get(self, path: str, count_miss: bool = True) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            value = self.memory.get(path, now)
+            if value is not None:
+                return value
+            if self.disk is not None:
+                entry = self.disk.get(path, now)
+                if entry is not None:
+                    value, expires_at, stale_until, validators = entry
+                    self.memory.set(path, value, expires_at, stale_until, validators)
+                    return value
+            if count_miss:
+                self.misses += 1
+            return None
+
+    def stale(self, path: str) -> tuple[bytes, dict] | None:
+        """Body and validators of an entry that can be revalidated, fresh or not."""
+        now = time.time()
+        with self._lock:
+            entry = self.memory.stale(path, now)
+            if entry is None and self.disk is not None:
+                entry = self.disk.stale(path, now)
+            return entry
+
+    def set(self, path: str, value: bytes, validators: dict | None = None):
+        ttl = self.ttl_for(path)
+        if ttl <= 0:
+            return
+        now = time.time()
+        stale_until = now + ttl + (self.revalidate_window if validators else 0)
+        with self._lock:
+            self.memory.set(path, value, now + ttl, stale_until, validators)
+            if self.disk is not None:
+                self.disk.set(path, value, now + ttl, stale_until, now, validators)
+
+    def revalidated(self, path: str, value: bytes, validators: dict):
+        """Upstream answered 304 for ``value``: serve it for another TTL."""
+        with self._lock:
+            self.revalidations += 1
+        self.set(path, value, validators)
+
+    def stats(self) -> dict:
+        with self._lock:
+            memory = self.memory.stats()
+            disk = self.disk.stats() if self.disk is not None else None
+            hits = memory["hits"] + (disk["hits"] if disk else 0)
+            return {
+                "hits": hits,
+                "misses": self.misses,
+                "evictions": memory["evictions"] + (disk["evictions"] if disk else 0),
+                "revalidations": self.revalidations,
+                "memory": memory,
+                "disk": disk,
+            }
+
+
+def build_response_cache(shared_tier=None) -> ResponseCache | None:
+    if not settings.CACHE_ENABLED:
+        return None
+    return ResponseCache(
+        memory_max_bytes=settings.CACHE_MEMORY_MAX_BYTES,
+        disk_path=settings.CACHE_DB_PATH or None,
+        disk_max_bytes=settings.CACHE_DISK_MAX_BYTES,
+        ttls={
+            "profile": settings.CACHE_TTL_PROFILE,
+            "posts": settings.CACHE_TTL_POSTS,
+            "comments": settings.CACHE_TTL_COMMENTS,
+            "likes": settings.CACHE_TTL_LIKES,
+            "post_comments": settings.CACHE_TTL_POST_COMMENTS,
+        },
+        revalidate_window=settings.CACHE_REVALIDATE_WINDOW,
+        shared_tier=shared_tier,
+    )
+
+
+def response_validators(headers) -> dict | None:
+    """ETag / Last-Modified of a response, for a later conditional request."""
+    validators = {}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators or None
+
+
+def conditional_headers(validators: dict) -> dict[str, str]:
+    headers = {}
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last_modified" in validators:
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
@@ -0,0 +1,87 @@
+import zlib
+from src.linkedin_extractor.config.config import settings
+
+# brotli is optional (pip install "linkedin-extractor[compression]"); without it only gzip/deflate are offered.
+# httpx picks it up too, so both managers negotiate the same encodings.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def request_encoding_headers() -> dict[str, str]:
+    if not settings.HTTP_COMPRESSION:
+        return {"Accept-Encoding": "identity"}
+    return {"Accept-Encoding": ACCEPT_ENCODING}
+
+
+class ContentDecoder:
+    """Incremental decoder for a Content-Encoding header value, fed chunk by chunk."""
+
+    def __init__(self, content_encoding: str | None):
+        encodings = [e.strip().lower() for e in (content_encoding or "").split(",")]
+        # Encodings are listed in the order they were applied: undo them last to first
+        self._decoders = [_decoder(e) for e in reversed(encodings) if e and e != "identity"]
+
+    def decode(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for decoder in self._decoders:
+            data = decoder.decompress(data) + decoder.flush()
+        return data
+
+
+class _BrotliDecoder:
+
+    def __init__(self):
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decoder.process(data) if data else b""
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _DeflateDecoder:
+    """``deflate`` should be zlib-wrapped, but some servers send raw deflate: like
+    httpx, fall back to raw deflate if the start of the body is not a zlib stream."""
+
+    def __init__(self):
+        # 32 + MAX_WBITS also accepts a gzip header
+        self._decoder = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        # Input read before the first decoded byte, replayed into the fallback
+        self._head = b""
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._head is None:
+            return self._decoder.decompress(data)
+        self._head += data
+        try:
+            decoded = self._decoder.decompress(data)
+        except zlib.error:
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            head, self._head = self._head, None
+            return self._decoder.decompress(head)
+        if decoded:
+            self._head = None
+        return decoded
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+def _decoder(encoding: str):
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return _DeflateDecoder()
+    if encoding == "br" and brotli is not None:
+        return _BrotliDecoder()
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
@@ -0,0 +1,81 @@
+import http.client
+import threading
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from src.linkedin_extractor.services.compression import ContentDecoder
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive ``http.client`` connections for the blocking manager.
+
+    At most ``max_connections`` sockets are checked out at once; a connection is only
+    ever used by the thread holding it, so concurrent requests never share a socket.
+    """
+
+    def __init__(self, base_url: str, max_connections: int, max_idle: int, timeout: float):
+        parsed = urlsplit(base_url)
+        self._conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        return self._conn_cls(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        conn = conn or self._new_connection()
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        else:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def request(self, method: str, path: str, headers: dict) -> tuple[int, http.client.HTTPMessage, bytes, int]:
+        """Send a request; returns status, headers, the decoded body and its size on the wire.
+
+        A compressed body is decoded chunk by chunk as it is read.
+        """
+        with self.connection() as conn:
+            try:
+                conn.request(method, path, headers=headers)
+                res = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server dropped an idle keep-alive socket; retry once on a fresh one
+                conn.close()
+                conn.request(method, path, headers=headers)
+                res = conn.getresponse()
+            decoder = ContentDecoder(res.headers.get("Content-Encoding"))
+            chunks = []
+            wire_bytes = 0
+            while chunk := res.read(READ_CHUNK_SIZE):
+                wire_bytes += len(chunk)
+                chunks.append(decoder.decode(chunk))
+            chunks.append(decoder.flush())
+            if res.will_close:
+                conn.close()
+            return res.status, res.headers, b"".join(chunks), wire_bytes
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import ExtractAllJobInput
+from src.linkedin_extractor.services.aggregation import gather_sections
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager, CommentPrefetcher
+from src.linkedin_extractor.services.extractionPlan import ExtractionPlan
+from src.linkedin_extractor.services.logs import log_event
+
+
+async def extract_all_for_username(
+    session: AsyncLinkedInAPIManager,
+    username: str,
+    extract_comments: bool = False,
+    count: int = 10,
+    comments_concurrency: int | None = None,
+    incremental: bool = False,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    max_posts: int | None = None,
+    progress: Callable[..., None] | None = None,
+    section_timeouts: dict[str, float | None] | None = None,
+    timeout: float | None = None,
+    plan: ExtractionPlan | None = None
+) -> dict[str, Any]:
+    """Fetch the sections in ``plan`` (default: all) for ``username`` concurrently.
+
+    Sections left out of ``plan`` are not fetched and not in the result; post
+    comment threads are only fetched if ``extract_comments`` is set and the plan
+    returns the posts' ``comments`` field.
+
+    Each section runs within its entry in ``section_timeouts`` and all of them
+    within ``timeout`` (None: no limit). Sections that fail or time out are None
+    in the result and ``sections`` reports each one's status; only when nothing
+    completes is the first error raised.
+
+    ``progress``, if given, is called with ``sections_done`` and ``credits_used``
+    after each section and with ``comment_threads_done``/``comment_threads_scheduled``
+    during the comment fan-out.
+    """
+    plan = plan or ExtractionPlan()
+    extract_comments = extract_comments and plan.wants_field("posts", "comments")
+    sections_done = []
+
+    def section_done(section: str, value):
+        sections_done.append(section)
+        fields = {}
+        if section == "posts":
+            fields = {"posts": len(value.posts), "reposts": len(value.reposts)}
+        if progress is not None:
+            progress(sections_done=list(sections_done), credits_used=session.get_credit_usage(), **fields)
+
+    threads_done = 0
+    prefetcher = None
+
+    def thread_done():
+        nonlocal threads_done
+        threads_done += 1
+        if progress is not None:
+            progress(
+                comment_threads_done=threads_done,
+                comment_threads_scheduled=prefetcher.scheduled,
+                credits_used=session.get_credit_usage(),
+            )
+
+    on_page = None
+    if extract_comments:
+        prefetcher = CommentPrefetcher(session, count, comments_concurrency, thread_done)
+        if settings.COMMENTS_PREFETCH:
+            # Start each post's comment thread as soon as its page is parsed, overlapping
+            # the fan-out with the rest of pagination and the other sections
+            def on_page(new_posts):
+                prefetcher.schedule([post.urn for post in new_posts])
+
+    async def fetch_profile():
+        profile = await session.fetch_profile_data_by_username(username)
+        log_event("profile_fetched", logging.DEBUG, settings.LOG_SAMPLE_RATE, username=username, profile=profile)
+        return profile
+
+    async def fetch_posts():
+        return await session.fetch_recent_posts_by_username(
+            username, incremental, since, until, max_posts, on_page=on_page
+        )
+
+    async def fetch_post_comments(posts_result):
+        return await prefetcher.gather([post.urn for post in posts_result.posts])
+
+    fetchers = {
+        "profile": fetch_profile,
+        "posts": fetch_posts,
+        "commented_posts": lambda: session.fetch_profile_comments_by_username(username),
+        "reacted_posts": lambda: session.fetch_profile_likes_by_username(username),
+    }
+    sections = {name: fetch for name, fetch in fetchers.items() if plan.wants(name)}
+    depends_on = {}
+    if extract_comments:
+        sections["post_comments"] = fetch_post_comments
+        depends_on["post_comments"] = "posts"
+
+    try:
+        aggregate = await gather_sections(sections, section_timeouts or {}, timeout, depends_on, section_done)
+        aggregate.raise_if_empty()
+
+        posts_result = aggregate.values.get("posts")
+        posts = posts_result.posts if posts_result is not None else None
+        posts_output = posts
+
+        if extract_comments and posts is not None:
+            post_comments = aggregate.values.get("post_comments")
+            if post_comments is None:
+                # Timed out: keep the threads that finished, None for the rest
+                post_comments = prefetcher.completed([post.urn for post in posts])
+            posts_output = []
+            for post, comments_for_post in zip(posts, post_comments):
+                post_dict = post.model_dump()
+                post_dict["comments"] = comments_for_post
+                posts_output.append(post_dict)
+        # Without comments posts stay models: the response serializer writes them without an extra dict copy
+    finally:
+        if prefetcher is not None:
+            prefetcher.cancel()
+
+    result = {}
+    if plan.wants("profile"):
+        result["profile"] = plan.project("profile", aggregate.values.get("profile"))
+    if plan.wants("posts"):
+        result["posts"] = plan.project("posts", posts_output)
+        result["reposts"] = plan.project("posts", posts_result.reposts) if posts_result is not None else None
+        result["pages_fetched"] = posts_result.pages_fetched if posts_result is not None else None
+    for name in ("commented_posts", "reacted_posts"):
+        if plan.wants(name):
+            result[name] = plan.project(name, aggregate.values.get(name))
+    result["sections"] = aggregate.report
+    result["credits_used"] = session.get_credit_usage()
+    return result
+
+
+def extract_all_job_runner(manager: AsyncLinkedInAPIManager):
+    """Job runner for ``extract_all`` jobs queued through the job store; their
+    upstream requests go in the bulk lane."""
+
+    async def run(params: dict, progress: Callable[..., None]) -> dict[str, Any]:
+        request = ExtractAllJobInput.model_validate(params)
+        return await extract_all_for_username(
+            manager.session(request.cache, lane="bulk"),
+            request.username,
+            request.extract_comments,
+            request.count,
+            request.comments_concurrency,
+            request.incremental,
+            request.since,
+            request.until,
+            request.max_posts,
+            progress,
+            plan=ExtractionPlan.parse(request.sections, request.fields),
+        )
+
+    return run
+
+
+async def iter_batch_extractions(
+    manager: AsyncLinkedInAPIManager,
+    usernames: list[str],
+    concurrency: int | None = None,
+    cache_mode: str = "use",
+    **extract_kwargs
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield one result per username in completion order, fetched in the bulk lane.
+
+    A fixed set of workers pulls usernames and hands finished results through a
+    queue sized to the worker count, so at most ``2 * concurrency`` results are
+    held in memory however long the batch is.
+    """
+    concurrency = max(1, min(concurrency or settings.BATCH_CONCURRENCY, len(usernames) or 1))
+    results = asyncio.Queue(maxsize=concurrency)
+    pending = iter(usernames)
+    done = object()
+
+    async def worker():
+        for username in pending:
+            session = manager.session(cache_mode, lane="bulk")
+            try:
+                result = await extract_all_for_username(session, username, **extract_kwargs)
+                record = {"username": username, **result}
+            except Exception as e:
+                record = {"username": username, "error": str(e), "credits_used": session.get_credit_usage()}
+            await results.put(record)
+        await results.put(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        finished = 0
+        while finished < concurrency:
+            record = await results.get()
+            if record is done:
+                finished += 1
+            else:
+                yield record
+    finally:
+        # The client may disconnect mid-stream; stop pulling new usernames
+        for task in workers:
+            task.cancel()
@@ -0,0 +1,101 @@
+from typing import Any
+from pydantic import BaseModel, RootModel
+from src.linkedin_extractor.schemas.profile import CommentData, LikeData, PostData, PostOutput, ProfileOutput
+
+# Upstream sections of an extract-all and the fields of the records each one returns
+SECTION_FIELDS = {
+    "profile": set(ProfileOutput.model_fields),
+    # "comments" is the per-post thread added when extract_comments is set
+    "posts": set(PostData.model_fields) | {"comments"},
+    "commented_posts": set(CommentData.model_fields),
+    "reacted_posts": set(LikeData.model_fields),
+}
+# /extract-all-threading's section names for the profile's comments and likes
+SECTION_ALIASES = {"comments": "commented_posts", "likes": "reacted_posts"}
+
+
+def section_name(name: str) -> str:
+    """The section's name in /extract-all, which plans, timeouts and metrics are keyed by."""
+    return SECTION_ALIASES.get(name, name)
+
+
+def _split(value: str | None) -> list[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+class ExtractionPlan:
+    """Which sections of an extract-all to fetch and which record fields to return.
+
+    Sections left out are never requested upstream; a section without listed
+    fields is returned whole.
+    """
+
+    def __init__(self, sections=None, fields: dict[str, set[str]] | None = None):
+        self.sections = tuple(sections or SECTION_FIELDS)
+        self.fields = fields or {}
+
+    @classmethod
+    def parse(cls, sections: str | None = None, fields: str | None = None) -> "ExtractionPlan":
+        """Build a plan from comma-separated ``sections`` and ``fields``.
+
+        A field is ``section.field`` or a bare ``field``, which applies to every
+        planned section whose records have it. Raises ValueError for unknown names.
+        """
+        planned = []
+        for name in _split(sections):
+            if section_name(name) not in SECTION_FIELDS:
+                raise ValueError(f"Unknown section: {name} (expected one of {', '.join(SECTION_FIELDS)})")
+            if section_name(name) not in planned:
+                planned.append(section_name(name))
+        planned = planned or list(SECTION_FIELDS)
+
+        projection: dict[str, set[str]] = {}
+        for entry in _split(fields):
+            name, _, field = entry.rpartition(".")
+            if name:
+                section = section_name(name)
+                if section not in SECTION_FIELDS:
+                    raise ValueError(f"Unknown section in fields: {name}")
+                if section not in planned:
+                    raise ValueError(f"Field {entry} is for a section that was not requested")
+                if field not in SECTION_FIELDS[section]:
+                    raise ValueError(f"Unknown field for {name}: {field}")
+                projection.setdefault(section, set()).add(field)
+                continue
+            matched = [section for section in planned if field in SECTION_FIELDS[section]]
+            if not matched:
+                raise ValueError(f"Unknown field: {field}")
+            for section in matched:
+                projection.setdefault(section, set()).add(field)
+        return cls(planned, projection)
+
+    def wants(self, section: str) -> bool:
+        return section_name(section) in self.sections
+
+    def wants_field(self, section: str, field: str) -> bool:
+        include = self.fields.get(section_name(section))
+        return self.wants(section) and (include is None or field in include)
+
+    def project(self, section: str, value: Any) -> Any:
+        """Drop the fields not asked for from a section's value (a model, a list of
+        records or a PostOutput); returned unchanged when the whole section was asked for."""
+        include = self.fields.get(section_name(section))
+        if include is None or value is None:
+            return value
+        if isinstance(value, PostOutput):
+            return {
+                "posts": self.project(section, value.posts),
+                "reposts": self.project(section, value.reposts),
+                "pages_fetched": value.pages_fetched,
+            }
+        if isinstance(value, RootModel):
+            value = value.root
+        if isinstance(value, list):
+            return [_project_record(record, include) for record in value]
+        return _project_record(value, include)
+
+
+def _project_record(record, include: set[str]) -> dict[str, Any]:
+    if isinstance(record, BaseModel):
+        return record.model_dump(include=include)
+    return {key: value for key, value in record.items() if key in include}
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.jsonCodec import dumps, loads
+from src.linkedin_extractor.services.logs import log_event
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+JobRunner = Callable[[dict, Callable[..., None]], Awaitable[Any]]
+
+
+class JobStore:
+    """SQLite-backed job queue shared by the API and any number of worker processes.
+
+    Workers claim a job with a lease and renew it while the job runs. A job whose
+    lease expires (its worker died or the process restarted) is claimed again, up to
+    ``max_attempts`` times.
+    """
+
+    def __init__(self, path: str, max_attempts: int, retention_seconds: float):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, dedupe_key TEXT NOT NULL,"
+            " status TEXT NOT NULL, progress TEXT, result BLOB, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_expires_at REAL, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status)")
+        if retention_seconds > 0:
+            self.db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - retention_seconds,),
+            )
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: dict) -> tuple[str, bool]:
+        """Queue a job; returns ``(job_id, deduplicated)``.
+
+        Resubmitting the same kind and params while a job is queued or running
+        returns that job instead of starting duplicate upstream work.
+        """
+        encoded = dumps(params)
+        dedupe_key = hashlib.sha256(kind.encode() + b"\0" + encoded).hexdigest()
+        with self._lock:
+            row = self.db.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')"
+                " ORDER BY created_at LIMIT 1",
+                (dedupe_key,),
+            ).fetchone()
+            if row:
+                return row[0], True
+            job_id = uuid.uuid4().hex
+            self.db.execute(
+                "INSERT INTO jobs (id, kind, params, dedupe_key, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, encoded.decode("utf-8"), dedupe_key, time.time()),
+            )
+        return job_id, False
+
+    def claim(self, lease_seconds: float) -> dict | None:
+        now = time.time()
+        with self._lock:
+            # Jobs left running by a dead worker have run out of attempts: fail them
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'worker lost too many times', finished_at = ?"
+                " WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self.db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_expires_at = ?,"
+                " started_at = COALESCE(started_at, ?)"
+                " WHERE id = ("
+                "  SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)"
+                "  ORDER BY created_at LIMIT 1)"
+                " RETURNING id, kind, params, attempts",
+                (now + lease_seconds, now, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "kind": row[1], "params": loads(row[2]), "attempts": row[3]}
+
+    def renew(self, job_id: str, lease_seconds: float, progress: dict | None = None):
+        with self._lock:
+            if progress is None:
+                self.db.execute(
+                    "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running'",
+                    (time.time() + lease_seconds, job_id),
+                )
+            else:
+                self.db.execute(
+                    "UPDATE jobs SET lease_expires_at = ?, progress = ? WHERE id = ? AND status = 'running'",
+                    (time.time() + lease_seconds, dumps(progress).decode("utf-8"), job_id),
+                )
+
+    def finish(self, job_id: str, result: bytes, progress: dict):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, progress = ?, finished_at = ?, lease_expires_at = NULL"
+                " WHERE id = ?",
+                (result, dumps(progress).decode("utf-8"), time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str, progress: dict):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, progress = ?, finished_at = ?, lease_expires_at = NULL"
+                " WHERE id = ?",
+                (error, dumps(progress).decode("utf-8"), time.time(), job_id),
+            )
+
+    def release(self, job_id: str):
+        # Shutdown mid-job: hand it back without spending an attempt
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_expires_at = NULL"
+                " WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def status(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT id, kind, status, progress, error, attempts, created_at, started_at, finished_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "progress": loads(row[3]) if row[3] else {},
+            "error": row[4],
+            "attempts": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+        }
+
+    def result(self, job_id: str) -> bytes | None:
+        with self._lock:
+            row = self.db.execute("SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in JOB_STATUSES} | dict(rows)
+
+
+class JobWorkerPool:
+    """Runs queued jobs on ``workers`` asyncio tasks in the current process.
+
+    ``runners`` maps a job kind to ``async (params, progress) -> result``; the
+    runner calls ``progress(**fields)`` as it goes, and the latest fields are
+    saved with each lease renewal so status polls see partial progress.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runners: dict[str, JobRunner],
+        workers: int,
+        poll_interval: float,
+        lease_seconds: float
+    ):
+        self.store = store
+        self.runners = runners
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            job = self.store.claim(self.lease_seconds)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict):
+        progress = {}
+        dirty = False
+
+        def report(**fields):
+            nonlocal dirty
+            progress.update(fields)
+            dirty = True
+
+        async def heartbeat():
+            nonlocal dirty
+            while True:
+                await asyncio.sleep(min(self.lease_seconds / 3, 1.0))
+                self.store.renew(job["id"], self.lease_seconds, progress if dirty else None)
+                dirty = False
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            runner = self.runners[job["kind"]]
+            result = await runner(job["params"], report)
+            self.store.finish(job["id"], dumps(result), progress)
+        except asyncio.CancelledError:
+            self.store.release(job["id"])
+            raise
+        except Exception as e:
+            log_event("job_failed", logging.WARNING, job_id=job["id"], kind=job["kind"], error=str(e))
+            self.store.fail(job["id"], str(e), progress)
+        finally:
+            beat.cancel()
+
+
+def build_job_store() -> JobStore | None:
+    if not settings.JOBS_ENABLED:
+        return None
+    return JobStore(
+        settings.JOB_DB_PATH,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        retention_seconds=settings.JOB_RETENTION_DAYS * 86400,
+    )
+
+
+def build_job_worker_pool(store: JobStore, runners: dict[str, JobRunner], workers: int | None = None) -> JobWorkerPool:
+    return JobWorkerPool(
+        store,
+        runners,
+        workers=settings.JOB_WORKERS if workers is None else workers,
+        poll_interval=settings.JOB_POLL_INTERVAL,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+    )
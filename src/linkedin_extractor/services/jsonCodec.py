@@ -0,0 +1,58 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from src.linkedin_extractor.config.config import settings
+
+# orjson is optional (pip install "linkedin-extractor[fast]"); the stdlib is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if settings.JSON_BACKEND == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+# Newer orjson can embed pydantic's own (Rust) serialization without building dicts first
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        if _Fragment is not None:
+            return _Fragment(obj.model_dump_json())
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize API output, including pydantic models, without a jsonable_encoder pass."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_orjson_default)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with :func:`dumps`.
+
+    Routes return it directly so FastAPI skips its own jsonable_encoder walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
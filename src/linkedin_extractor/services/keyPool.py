@@ -0,0 +1,285 @@
+import hashlib
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.resilience import parse_retry_after
+from src.linkedin_extractor.services.sharedState import SharedState
+
+# recent_429s decays with this half-life, so old throttling stops counting against a key
+THROTTLE_HALF_LIFE = 60.0
+# 401/403 mean the key is invalid or unsubscribed; it stays retired until the next period
+REVOKED_STATUSES = (401, 403)
+# Shared-state usage keys outlive their quota period by a few days
+PERIOD_STATE_TTL = 40 * 86400
+
+
+class KeyPoolExhaustedError(ValueError):
+    """No usable key; ``retry_after`` is the seconds until one comes back (None without keys)."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def current_period(now: float | None = None) -> str:
+    return datetime.fromtimestamp(now or time.time(), timezone.utc).strftime("%Y-%m")
+
+
+def next_period_start(now: float) -> float:
+    current = datetime.fromtimestamp(now, timezone.utc)
+    year, month = (current.year + 1, 1) if current.month == 12 else (current.year, current.month + 1)
+    return datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+
+
+class ApiKey:
+
+    def __init__(self, value: str, quota: int):
+        self.value = value
+        # Stable id for stats, logs and persistence; the key itself is never exposed
+        self.id = hashlib.sha256(value.encode()).hexdigest()[:12]
+        self.quota = quota
+        self.used = 0
+        self.remaining: int | None = None
+        self.retired_until: float | None = None
+        self.throttled_until = 0.0
+        self.recent_429s = 0.0
+        self._decayed_at = time.monotonic()
+        self.in_flight = 0
+
+    def quota_left(self) -> float:
+        if self.remaining is not None:
+            return self.remaining
+        if self.quota > 0:
+            return max(0, self.quota - self.used)
+        return math.inf
+
+    def decay(self, now: float):
+        self.recent_429s *= 0.5 ** ((now - self._decayed_at) / THROTTLE_HALF_LIFE)
+        self._decayed_at = now
+
+    def weight(self, unknown_quota: float) -> float:
+        quota_left = self.quota_left()
+        if quota_left == math.inf:
+            quota_left = unknown_quota
+        return quota_left / (1 + self.recent_429s)
+
+
+class KeyPool:
+    """RapidAPI keys with per-key quota tracking.
+
+    Each attempt picks a usable key at random, weighted by its quota left and
+    discounted by its recent 429s. A key that gets a 429 cools down for its Retry-After. Keys run out
+    when RapidAPI reports no requests remaining, when the configured monthly quota is
+    used up, or when RapidAPI rejects them (401/403); they come back at the next
+    quota period. Credits used per key and period are persisted in the shared
+    state if there is one, else in SQLite, and re-read every ``sync_interval``
+    seconds so workers see each other's usage.
+    """
+
+    def __init__(
+        self,
+        keys: list[tuple[str, int]],
+        db_path: str | None,
+        state: SharedState | None = None,
+        sync_interval: float = 1.0
+    ):
+        self.keys = [ApiKey(value, quota) for value, quota in dict(keys).items()]
+        self.period = current_period()
+        self._lock = threading.Lock()
+        self.state = state
+        self.sync_interval = sync_interval
+        self._synced_at = time.monotonic()
+        self.db = None
+        if db_path and state is None:
+            if os.path.dirname(db_path):
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS key_usage ("
+                " key_id TEXT NOT NULL, period TEXT NOT NULL, used INTEGER NOT NULL DEFAULT 0,"
+                " remaining INTEGER, retired_until REAL, PRIMARY KEY (key_id, period))"
+            )
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _state_keys(self, key: ApiKey) -> list[str]:
+        return [f"keys:{self.period}:{key.id}:{field}" for field in ("used", "remaining", "retired_until")]
+
+    def _load(self):
+        self._synced_at = time.monotonic()
+        if self.state is not None:
+            values = self.state.get_many([name for key in self.keys for name in self._state_keys(key)])
+            for i, key in enumerate(self.keys):
+                used, remaining, retired_until = values[3 * i:3 * i + 3]
+                key.used = int(used) if used is not None else 0
+                key.remaining = int(remaining) if remaining is not None else None
+                key.retired_until = float(retired_until) if retired_until is not None else None
+            return
+        if self.db is None:
+            return
+        for key in self.keys:
+            key.used, key.remaining, key.retired_until = 0, None, None
+        rows = self.db.execute(
+            "SELECT key_id, used, remaining, retired_until FROM key_usage WHERE period = ?", (self.period,)
+        ).fetchall()
+        by_id = {row[0]: row[1:] for row in rows}
+        for key in self.keys:
+            if key.id in by_id:
+                key.used, key.remaining, key.retired_until = by_id[key.id]
+
+    def _persist(self, key: ApiKey, used: int = 0) -> int:
+        """Save the key's state, adding ``used`` credits; returns the period's total.
+
+        Usage is incremented in the store rather than overwritten, so API and
+        worker processes sharing it all count into the same totals.
+        """
+        if self.state is not None:
+            used_key, remaining_key, retired_key = self._state_keys(key)
+            for name, value in ((remaining_key, key.remaining), (retired_key, key.retired_until)):
+                if value is None:
+                    self.state.delete(name)
+                else:
+                    self.state.set(name, str(value).encode(), ttl=PERIOD_STATE_TTL)
+            return self.state.incr(used_key, used, ttl=PERIOD_STATE_TTL)
+        if self.db is None:
+            return key.used + used
+        return self.db.execute(
+            "INSERT INTO key_usage (key_id, period, used, remaining, retired_until) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (key_id, period) DO UPDATE SET used = used + excluded.used,"
+            " remaining = excluded.remaining, retired_until = excluded.retired_until"
+            " RETURNING used",
+            (key.id, self.period, used, key.remaining, key.retired_until),
+        ).fetchone()[0]
+
+    def _active(self, key: ApiKey, now: float) -> bool:
+        if key.retired_until is not None:
+            if key.retired_until > now:
+                return False
+            key.retired_until, key.remaining = None, None
+            self._persist(key)
+        return key.quota_left() > 0
+
+    def acquire(self) -> ApiKey:
+        """Pick a key for one upstream attempt; pair every call with :meth:`record` or :meth:`release`."""
+        now, mono = time.time(), time.monotonic()
+        with self._lock:
+            if current_period(now) != self.period:
+                self.period = current_period(now)
+                for key in self.keys:
+                    key.used, key.remaining, key.retired_until = 0, None, None
+                self._load()
+            elif mono - self._synced_at >= self.sync_interval:
+                self._load()
+            if not self.keys:
+                raise KeyPoolExhaustedError("No RapidAPI key configured (RAPIDAPI_KEY, RAPIDAPI_KEYS or RAPIDAPI_KEYS_FILE)")
+            active = [key for key in self.keys if self._active(key, now)]
+            if not active:
+                # Retired keys return at their reset, keys over the configured quota next period
+                returns = [
+                    key.retired_until if key.retired_until is not None else next_period_start(now) for key in self.keys
+                ]
+                raise KeyPoolExhaustedError("All RapidAPI keys are out of quota", min(returns) - now)
+            for key in active:
+                key.decay(mono)
+            ready = [key for key in active if key.throttled_until <= mono]
+            if ready:
+                # Weighted by quota left so keys drain evenly; keys without a known quota
+                # count as much as the best known one
+                known = [k.quota_left() for k in ready if k.quota_left() != math.inf]
+                unknown_quota = max(known) if known else 1.0
+                key = random.choices(ready, weights=[k.weight(unknown_quota) for k in ready])[0]
+            else:
+                # Every key is cooling down after a 429: use the one that recovers first
+                key = min(active, key=lambda k: k.throttled_until)
+            key.in_flight += 1
+            return key
+
+    def release(self, key: ApiKey):
+        with self._lock:
+            key.in_flight -= 1
+
+    def record(self, key: ApiKey, status: int, headers) -> bool:
+        """Account one answered attempt on ``key``.
+
+        Returns True when a 429 only throttled this key and another key can take
+        the retry, i.e. the shared rate limiter does not need to back off.
+        """
+        now, mono = time.time(), time.monotonic()
+        with self._lock:
+            key.in_flight -= 1
+            remaining = headers.get("x-ratelimit-requests-remaining")
+            if remaining is not None and remaining.isdigit():
+                key.remaining = int(remaining)
+            if status in REVOKED_STATUSES or (key.remaining is not None and key.remaining <= 0):
+                reset = parse_retry_after(headers.get("x-ratelimit-requests-reset"))
+                key.retired_until = now + reset if reset else next_period_start(now)
+            rerouted = False
+            if status == 429:
+                key.decay(mono)
+                key.recent_429s += 1
+                cooldown = parse_retry_after(headers.get("Retry-After")) or settings.RETRY_BASE_DELAY
+                key.throttled_until = mono + cooldown
+                rerouted = any(
+                    other is not key and other.throttled_until <= mono and self._active(other, now)
+                    for other in self.keys
+                )
+            key.used = self._persist(key, used=1)
+            return rerouted
+
+    def stats(self) -> dict:
+        now, mono = time.time(), time.monotonic()
+        with self._lock:
+            keys = []
+            for key in self.keys:
+                key.decay(mono)
+                quota_left = key.quota_left()
+                keys.append({
+                    "id": key.id,
+                    "used": key.used,
+                    "quota": key.quota or None,
+                    "remaining": None if quota_left == math.inf else quota_left,
+                    "retired": key.retired_until is not None and key.retired_until > now,
+                    "throttled": key.throttled_until > mono,
+                    "recent_429s": round(key.recent_429s, 3),
+                    "in_flight": key.in_flight,
+                })
+            return {"period": self.period, "keys": keys}
+
+
+def load_keys() -> list[tuple[str, int]]:
+    """``(key, monthly_quota)`` pairs from RAPIDAPI_KEYS_FILE, RAPIDAPI_KEYS or RAPIDAPI_KEY.
+
+    The file is either JSON (a list of keys or of ``{"key": ..., "quota": ...}``)
+    or plain text with one key per line.
+    """
+    default_quota = settings.RAPIDAPI_KEY_MONTHLY_QUOTA
+    if settings.RAPIDAPI_KEYS_FILE:
+        with open(settings.RAPIDAPI_KEYS_FILE, encoding="utf-8") as f:
+            content = f.read()
+        try:
+            entries = json.loads(content)
+        except ValueError:
+            entries = [line.strip() for line in content.splitlines() if line.strip() and not line.startswith("#")]
+        return [
+            (entry["key"], int(entry.get("quota", default_quota))) if isinstance(entry, dict) else (entry, default_quota)
+            for entry in entries
+        ]
+    if settings.RAPIDAPI_KEYS:
+        return [(key.strip(), default_quota) for key in settings.RAPIDAPI_KEYS.split(",") if key.strip()]
+    if settings.RAPIDAPI_KEY:
+        return [(settings.RAPIDAPI_KEY, default_quota)]
+    return []
+
+
+def build_key_pool(state: SharedState | None = None) -> KeyPool:
+    return KeyPool(load_keys(), settings.KEY_POOL_DB_PATH or None, state, settings.KEY_POOL_SYNC_INTERVAL)
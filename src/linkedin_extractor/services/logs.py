@@ -0,0 +1,26 @@
+import logging
+import random
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.jsonCodec import dumps
+
+logger = logging.getLogger("linkedin_extractor")
+
+
+def configure_logging():
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+
+
+def log_event(event: str, level: int = logging.INFO, sample_rate: float = 1.0, **fields):
+    """Log ``event`` with ``fields`` as one JSON object.
+
+    Hot-path events pass ``sample_rate`` < 1 so only that fraction is written.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    logger.log(level, dumps({"event": event, **fields}).decode("utf-8"))
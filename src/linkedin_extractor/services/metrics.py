@@ -0,0 +1,348 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Minimal Prometheus text-format metrics (no client library needed). Metrics are
+# process-wide; with several uvicorn workers each worker exposes its own.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PAGE_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if value == int(value):
+        return f"{name} {int(value)}"
+    return f"{name} {value}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> list[Sample]:
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> list[Sample]:
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                labels = self._labels(key)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket", {**labels, "le": str(bound)}, bucket_count))
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics: list[_Metric] = []
+        # Callbacks read at scrape time for state kept elsewhere (cache, single-flight)
+        self.collectors: list[Callable[[], Iterable[tuple[_Metric, list[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple[_Metric, list[Sample]]]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        families = [(metric, metric.samples()) for metric in self.metrics]
+        for collector in self.collectors:
+            families.extend(collector())
+        lines = []
+        for metric, samples in families:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(name, labels, value) for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "linkedin_upstream_requests_total",
+    "RapidAPI requests sent (each one is a credit), by endpoint type and HTTP status or 'error'",
+    ["endpoint", "status"],
+))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "linkedin_upstream_request_seconds",
+    "RapidAPI request latency per attempt",
+    ["endpoint"],
+))
+UPSTREAM_FAILURES = REGISTRY.register(Counter(
+    "linkedin_upstream_failures_total",
+    "Upstream requests that failed after retries were exhausted",
+    ["endpoint"],
+))
+UPSTREAM_BYTES = REGISTRY.register(Counter(
+    "linkedin_upstream_response_bytes_total",
+    "RapidAPI response body bytes as received ('wire') and after decompression ('decoded')",
+    ["endpoint", "stage"],
+))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "linkedin_upstream_in_flight",
+    "RapidAPI requests currently awaiting a response",
+    ["endpoint"],
+))
+UPSTREAM_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "linkedin_upstream_queue_wait_seconds",
+    "Time an upstream attempt waited for a scheduler slot, by lane",
+    ["lane"],
+))
+POSTS_PAGES = REGISTRY.register(Histogram(
+    "linkedin_posts_pages_fetched",
+    "Post pages walked per fetch_recent_posts_by_username call",
+    ["mode"],
+    buckets=PAGE_BUCKETS,
+))
+SCHEMA_MISMATCHES = REGISTRY.register(Counter(
+    "linkedin_schema_mismatches_total",
+    "Sampled trusted upstream items that failed strict validation",
+    ["model"],
+))
+SECTION_OUTCOMES = REGISTRY.register(Counter(
+    "linkedin_extract_sections_total",
+    "/extract-all sections by outcome: complete, timed_out, failed or skipped",
+    ["section", "status"],
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "linkedin_http_requests_in_flight",
+    "API requests currently being served",
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "linkedin_http_request_seconds",
+    "API request latency until the last body chunk is sent, by route",
+    ["route", "method", "status"],
+))
+
+
+# Families filled from stats() at scrape time, see register_cache / register_singleflight
+CACHE_LOOKUPS = Counter("linkedin_cache_lookups_total", "Response cache lookups by result", ["result"])
+CACHE_EVICTIONS = Counter("linkedin_cache_evictions_total", "Response cache evictions")
+CACHE_REVALIDATIONS = Counter(
+    "linkedin_cache_revalidations_total", "Expired cache entries renewed by a 304 from upstream"
+)
+CACHE_BYTES = Gauge("linkedin_cache_bytes", "Response cache size by tier", ["tier"])
+CACHE_ENTRIES = Gauge("linkedin_cache_entries", "Response cache entries by tier", ["tier"])
+SINGLEFLIGHT_EXECUTIONS = Counter(
+    "linkedin_singleflight_executions_total", "Calls that did the work themselves", ["manager"]
+)
+SINGLEFLIGHT_COALESCED = Counter(
+    "linkedin_singleflight_coalesced_total", "Calls that shared an in-flight execution", ["manager", "kind"]
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge("linkedin_singleflight_in_flight", "Keys currently executing", ["manager"])
+KEY_CREDITS = Counter("linkedin_key_credits_used_total", "Credits used this quota period per RapidAPI key id", ["key"])
+KEY_REMAINING = Gauge("linkedin_key_remaining", "Known quota left per RapidAPI key id", ["key"])
+KEY_ACTIVE = Gauge("linkedin_key_active", "1 while a key can be used, 0 once retired", ["key"])
+UPSTREAM_QUEUE_DEPTH = Gauge("linkedin_upstream_queue_depth", "Upstream attempts waiting for a slot by lane", ["lane"])
+UPSTREAM_LANE_IN_FLIGHT = Gauge(
+    "linkedin_upstream_lane_in_flight", "Scheduler slots held by upstream attempts by lane", ["lane"]
+)
+UPSTREAM_ADMISSIONS = Counter(
+    "linkedin_upstream_admissions_total",
+    "Upstream attempts by lane and admission: immediate, queued or rejected (queue full)",
+    ["lane", "outcome"],
+)
+JOBS = Gauge("linkedin_jobs", "Background jobs in the job store by status", ["status"])
+
+
+def register_cache(registry: Registry, cache):
+    def collect():
+        stats = cache.stats()
+        tiers = {"memory": stats["memory"], "disk": stats["disk"]}
+        return [
+            (CACHE_LOOKUPS, [
+                (CACHE_LOOKUPS.name, {"result": "hit"}, stats["hits"]),
+                (CACHE_LOOKUPS.name, {"result": "miss"}, stats["misses"]),
+            ]),
+            (CACHE_EVICTIONS, [(CACHE_EVICTIONS.name, {}, stats["evictions"])]),
+            (CACHE_REVALIDATIONS, [(CACHE_REVALIDATIONS.name, {}, stats["revalidations"])]),
+            # A shared tier does not know its own size
+            (CACHE_BYTES, [
+                (CACHE_BYTES.name, {"tier": tier}, s["bytes"]) for tier, s in tiers.items() if s and s["bytes"] is not None
+            ]),
+            (CACHE_ENTRIES, [
+                (CACHE_ENTRIES.name, {"tier": tier}, s["entries"])
+                for tier, s in tiers.items() if s and s["entries"] is not None
+            ]),
+        ]
+    registry.add_collector(collect)
+
+
+def register_singleflight(registry: Registry, flights: dict):
+    def collect():
+        executions, coalesced, in_flight = [], [], []
+        for manager, flight in flights.items():
+            if flight is None:
+                continue
+            stats = flight.stats()
+            executions.append((SINGLEFLIGHT_EXECUTIONS.name, {"manager": manager}, stats["executions"]))
+            in_flight.append((SINGLEFLIGHT_IN_FLIGHT.name, {"manager": manager}, stats["in_flight"]))
+            coalesced.extend(
+                (SINGLEFLIGHT_COALESCED.name, {"manager": manager, "kind": kind}, count)
+                for kind, count in stats["coalesced_by_kind"].items()
+            )
+        return [
+            (SINGLEFLIGHT_EXECUTIONS, executions),
+            (SINGLEFLIGHT_COALESCED, coalesced),
+            (SINGLEFLIGHT_IN_FLIGHT, in_flight),
+        ]
+    registry.add_collector(collect)
+
+
+def register_key_pool(registry: Registry, pool):
+    def collect():
+        keys = pool.stats()["keys"]
+        return [
+            (KEY_CREDITS, [(KEY_CREDITS.name, {"key": key["id"]}, key["used"]) for key in keys]),
+            (KEY_REMAINING, [
+                (KEY_REMAINING.name, {"key": key["id"]}, key["remaining"]) for key in keys if key["remaining"] is not None
+            ]),
+            (KEY_ACTIVE, [(KEY_ACTIVE.name, {"key": key["id"]}, 0 if key["retired"] else 1) for key in keys]),
+        ]
+    registry.add_collector(collect)
+
+
+def register_scheduler(registry: Registry, scheduler):
+    def collect():
+        lanes = scheduler.stats()["lanes"]
+        return [
+            (UPSTREAM_QUEUE_DEPTH, [(UPSTREAM_QUEUE_DEPTH.name, {"lane": lane}, s["queued"]) for lane, s in lanes.items()]),
+            (UPSTREAM_LANE_IN_FLIGHT, [
+                (UPSTREAM_LANE_IN_FLIGHT.name, {"lane": lane}, s["in_flight"]) for lane, s in lanes.items()
+            ]),
+            (UPSTREAM_ADMISSIONS, [
+                (UPSTREAM_ADMISSIONS.name, {"lane": lane, "outcome": outcome}, count)
+                for lane, s in lanes.items() for outcome, count in s["admissions"].items()
+            ]),
+        ]
+    registry.add_collector(collect)
+
+
+def register_job_store(registry: Registry, store):
+    def collect():
+        return [(JOBS, [(JOBS.name, {"status": status}, count) for status, count in store.counts().items()])]
+    registry.add_collector(collect)
+
+
+@contextmanager
+def upstream_timer(endpoint: str):
+    UPSTREAM_IN_FLIGHT.inc(endpoint=endpoint)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(endpoint=endpoint)
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+def posts_fetch_mode(syncing: bool, bounded: bool) -> str:
+    if syncing:
+        return "incremental"
+    return "bounded" if bounded else "full"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests and per-route latency.
+
+    Routes are labelled by their path template so labels stay bounded; streaming
+    responses are timed until their final chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
+            )
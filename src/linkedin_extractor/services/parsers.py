@@ -0,0 +1,270 @@
+import logging
+import random
+from datetime import datetime, timezone
+from typing import TypeVar
+from pydantic import BaseModel, RootModel, ValidationError
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import (
+    ProfileOutput,
+    PostData,
+    CommentsOutput,
+    LikesOutput,
+    CommentData,
+    LikeData,
+    PostCommentData
+)
+from src.linkedin_extractor.services.logs import log_event
+from src.linkedin_extractor.services.metrics import SCHEMA_MISMATCHES
+
+# Shared by the sync and async managers so both build the same paths and outputs.
+
+POSTS_PAGE_SIZE = 50
+POSTED_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+TRUSTED = settings.SCHEMA_VALIDATION == "trusted"
+
+M = TypeVar("M", bound=BaseModel)
+R = TypeVar("R", bound=RootModel)
+
+
+ENDPOINT_TYPES = {
+    "/": "profile",
+    "/get-profile-posts": "posts",
+    "/get-profile-comments": "comments",
+    "/get-profile-likes": "likes",
+    "/get-profile-posts-comments": "post_comments",
+    # Not an upstream path: parsed comment threads cached per urn, see post_comment_thread_key
+    "/post-comment-thread": "post_comments",
+}
+
+
+# Builders for the hot loops. Their inputs are dicts we shape ourselves, with every
+# field present, so in trusted mode they are constructed without validation.
+# Request inputs are always validated.
+
+def _check_sample(model: type[BaseModel], data) -> None:
+    # Trusted mode skips validation; a sample is still validated so upstream drift gets noticed
+    if random.random() >= settings.SCHEMA_VALIDATION_SAMPLE_RATE:
+        return
+    try:
+        model.model_validate(data)
+    except ValidationError as e:
+        SCHEMA_MISMATCHES.inc(model=model.__name__)
+        log_event(
+            "schema_mismatch",
+            logging.WARNING,
+            model=model.__name__,
+            errors=[{"loc": list(error["loc"]), "type": error["type"]} for error in e.errors()],
+        )
+
+
+def build(model: type[M], data: dict) -> M:
+    if TRUSTED:
+        _check_sample(model, data)
+        return model.model_construct(**data)
+    return model(**data)
+
+
+def build_list(model: type[R], item_model: type[BaseModel], items: list[dict]) -> R:
+    if TRUSTED:
+        _check_sample(model, items)
+        return model.model_construct([item_model.model_construct(**item) for item in items])
+    return model.model_validate(items)
+
+
+def endpoint_type(path: str) -> str:
+    return ENDPOINT_TYPES.get(path.split("?", 1)[0], "other")
+
+
+def profile_path(username: str) -> str:
+    return f"/?username={username}"
+
+
+def posts_path(username: str, start: int, pagination_token: str | None = None) -> str:
+    path = f"/get-profile-posts?username={username}&start={start}"
+    if pagination_token:
+        path += f"&paginationToken={pagination_token}"
+    return path
+
+
+def profile_comments_path(username: str) -> str:
+    return f"/get-profile-comments?username={username}"
+
+
+def profile_likes_path(username: str) -> str:
+    return f"/get-profile-likes?username={username}"
+
+
+def post_comment_thread_key(urn: str) -> str:
+    return f"/post-comment-thread?urn={urn}"
+
+
+def post_comments_path(urn: str, page: int, pagination_token: str | None = None) -> str:
+    path = f"/get-profile-posts-comments?urn={urn}&sort=mostRelevant&page={page}"
+    if pagination_token:
+        path += f"&paginationToken={pagination_token}"
+    return path
+
+
+def parse_profile(decoded_data: dict) -> ProfileOutput:
+    output_data = {
+        "headline": decoded_data.get("headline"),
+        "location": decoded_data.get("geo", {}).get("full"),
+        "job_title": None,
+        "company_name": None,
+    }
+
+    position = decoded_data.get("position", [])
+    first_position = position[0] if position else {}
+    output_data["job_title"] = first_position.get("title")
+    output_data["company_name"] = first_position.get("companyName")
+
+    return build(ProfileOutput, output_data)
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    # postedDate values are parsed as naive UTC; make caller-supplied bounds comparable
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_post(post: dict) -> tuple[datetime, bool, PostData] | None:
+    """Return ``(posted_at, is_repost, PostData)``, or None for posts without a usable date."""
+    posted_at_str = post.get("postedDate")
+    if not posted_at_str:
+        return None
+
+    try:
+        # POSTED_DATE_FORMAT prefix; fromisoformat parses it far faster than strptime
+        posted_at = datetime.fromisoformat(posted_at_str[:19])
+    except Exception:
+        return None
+
+    is_repost = "reposted" in post
+    original_text = None
+
+    if is_repost:
+        reshared = post.get("resharedPost", {})
+        original_text = reshared.get("text") or post.get("text")
+
+    base_data = {
+        "postedDate": posted_at_str,
+        "totalReactionCount": post.get("totalReactionCount"),
+        "commentsCount": post.get("commentsCount"),
+        "urn": post.get("urn"),
+        "text": post.get("text"),
+        "original_text": original_text
+    }
+
+    return posted_at, is_repost, build(PostData, base_data)
+
+
+def parse_posts_page(
+    raw_posts: list[dict],
+    cutoff: datetime,
+    posts: list[PostData],
+    reposts: list[PostData],
+    until: datetime | None = None,
+    max_posts: int | None = None
+) -> bool:
+    """Append one page of posts to ``posts``/``reposts``.
+
+    Posts newer than ``until`` are skipped. Returns True once ``cutoff`` is reached or
+    ``max_posts`` posts and reposts have been collected, i.e. when no more pages are needed.
+    """
+    for post in raw_posts:
+        parsed = parse_post(post)
+        if parsed is None:
+            continue
+
+        posted_at, is_repost, post_data = parsed
+        if posted_at < cutoff:
+            return True
+        if until is not None and posted_at > until:
+            continue
+
+        if is_repost:
+            reposts.append(post_data)
+        else:
+            posts.append(post_data)
+
+        if max_posts is not None and len(posts) + len(reposts) >= max_posts:
+            return True
+
+    return False
+
+
+def include_post(is_repost: bool, reposts: str) -> bool:
+    """Apply a ``reposts`` filter of ``include``, ``exclude`` or ``only``."""
+    if reposts == "exclude":
+        return not is_repost
+    if reposts == "only":
+        return is_repost
+    return True
+
+
+def parse_profile_comments(decoded_data: dict) -> CommentsOutput:
+    raw_comments = decoded_data.get("data", [])
+
+    output_data = [
+        {
+            "highlightedComments": item.get("highlightedComments")[0],
+            "text": item.get("text"),
+            "postedDate": item.get("postedDate"),
+            "commentedDate": item.get("commentedDate"),
+            "postUrl": item.get("postUrl"),
+        }
+        for item in raw_comments
+    ]
+
+    return build_list(CommentsOutput, CommentData, output_data)
+
+
+def parse_profile_likes(decoded_data: dict) -> LikesOutput:
+    items = decoded_data.get("data", {}).get("items", [])[:50]
+
+    output_data = [
+        {
+            "text": item.get("text"),
+            "action": item.get("action"),
+            "postedDate": item.get("postedDate"),
+            "totalReactionCount": item.get("totalReactionCount"),
+            "commentsCount": item.get("commentsCount")
+        }
+        for item in items
+    ]
+
+    return build_list(LikesOutput, LikeData, output_data)
+
+
+def parse_post_comments(data: list[dict], limit: int) -> list[str]:
+    comments = []
+    for item in data:
+        text = item.get("text")
+        if text:
+            comments.append(text)
+            if len(comments) >= limit:
+                break
+    return comments
+
+
+def parse_post_comment_records(data: list[dict], limit: int) -> list[PostCommentData]:
+    comments = []
+    for item in data:
+        if not item.get("text"):
+            continue
+        author = item.get("author") or {}
+        comments.append(build(PostCommentData, {
+            "text": item.get("text"),
+            "authorName": author.get("name"),
+            "authorUsername": author.get("username"),
+            "authorTitle": author.get("title"),
+            "authorUrl": author.get("linkedinUrl"),
+            "commentedDate": item.get("createdAtString"),
+            "totalReactionCount": (item.get("stats") or {}).get("totalReactions"),
+            "permalink": item.get("permalink"),
+        }))
+        if len(comments) >= limit:
+            break
+    return comments
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import PostData, PostOutput
+from src.linkedin_extractor.services.jsonCodec import loads
+from src.linkedin_extractor.services.parsers import POSTED_DATE_FORMAT, build
+
+
+class PostStore:
+    """Known posts per username, keyed by urn, used for incremental post syncs.
+
+    ``watermark`` is the newest ``postedDate`` stored for a username. Incremental
+    fetches stop paginating at the first page that contains an already-stored urn
+    or reaches back past the watermark.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            " username TEXT NOT NULL, urn TEXT NOT NULL, posted_at TEXT NOT NULL,"
+            " is_repost INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (username, urn))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " username TEXT PRIMARY KEY, watermark TEXT, synced_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def known_urns(self, username: str) -> set[str]:
+        with self._lock:
+            rows = self.db.execute("SELECT urn FROM posts WHERE username = ?", (username,)).fetchall()
+        return {row[0] for row in rows}
+
+    def watermark(self, username: str) -> str | None:
+        with self._lock:
+            row = self.db.execute("SELECT watermark FROM sync_state WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def cursor(self, username: str) -> "SyncCursor | None":
+        watermark = self.watermark(username)
+        if watermark is None:
+            return None
+        return SyncCursor(self.known_urns(username), watermark)
+
+    def merge(self, username: str, posts: list[PostData], reposts: list[PostData], cutoff: datetime):
+        rows = [
+            (username, post.urn, post.postedDate[:19], is_repost, post.model_dump_json())
+            for is_repost, items in ((0, posts), (1, reposts))
+            for post in items
+            if post.urn
+        ]
+        with self._lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(
+                    "INSERT INTO posts (username, urn, posted_at, is_repost, data) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (username, urn) DO UPDATE SET"
+                    " posted_at = excluded.posted_at, is_repost = excluded.is_repost, data = excluded.data",
+                    rows,
+                )
+                # Keep only the window callers ask for; older posts can never be returned again
+                self.db.execute(
+                    "DELETE FROM posts WHERE username = ? AND posted_at < ?",
+                    (username, cutoff.strftime(POSTED_DATE_FORMAT)),
+                )
+                watermark = self.db.execute(
+                    "SELECT MAX(posted_at) FROM posts WHERE username = ?", (username,)
+                ).fetchone()[0]
+                self.db.execute(
+                    "INSERT INTO sync_state (username, watermark, synced_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT (username) DO UPDATE SET"
+                    " watermark = excluded.watermark, synced_at = excluded.synced_at",
+                    (username, watermark, time.time()),
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def window(
+        self,
+        username: str,
+        cutoff: datetime,
+        until: datetime | None = None,
+        limit: int | None = None
+    ) -> PostOutput:
+        query = "SELECT is_repost, data FROM posts WHERE username = ? AND posted_at >= ?"
+        params = [username, cutoff.strftime(POSTED_DATE_FORMAT)]
+        if until is not None:
+            query += " AND posted_at <= ?"
+            params.append(until.strftime(POSTED_DATE_FORMAT))
+        query += " ORDER BY posted_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.db.execute(query, params).fetchall()
+        posts = []
+        reposts = []
+        for is_repost, data in rows:
+            (reposts if is_repost else posts).append(build(PostData, loads(data)))
+        return PostOutput(posts=posts, reposts=reposts)
+
+
+class SyncCursor:
+
+    def __init__(self, known_urns: set[str], watermark: str):
+        self.known_urns = known_urns
+        self.watermark = watermark
+
+    def reached(self, raw_posts: list[dict]) -> bool:
+        """True once a page overlaps what is already stored, so older pages can be skipped."""
+        if any(post.get("urn") in self.known_urns for post in raw_posts):
+            return True
+        oldest = raw_posts[-1].get("postedDate") if raw_posts else None
+        return bool(oldest) and oldest[:19] <= self.watermark
+
+
+def build_post_store() -> PostStore | None:
+    if not settings.POST_STORE_ENABLED:
+        return None
+    return PostStore(settings.POST_STORE_PATH)
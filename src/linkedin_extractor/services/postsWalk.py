@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from typing import Callable
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import PostData, PostOutput
+from src.linkedin_extractor.services.metrics import POSTS_PAGES, posts_fetch_mode
+from src.linkedin_extractor.services.parsers import parse_posts_page, to_naive_utc
+
+
+class PostsWalk:
+    """Window, bounds and incremental-sync decisions of one posts fetch, shared by the
+    blocking and async managers.
+
+    The managers walk ``pages(manager)`` and feed each page to ``add`` until it says
+    to stop; ``result`` merges into the post store and builds the output.
+    """
+
+    def __init__(
+        self,
+        post_store,
+        username: str,
+        incremental: bool = False,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        max_posts: int | None = None,
+        on_page: Callable[[list[PostData]], None] | None = None
+    ):
+        self.post_store = post_store
+        self.username = username
+        self.posts = []
+        self.reposts = []
+        self.pages_fetched = 0
+        self.window_start = datetime.utcnow() - timedelta(days=settings.POSTS_WINDOW_DAYS)
+        self.cutoff = to_naive_utc(since) if since else self.window_start
+        self.until = to_naive_utc(until) if until else None
+        self.max_posts = max_posts
+        self.bounded = since is not None or until is not None or max_posts is not None
+
+        # Incremental mode walks the default window but stops at the first page that
+        # overlaps posts stored by an earlier sync; bounds are applied to the stored result.
+        # The store only keeps that window, so a since before it falls back to a full walk.
+        self.syncing = incremental and post_store is not None and self.cutoff >= self.window_start
+        self.cursor = post_store.cursor(username) if self.syncing else None
+        if self.syncing:
+            self.walk_cutoff, self.walk_until, self.walk_limit = self.window_start, None, None
+        else:
+            self.walk_cutoff, self.walk_until, self.walk_limit = self.cutoff, self.until, max_posts
+        # Not called when syncing, where the output comes from the store rather than the pages walked
+        self.on_page = on_page if not self.syncing else None
+
+    def pages(self, manager):
+        # A sync must see upstream's current pages, not copies cached up to CACHE_TTL_POSTS ago
+        # (pages also shift as posts are added): revalidate them instead
+        return manager._revalidating() if self.syncing else manager
+
+    def add(self, raw_posts: list[dict]) -> bool:
+        """Parse one page; True once no more pages are needed."""
+        self.pages_fetched += 1
+        parsed_before = len(self.posts)
+        stop_fetching = parse_posts_page(
+            raw_posts, self.walk_cutoff, self.posts, self.reposts, self.walk_until, self.walk_limit
+        )
+        if self.on_page is not None and len(self.posts) > parsed_before:
+            self.on_page(self.posts[parsed_before:])
+        if self.cursor is not None and self.cursor.reached(raw_posts):
+            stop_fetching = True
+        return stop_fetching
+
+    def result(self) -> PostOutput:
+        POSTS_PAGES.observe(self.pages_fetched, mode=posts_fetch_mode(self.syncing, self.bounded))
+
+        # A bounded walk may have skipped posts, so only full walks are merged into the store
+        if self.post_store is not None and (self.syncing or not self.bounded):
+            self.post_store.merge(self.username, self.posts, self.reposts, self.window_start)
+            if self.syncing:
+                output = self.post_store.window(self.username, self.cutoff, self.until, self.max_posts)
+                output.pages_fetched = self.pages_fetched
+                return output
+
+        return PostOutput(posts=self.posts, reposts=self.reposts, pages_fetched=self.pages_fetched)
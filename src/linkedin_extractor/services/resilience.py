@@ -0,0 +1,207 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.sharedState import SharedState, SharedTokenBucket
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamHTTPError(ValueError):
+    """Upstream answered with a status that is neither data nor worth retrying."""
+
+    def __init__(self, status: int):
+        super().__init__(f"API request failed: HTTP {status}")
+        self.status = status
+
+
+class UpstreamUnavailableError(ValueError):
+    """Upstream kept failing (errors, 5xx, 429) until the retries were used up."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Upstream calls are failing fast; ``retry_after`` is the seconds until the next probe."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Upstream rate limiter shared by every session, thread and coroutine.
+
+    ``reserve()`` takes a token and returns how long the caller must wait before
+    using it, so the same bucket serves ``time.sleep`` and ``asyncio.sleep`` callers.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float):
+        # Called on 429 so every caller backs off together instead of one at a time
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float | None:
+        """Seconds to wait before retry number ``attempt``; None when the caller should give up."""
+        if attempt >= self.max_attempts:
+            return None
+        hinted = parse_retry_after(retry_after)
+        if hinted is not None:
+            return hinted if hinted <= self.max_delay else None
+        # Full jitter keeps retrying workers from re-synchronising into bursts
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails upstream calls fast after ``failure_threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds a single probe call is let through; its outcome
+    closes the circuit again or restarts the timeout.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                # Also re-probes if a half-open probe never reported back
+                self.state = "half_open"
+                self.opened_at = now
+                return
+            raise CircuitOpenError(
+                "API request failed: upstream circuit is open", self.reset_timeout - (now - self.opened_at)
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    """Rate limiting, retry and circuit-breaking policy applied around each upstream attempt.
+
+    Holds no per-request state, so one instance is shared by both managers and all sessions.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucket | SharedTokenBucket | None,
+        retry_policy: RetryPolicy,
+        circuit_breaker: CircuitBreaker | None
+    ):
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+
+    def before_attempt(self) -> float:
+        """Raise if the circuit is open, otherwise return the rate-limit wait in seconds."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.allow()
+        return self.rate_limiter.reserve() if self.rate_limiter is not None else 0.0
+
+    def after_response(self, status: int, retry_after: str | None, throttle_all: bool = True) -> bool:
+        """Record an upstream response; True when it should be retried.
+
+        ``throttle_all=False`` skips pausing the shared limiter on a 429, for when
+        only one key was throttled and the retry can go out on another.
+        """
+        if status == 429:
+            if self.rate_limiter is not None and throttle_all:
+                self.rate_limiter.pause(parse_retry_after(retry_after) or self.retry_policy.base_delay)
+            return True
+        if self.circuit_breaker is not None:
+            if status >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+        return status in RETRYABLE_STATUSES
+
+    def after_error(self):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+
+    def retry_delay(self, attempt: int, retry_after: str | None = None) -> float | None:
+        return self.retry_policy.delay(attempt, retry_after)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def build_upstream_guard(keys: int = 1, state: SharedState | None = None) -> UpstreamGuard:
+    return UpstreamGuard(build_rate_limiter(keys, state), build_retry_policy(), build_circuit_breaker())
+
+
+def build_rate_limiter(keys: int = 1, state: SharedState | None = None) -> TokenBucket | SharedTokenBucket | None:
+    # The configured limit is per RapidAPI key; a key pool multiplies it. With shared
+    # state the bucket is shared too, so the limit holds across all workers.
+    if settings.RAPIDAPI_RATE_LIMIT <= 0:
+        return None
+    keys = max(keys, 1)
+    if state is not None:
+        return SharedTokenBucket(state, "upstream", settings.RAPIDAPI_RATE_LIMIT * keys, settings.RAPIDAPI_BURST * keys)
+    return TokenBucket(settings.RAPIDAPI_RATE_LIMIT * keys, settings.RAPIDAPI_BURST * keys)
+
+
+def build_retry_policy() -> RetryPolicy:
+    return RetryPolicy(settings.RETRY_MAX_ATTEMPTS, settings.RETRY_BASE_DELAY, settings.RETRY_MAX_DELAY)
+
+
+def build_circuit_breaker() -> CircuitBreaker | None:
+    if settings.CIRCUIT_FAILURE_THRESHOLD <= 0:
+        return None
+    return CircuitBreaker(settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT)
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.aggregation import DeadlineExceededError
+from src.linkedin_extractor.services.metrics import UPSTREAM_QUEUE_WAIT
+
+# Interactive API routes vs. /extract-batch and background jobs
+LANES = ("interactive", "bulk")
+
+
+class UpstreamBusyError(ValueError):
+    """A lane's queue is full: the request is refused instead of waiting behind it."""
+
+    def __init__(self, lane: str):
+        super().__init__(f"API request refused: upstream {lane} queue is full")
+        self.lane = lane
+
+
+class _Waiter:
+    __slots__ = ("lane", "notify", "granted", "enqueued")
+
+    def __init__(self, lane: str, notify):
+        self.lane = lane
+        self.notify = notify
+        self.granted = False
+        self.enqueued = time.monotonic()
+
+
+class UpstreamScheduler:
+    """Weighted priority lanes in front of upstream attempts.
+
+    At most ``capacity`` attempts (0: unlimited) are in flight; the last
+    ``reserved`` slots only go to the interactive lane, so bulk traffic cannot
+    take all of them. Freed slots go to the waiting lanes by smooth weighted
+    round-robin on ``weights``, and a lane whose queue holds ``queue_limits[lane]``
+    waiters (0: unlimited) refuses new ones with :class:`UpstreamBusyError`.
+
+    Serves threads and event loops alike; one instance is shared by both managers.
+    Lanes are per process: with several workers the shared rate limiter still caps
+    their combined rate.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        weights: dict[str, int],
+        queue_limits: dict[str, int] | None = None,
+        reserved: int = 0
+    ):
+        self.capacity = capacity
+        self.weights = {lane: max(1, weights.get(lane, 1)) for lane in LANES}
+        self.queue_limits = queue_limits or {}
+        self.reserved = reserved if capacity > 0 else 0
+        self.in_flight = dict.fromkeys(LANES, 0)
+        self.admissions = {lane: {"immediate": 0, "queued": 0, "rejected": 0} for lane in LANES}
+        self._queues = {lane: deque() for lane in LANES}
+        self._credits = dict.fromkeys(LANES, 0)
+        self._lock = threading.Lock()
+
+    def _can_start(self, lane: str) -> bool:
+        if self.capacity <= 0:
+            return True
+        limit = self.capacity if lane == "interactive" else self.capacity - self.reserved
+        return sum(self.in_flight.values()) < limit
+
+    def _enqueue(self, lane: str, notify) -> _Waiter | None:
+        """Take a slot right away (None) or queue a waiter for one."""
+        if lane not in self._queues:
+            raise ValueError(f"Unknown lane: {lane}")
+        with self._lock:
+            if not self._queues[lane] and self._can_start(lane):
+                self.in_flight[lane] += 1
+                self.admissions[lane]["immediate"] += 1
+                UPSTREAM_QUEUE_WAIT.observe(0, lane=lane)
+                return None
+            limit = self.queue_limits.get(lane, 0)
+            if limit and len(self._queues[lane]) >= limit:
+                self.admissions[lane]["rejected"] += 1
+                raise UpstreamBusyError(lane)
+            waiter = _Waiter(lane, notify)
+            self._queues[lane].append(waiter)
+            self.admissions[lane]["queued"] += 1
+            return waiter
+
+    def _dispatch(self) -> list[_Waiter]:
+        # Called with the lock held; returns the waiters to wake once it is released
+        woken = []
+        while True:
+            ready = [lane for lane in LANES if self._queues[lane] and self._can_start(lane)]
+            if not ready:
+                return woken
+            total = sum(self.weights[lane] for lane in ready)
+            for lane in ready:
+                self._credits[lane] += self.weights[lane]
+            lane = max(ready, key=lambda name: self._credits[name])
+            self._credits[lane] -= total
+            waiter = self._queues[lane].popleft()
+            waiter.granted = True
+            self.in_flight[lane] += 1
+            woken.append(waiter)
+
+    def release(self, lane: str):
+        with self._lock:
+            self.in_flight[lane] -= 1
+            woken = self._dispatch()
+        for waiter in woken:
+            UPSTREAM_QUEUE_WAIT.observe(time.monotonic() - waiter.enqueued, lane=waiter.lane)
+            waiter.notify()
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Take ``waiter`` out of its queue; True if it was granted a slot meanwhile."""
+        with self._lock:
+            if not waiter.granted:
+                self._queues[waiter.lane].remove(waiter)
+            return waiter.granted
+
+    @contextmanager
+    def slot(self, lane: str = "interactive", deadline: float | None = None):
+        """Hold an upstream slot; raises DeadlineExceededError if none is free by
+        the ``time.monotonic()`` ``deadline``."""
+        event = threading.Event()
+        waiter = self._enqueue(lane, event.set)
+        if waiter is not None:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(timeout) and not self._withdraw(waiter):
+                raise DeadlineExceededError(f"No upstream slot free before the deadline ({lane} lane)")
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    @asynccontextmanager
+    async def async_slot(self, lane: str = "interactive", deadline: float | None = None):
+        """Async :meth:`slot`."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._enqueue(lane, lambda: loop.call_soon_threadsafe(_resolve, future))
+        if waiter is not None:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                async with asyncio.timeout(timeout):
+                    await future
+            except TimeoutError:
+                if not self._withdraw(waiter):
+                    raise DeadlineExceededError(f"No upstream slot free before the deadline ({lane} lane)") from None
+            except asyncio.CancelledError:
+                if self._withdraw(waiter):
+                    # Granted while being cancelled: hand the slot on
+                    self.release(lane)
+                raise
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "lanes": {
+                    lane: {
+                        "queued": len(self._queues[lane]),
+                        "in_flight": self.in_flight[lane],
+                        "weight": self.weights[lane],
+                        "queue_limit": self.queue_limits.get(lane, 0),
+                        "admissions": dict(self.admissions[lane]),
+                    }
+                    for lane in LANES
+                },
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _lane_settings(value: str) -> dict[str, int]:
+    # "interactive=4,bulk=1"
+    parsed = {}
+    for entry in value.split(","):
+        name, _, number = entry.partition("=")
+        if name.strip() and number.strip():
+            parsed[name.strip()] = int(number)
+    return parsed
+
+
+def build_upstream_scheduler() -> UpstreamScheduler:
+    return UpstreamScheduler(
+        settings.UPSTREAM_CONCURRENCY,
+        _lane_settings(settings.UPSTREAM_LANE_WEIGHTS),
+        _lane_settings(settings.UPSTREAM_LANE_QUEUE_LIMITS),
+        settings.UPSTREAM_INTERACTIVE_RESERVED,
+    )
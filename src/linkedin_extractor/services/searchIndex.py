@@ -0,0 +1,230 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pydantic import BaseModel
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import CommentData, LikeData, PostData
+from src.linkedin_extractor.services.jsonCodec import loads
+from src.linkedin_extractor.services.snapshotStore import (
+    ITEM_KEY_VERSION,
+    ITEM_MODELS,
+    RecordedResults,
+    item_key,
+    records_result,
+    result_items,
+    utc_timestamp
+)
+
+SEARCH_KINDS = ("post", "repost", "comment", "like")
+SEARCH_SORTS = ("relevance", "recent")
+
+
+class SearchIndex:
+    """Local full-text index (SQLite FTS5) of the posts, comments and likes extracted per username.
+
+    Items are upserted by (username, kind, key) as they are fetched; an item is
+    rewritten only when its content changed, and FTS5 is kept in sync by triggers.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY, username TEXT NOT NULL, kind TEXT NOT NULL, item_key TEXT NOT NULL,
+                item_date REAL, body TEXT NOT NULL, content_hash TEXT NOT NULL, data TEXT NOT NULL,
+                indexed_at REAL NOT NULL, UNIQUE (username, kind, item_key));
+            CREATE INDEX IF NOT EXISTS documents_date ON documents (item_date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                body, content='documents', content_rowid='id', tokenize='unicode61 remove_diacritics 2');
+            CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts (rowid, body) VALUES (new.id, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, body) VALUES ('delete', old.id, old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE OF body ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, body) VALUES ('delete', old.id, old.body);
+                INSERT INTO documents_fts (rowid, body) VALUES (new.id, new.body);
+            END;
+            """
+        )
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < ITEM_KEY_VERSION:
+            self._rekey()
+        self._lock = threading.Lock()
+        self.recorded = RecordedResults()
+
+    def record(self, username: str, result: BaseModel):
+        # Unchanged results (cache hits, repeated extractions) are skipped without touching SQLite
+        recorded = self.recorded.digest(username, result)
+        if recorded is None:
+            return
+        now = time.time()
+        rows = []
+        for kind, item in result_items(result):
+            body = _body(item)
+            if kind not in SEARCH_KINDS or not body:
+                continue
+            data = item.model_dump_json()
+            content_hash = hashlib.sha1(data.encode("utf-8")).hexdigest()
+            rows.append((username, kind, item_key(kind, item), _item_date(item), body, content_hash, data, now))
+        if not rows:
+            self.recorded.remember(*recorded)
+            return
+        with self._lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(
+                    "INSERT INTO documents (username, kind, item_key, item_date, body, content_hash, data, indexed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (username, kind, item_key) DO UPDATE SET"
+                    " item_date = excluded.item_date, body = excluded.body, content_hash = excluded.content_hash,"
+                    " data = excluded.data, indexed_at = excluded.indexed_at"
+                    " WHERE content_hash != excluded.content_hash",
+                    rows,
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        self.recorded.remember(*recorded)
+
+    def _rekey(self):
+        # Older indexes keyed likes by content (one document per counter change) and
+        # comments by post: re-key them, keeping the newest document per identity
+        self.db.execute("BEGIN")
+        try:
+            rows = self.db.execute(
+                "SELECT id, username, kind, data FROM documents WHERE kind IN ('comment', 'like')"
+                " ORDER BY indexed_at DESC, id DESC"
+            ).fetchall()
+            seen = set()
+            for row_id, username, kind, data in rows:
+                key = item_key(kind, ITEM_MODELS[kind].model_validate_json(data))
+                if (username, kind, key) in seen:
+                    self.db.execute("DELETE FROM documents WHERE id = ?", (row_id,))
+                else:
+                    seen.add((username, kind, key))
+                    self.db.execute("UPDATE documents SET item_key = ? WHERE id = ?", (key, row_id))
+            self.db.execute(f"PRAGMA user_version = {ITEM_KEY_VERSION}")
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def search(
+        self,
+        query: str,
+        username: str | None = None,
+        kinds: list[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        sort: str = "relevance",
+        limit: int = 50,
+        offset: int = 0
+    ) -> list[dict]:
+        """Items matching every term of ``query``, best match (or newest) first.
+
+        Terms are matched as words (hashtags too, without the ``#``); a trailing ``*``
+        matches a prefix. Dates are the post, comment or like date, UTC when naive.
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = (
+            "SELECT d.username, d.kind, d.item_date, d.data,"
+            " snippet(documents_fts, 0, '[', ']', '…', 16), bm25(documents_fts)"
+            " FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid"
+            " WHERE documents_fts MATCH ?"
+        )
+        params: list = [match]
+        if username is not None:
+            sql += " AND d.username = ?"
+            params.append(username)
+        if kinds:
+            sql += f" AND d.kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        if since is not None:
+            sql += " AND d.item_date >= ?"
+            params.append(utc_timestamp(since))
+        if until is not None:
+            sql += " AND d.item_date <= ?"
+            params.append(utc_timestamp(until))
+        sql += " ORDER BY d.item_date DESC" if sort == "recent" else " ORDER BY bm25(documents_fts)"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [
+            {
+                "username": row_username,
+                "kind": kind,
+                "date": datetime.fromtimestamp(item_date, timezone.utc) if item_date is not None else None,
+                "snippet": snippet,
+                # bm25 is lower for better matches
+                "score": round(-score, 4),
+                "item": loads(data),
+            }
+            for row_username, kind, item_date, data, snippet, score in rows
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.db.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+        return {kind: counts.get(kind, 0) for kind in SEARCH_KINDS}
+
+
+def fts_query(query: str) -> str | None:
+    """FTS5 MATCH expression for free text: every word must match, ``word*`` as a prefix.
+
+    Words are quoted so punctuation and FTS5 operators in user input are taken literally.
+    """
+    terms = []
+    for word in query.split():
+        # Tokens as the unicode61 tokenizer sees them, so "#python" finds "python"
+        tokens = [f'"{token}"' for token in re.findall(r"\w+", word)]
+        if tokens and word.endswith("*"):
+            tokens[-1] += "*"
+        terms.extend(tokens)
+    return " ".join(terms) or None
+
+
+def _body(item: BaseModel) -> str:
+    if isinstance(item, PostData):
+        parts = (item.text, item.original_text)
+    elif isinstance(item, CommentData):
+        parts = (item.highlightedComments, item.text)
+    elif isinstance(item, LikeData):
+        parts = (item.text,)
+    else:
+        parts = ()
+    return "\n".join(part for part in parts if part)
+
+
+def _item_date(item: BaseModel) -> float | None:
+    value = getattr(item, "commentedDate", None) or getattr(item, "postedDate", None)
+    if not value:
+        return None
+    try:
+        # Same prefix the post parser reads; upstream dates are UTC
+        return datetime.fromisoformat(value[:19]).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+indexed = records_result("search_index")
+
+
+def build_search_index() -> SearchIndex | None:
+    if not settings.SEARCH_INDEX_ENABLED:
+        return None
+    return SearchIndex(settings.SEARCH_INDEX_PATH)
@@ -0,0 +1,405 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from src.linkedin_extractor.config.config import settings
+
+# redis is optional (pip install "linkedin-extractor[redis]"); SHARED_STATE_URL=local needs no server.
+try:
+    import redis
+except ImportError:
+    redis = None
+
+SHARED_STATE_BACKENDS = ("", "sqlite", "redis")
+# Deletes KEYS[1] only while it still holds ARGV[1], in one round trip
+COMPARE_AND_DELETE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class SharedState:
+    """Key-value store visible to every worker process.
+
+    The operations are the subset of Redis the shared cache, rate limiter, key pool
+    and cross-worker single-flight need; ``ttl`` is in seconds and None means the
+    key does not expire. ``incr`` only sets the ttl when it creates the key.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        raise NotImplementedError
+
+    def set_if_absent(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        """Delete ``key`` only if it holds ``value``, atomically."""
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        raise NotImplementedError
+
+
+class SQLiteState(SharedState):
+    """Single-host backend: one WAL-mode SQLite file that every worker opens."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value, expires_at REAL)")
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._purge()
+
+    def _purge(self):
+        self.db.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+
+    def _written(self):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._purge()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl if ttl else None),
+            )
+            self._written()
+
+    def set_if_absent(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        now = time.time()
+        with self._lock:
+            row = self.db.execute(
+                "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"
+                " WHERE state.expires_at <= ?"
+                " RETURNING key",
+                (key, value, now + ttl if ttl else None, now),
+            ).fetchone()
+            self._written()
+        return row is not None
+
+    def delete(self, key: str):
+        with self._lock:
+            self.db.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        with self._lock:
+            return self.db.execute("DELETE FROM state WHERE key = ? AND value = ?", (key, value)).rowcount > 0
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        now = time.time()
+        with self._lock:
+            # An expired row counts as absent: it restarts from ``amount`` with a new ttl
+            row = self.db.execute(
+                "INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                "  value = CASE WHEN state.expires_at <= ? THEN excluded.value ELSE state.value + excluded.value END,"
+                "  expires_at = CASE WHEN state.expires_at <= ? THEN excluded.expires_at ELSE state.expires_at END"
+                " RETURNING value",
+                (key, amount, now + ttl if ttl else None, now, now),
+            ).fetchone()
+            self._written()
+        return int(row[0])
+
+
+class RedisState(SharedState):
+    """Multi-host backend on any client with redis-py's get/mget/set/delete/incrby/pexpire/eval."""
+
+    def __init__(self, client, prefix: str = "linkedin_extractor:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return self.client.mget([self.prefix + key for key in keys]) if keys else []
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        self.client.set(self.prefix + key, value, px=_milliseconds(ttl))
+
+    def set_if_absent(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        return bool(self.client.set(self.prefix + key, value, px=_milliseconds(ttl), nx=True))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        return bool(self.client.eval(COMPARE_AND_DELETE, 1, self.prefix + key, value))
+
+    def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        value = self.client.incrby(self.prefix + key, amount)
+        if ttl and value == amount:
+            self.client.pexpire(self.prefix + key, _milliseconds(ttl))
+        return value
+
+
+def _milliseconds(ttl: float | None) -> int | None:
+    return max(1, int(ttl * 1000)) if ttl else None
+
+
+class LocalRedis:
+    """In-process stand-in for the redis-py client methods :class:`RedisState` uses.
+
+    Nothing is shared between processes: it is for a single worker, development
+    and tests (SHARED_STATE_URL=local).
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, name: str, now: float) -> bytes | None:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[name]
+            return None
+        return value
+
+    def get(self, name: str) -> bytes | None:
+        with self._lock:
+            return self._live(name, time.time())
+
+    def mget(self, names: list[str]) -> list[bytes | None]:
+        with self._lock:
+            now = time.time()
+            return [self._live(name, now) for name in names]
+
+    def set(self, name: str, value, ex: float | None = None, px: int | None = None, nx: bool = False) -> bool | None:
+        now = time.time()
+        with self._lock:
+            if nx and self._live(name, now) is not None:
+                return None
+            ttl = px / 1000 if px else ex
+            self._data[name] = (_encode(value), now + ttl if ttl else None)
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def incrby(self, name: str, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            current = self._live(name, now)
+            expires_at = self._data[name][1] if current is not None else None
+            value = int(current or 0) + amount
+            self._data[name] = (_encode(value), expires_at)
+            return value
+
+    def pexpire(self, name: str, milliseconds: int) -> bool:
+        with self._lock:
+            if self._live(name, time.time()) is None:
+                return False
+            self._data[name] = (self._data[name][0], time.time() + milliseconds / 1000)
+            return True
+
+    def eval(self, script: str, numkeys: int, *keys_and_args) -> int:
+        # Only the scripts RedisState runs
+        if script != COMPARE_AND_DELETE:
+            raise NotImplementedError("LocalRedis only evaluates COMPARE_AND_DELETE")
+        name, value = keys_and_args
+        with self._lock:
+            if self._live(name, time.time()) != _encode(value):
+                return 0
+            del self._data[name]
+            return 1
+
+
+async def offloaded(fn, *args, undo=None):
+    """Run a blocking shared-state call in a worker thread, off the event loop.
+
+    Cancelling the caller does not stop the thread: ``undo`` is then called (in a
+    thread too) with the call's result once it finishes, to hand back a claim or
+    key the call took.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if undo is not None:
+            loop = asyncio.get_running_loop()
+
+            def undo_result(done):
+                if not done.cancelled() and done.exception() is None:
+                    loop.run_in_executor(None, undo, done.result())
+
+            future.add_done_callback(undo_result)
+        raise
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class SharedTokenBucket:
+    """Cross-worker counterpart of :class:`~resilience.TokenBucket` (same ``reserve``/``pause``).
+
+    Generic cell rate algorithm on one counter: each reservation advances the
+    bucket's theoretical arrival time by ``1 / rate`` with an atomic ``incr`` and
+    waits until that time is within ``burst`` intervals of now.
+    """
+
+    def __init__(self, state: SharedState, name: str, rate: float, burst: int):
+        self.state = state
+        self.key = f"rate:{name}:tat"
+        self.paused_key = f"rate:{name}:paused_until"
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.interval = max(1, int(1_000_000 / rate))
+
+    def reserve(self) -> float:
+        now = int(time.time() * 1_000_000)
+        tat = self.state.incr(self.key, self.interval)
+        if tat - self.interval < now:
+            # Idle long enough to refill: restart the schedule from now. Workers racing
+            # here each get a token, so at most one extra token per worker leaks.
+            self.state.set(self.key, str(now + self.interval).encode(), ttl=3600)
+            wait = 0.0
+        else:
+            wait = max(0, tat - self.burst * self.interval - now) / 1_000_000
+        paused_until = self.state.get(self.paused_key)
+        if paused_until is not None:
+            wait = max(wait, float(paused_until) - time.time())
+        return wait
+
+    def pause(self, seconds: float):
+        until = time.time() + seconds
+        current = self.state.get(self.paused_key)
+        if current is None or float(current) < until:
+            self.state.set(self.paused_key, str(until).encode(), ttl=seconds)
+
+
+class SharedFlight:
+    """Cross-worker single-flight for upstream paths, on top of the shared response cache.
+
+    The worker that claims a path fetches it; the others poll the cache until the
+    result shows up or the claim is released (the fetch failed) or expires, and
+    then claim it themselves.
+    """
+
+    def __init__(self, state: SharedState, lease: float, poll_interval: float = 0.05):
+        self.state = state
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.token = uuid.uuid4().hex.encode()
+
+    def claim(self, path: str) -> bool:
+        return self.state.set_if_absent(f"flight:{path}", self.token, ttl=self.lease)
+
+    def release(self, path: str):
+        # Only our own claim: once the lease expired another worker may hold the path
+        self.state.delete_if_equal(f"flight:{path}", self.token)
+
+    def wait(self, path: str, cache) -> bytes | None:
+        """Claim ``path`` (returns None) or wait for another worker's cached result."""
+        while not self.claim(path):
+            time.sleep(self.poll_interval)
+            cached = cache.get(path, count_miss=False)
+            if cached is not None:
+                return cached
+        return None
+
+    async def async_wait(self, path: str, cache) -> bytes | None:
+        # Claims and shared cache reads are round trips to the state: made from a thread
+        while not await offloaded(self.claim, path, undo=lambda claimed: claimed and self.release(path)):
+            await asyncio.sleep(self.poll_interval)
+            cached = await offloaded(cache.get, path, False)
+            if cached is not None:
+                return cached
+        return None
+
+    async def async_release(self, path: str):
+        await offloaded(self.release, path)
+
+
+class SharedCacheTier:
+    """Response cache tier kept in the shared state, in place of the per-host disk tier."""
+
+    def __init__(self, state: SharedState):
+        self.state = state
+        self.hits = 0
+
+    def _entry(self, key: str, now: float) -> tuple | None:
+        raw = self.state.get(f"cache:{key}")
+        if raw is None:
+            return None
+        header, _, value = raw.partition(b"\n")
+        meta = json.loads(header)
+        # Entries written before stale_until was stored stay until their expiry
+        return value, meta["expires_at"], meta.get("stale_until", meta["expires_at"]), meta["validators"]
+
+    def get(self, key: str, now: float) -> tuple[bytes, float, float, dict | None] | None:
+        entry = self._entry(key, now)
+        if entry is None or entry[1] <= now:
+            return None
+        self.hits += 1
+        return entry
+
+    def stale(self, key: str, now: float) -> tuple[bytes, dict] | None:
+        entry = self._entry(key, now)
+        if entry is None or not entry[3]:
+            return None
+        return entry[0], entry[3]
+
+    def set(self, key: str, value: bytes, expires_at: float, stale_until: float, now: float, validators: dict | None = None):
+        header = json.dumps(
+            {"expires_at": expires_at, "stale_until": stale_until, "validators": validators}
+        ).encode("utf-8")
+        self.state.set(f"cache:{key}", header + b"\n" + value, ttl=max(stale_until - now, 0.001))
+
+    def delete(self, key: str):
+        self.state.delete(f"cache:{key}")
+
+    def stats(self) -> dict:
+        # Size and evictions are the backend's (e.g. Redis maxmemory); only this worker's hits are known
+        return {"entries": None, "bytes": None, "hits": self.hits, "evictions": 0}
+
+
+def shared_cache_tier(state: SharedState | None) -> SharedCacheTier | None:
+    # With SQLite the cache's own disk tier is already a file every worker on the host opens
+    return SharedCacheTier(state) if isinstance(state, RedisState) else None
+
+
+def build_shared_state() -> SharedState | None:
+    backend = settings.SHARED_STATE_BACKEND
+    if backend not in SHARED_STATE_BACKENDS:
+        raise ValueError(f"SHARED_STATE_BACKEND must be one of {SHARED_STATE_BACKENDS[1:]} or empty")
+    if backend == "sqlite":
+        return SQLiteState(settings.SHARED_STATE_PATH)
+    if backend == "redis":
+        if settings.SHARED_STATE_URL == "local":
+            return RedisState(LocalRedis())
+        if redis is None:
+            raise ValueError("SHARED_STATE_BACKEND=redis needs redis (pip install 'linkedin-extractor[redis]')")
+        return RedisState(redis.Redis.from_url(settings.SHARED_STATE_URL))
+    return None
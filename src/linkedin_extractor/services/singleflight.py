@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _FlightStats:
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = Counter()
+
+    def _kind(self, key: Hashable) -> str:
+        return key[0] if isinstance(key, tuple) else str(key)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": sum(self.coalesced.values()),
+            "coalesced_by_kind": dict(self.coalesced),
+        }
+
+
+class AsyncSingleFlight(_FlightStats):
+    """Runs one coroutine per key at a time; concurrent callers with the same key await its result.
+
+    The shared work runs in its own task, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced[self._kind(key)] += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._finish, key))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone away
+
+
+class SingleFlight(_FlightStats):
+    """Thread-based counterpart of :class:`AsyncSingleFlight` for the blocking manager."""
+
+    def __init__(self):
+        super().__init__()
+        self._calls: dict[Hashable, "_Call"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.executions += 1
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced[self._kind(key)] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _call_key(method, session, args: tuple, kwargs: dict) -> tuple:
+    # Callbacks such as on_page are new closures on every call: leave them out of the
+    # key, or identical requests would never meet. Only the leader's callbacks run.
+    args = tuple(None if callable(arg) else arg for arg in args)
+    kwargs = tuple(sorted((name, None if callable(value) else value) for name, value in kwargs.items()))
+    return method.__name__, session.cache_mode, session.lane, args, kwargs
+
+
+def coalesce(method):
+    """Share one execution of a manager ``fetch_*`` method between identical concurrent calls.
+
+    Works on both managers; the key includes the session's cache mode so a ``refresh``
+    call never joins one that may be served from cache, and its scheduler lane so an
+    interactive call never waits behind a bulk one queued for an upstream slot.
+    Callable arguments are not part of the key: a call that joins another gets its
+    result without its own callbacks being called.
+    """
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            if self.singleflight is None:
+                return await method(self, *args, **kwargs)
+            key = _call_key(method, self, args, kwargs)
+            return await self.singleflight.do(key, lambda: method(self, *args, **kwargs))
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.singleflight is None:
+            return method(self, *args, **kwargs)
+        key = _call_key(method, self, args, kwargs)
+        return self.singleflight.do(key, lambda: method(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,376 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator
+from pydantic import BaseModel, RootModel
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import (
+    ProfileOutput,
+    PostData,
+    PostOutput,
+    CommentData,
+    LikeData
+)
+from src.linkedin_extractor.services.jsonCodec import dumps, loads
+
+# pyarrow is optional (pip install "linkedin-extractor[export]"); without it exports are gzipped NDJSON.
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_KINDS = {
+    "profiles": (("profile",), ProfileOutput),
+    "posts": (("post", "repost"), PostData),
+    "comments": (("comment",), CommentData),
+    "likes": (("like",), LikeData),
+}
+EXPORT_FORMATS = ("auto", "parquet", "arrow", "ndjson")
+# format -> (media type, file extension)
+EXPORT_MEDIA_TYPES = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "ndjson": ("application/gzip", "ndjson.gz"),
+}
+EXPORT_BATCH_ROWS = 5000
+# Item identities changed in version 1 (see item_key); older stores are re-keyed on open
+ITEM_KEY_VERSION = 1
+# Version 2 dedupes against an item's latest version only, dropping the unique content hash
+LATEST_VERSION_DEDUPE = 2
+RECORDED_RESULTS_MAX = 10000
+SNAPSHOTS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS snapshots ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, captured_at REAL NOT NULL, username TEXT NOT NULL,"
+    " kind TEXT NOT NULL, item_key TEXT NOT NULL, content_hash TEXT NOT NULL, data TEXT NOT NULL)"
+)
+
+
+class RecordedResults:
+    """Digest of the last result recorded per (username, result type).
+
+    Cache hits hand the same content back again and again; one hash of the whole
+    result lets ``record`` skip them before hashing and writing every item.
+    """
+
+    def __init__(self, max_entries: int = RECORDED_RESULTS_MAX):
+        self.max_entries = max_entries
+        self._digests: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, username: str, result: BaseModel) -> tuple[tuple[str, str], str] | None:
+        """``(key, digest)`` to pass to :meth:`remember`, or None if ``result`` was already recorded."""
+        key = (username, type(result).__name__)
+        digest = hashlib.sha1(result.model_dump_json().encode("utf-8")).hexdigest()
+        with self._lock:
+            if self._digests.get(key) == digest:
+                return None
+        return key, digest
+
+    def remember(self, key: tuple[str, str], digest: str):
+        with self._lock:
+            self._digests.pop(key, None)
+            if len(self._digests) >= self.max_entries:
+                # Oldest first: dicts keep insertion order
+                del self._digests[next(iter(self._digests))]
+            self._digests[key] = digest
+
+
+class SnapshotStore:
+    """Append-only history of extracted profiles, posts, comments and likes.
+
+    A version of an item is stored with the time it was first seen, and only when
+    it differs from the item's latest stored version, so repeated extractions (and
+    cache hits) add rows only when upstream data changed. Content that comes back
+    (A, B, then A again) is recorded again.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(SNAPSHOTS_TABLE)
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version < ITEM_KEY_VERSION:
+            self._rekey()
+        if version < LATEST_VERSION_DEDUPE:
+            self._drop_content_unique()
+        self.db.execute("CREATE INDEX IF NOT EXISTS snapshots_kind ON snapshots (kind, captured_at)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS snapshots_item ON snapshots (username, kind, item_key, id)")
+        self._lock = threading.Lock()
+        self.recorded = RecordedResults()
+
+    def record(self, username: str, result: BaseModel):
+        recorded = self.recorded.digest(username, result)
+        if recorded is None:
+            return
+        now = time.time()
+        rows = []
+        for kind, item in result_items(result):
+            data = item.model_dump_json()
+            content_hash = hashlib.sha1(data.encode("utf-8")).hexdigest()
+            rows.append({
+                "captured_at": now,
+                "username": username,
+                "kind": kind,
+                "item_key": item_key(kind, item),
+                "content_hash": content_hash,
+                "data": data,
+            })
+        if not rows:
+            self.recorded.remember(*recorded)
+            return
+        with self._lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(
+                    "INSERT INTO snapshots (captured_at, username, kind, item_key, content_hash, data)"
+                    " SELECT :captured_at, :username, :kind, :item_key, :content_hash, :data"
+                    " WHERE :content_hash IS NOT (SELECT content_hash FROM snapshots"
+                    "  WHERE username = :username AND kind = :kind AND item_key = :item_key ORDER BY id DESC LIMIT 1)",
+                    rows,
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        self.recorded.remember(*recorded)
+
+    def _rekey(self):
+        # Likes and comments were keyed by post url (or nothing): re-key them per item
+        self.db.execute("BEGIN")
+        try:
+            rows = self.db.execute(
+                "SELECT id, kind, data FROM snapshots WHERE kind IN ('comment', 'like')"
+            ).fetchall()
+            for row_id, kind, data in rows:
+                key = item_key(kind, ITEM_MODELS[kind].model_validate_json(data))
+                try:
+                    self.db.execute("UPDATE snapshots SET item_key = ? WHERE id = ?", (key, row_id))
+                except sqlite3.IntegrityError:
+                    # Same item, same content, recorded under both old keys: keep one row
+                    self.db.execute("DELETE FROM snapshots WHERE id = ?", (row_id,))
+            self.db.execute(f"PRAGMA user_version = {ITEM_KEY_VERSION}")
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def _drop_content_unique(self):
+        # Older tables have UNIQUE (username, kind, item_key, content_hash), which dropped
+        # content that came back; SQLite cannot drop a constraint, so copy into a new table
+        self.db.execute("BEGIN")
+        try:
+            self.db.execute("ALTER TABLE snapshots RENAME TO snapshots_v1")
+            self.db.execute(SNAPSHOTS_TABLE)
+            self.db.execute("INSERT INTO snapshots SELECT * FROM snapshots_v1")
+            self.db.execute("DROP TABLE snapshots_v1")
+            self.db.execute(f"PRAGMA user_version = {LATEST_VERSION_DEDUPE}")
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def iter_rows(
+        self,
+        export_kind: str,
+        username: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None
+    ) -> Iterator[list[dict]]:
+        """Yield batches of flat records (snapshot columns plus the model's fields), oldest first."""
+        kinds, _ = EXPORT_KINDS[export_kind]
+        query = f"SELECT id, captured_at, username, kind, data FROM snapshots WHERE kind IN ({','.join('?' * len(kinds))})"
+        params: list = list(kinds)
+        if username is not None:
+            query += " AND username = ?"
+            params.append(username)
+        if since is not None:
+            query += " AND captured_at >= ?"
+            params.append(utc_timestamp(since))
+        if until is not None:
+            query += " AND captured_at <= ?"
+            params.append(utc_timestamp(until))
+        query += " AND id > ? ORDER BY id LIMIT ?"
+
+        last_id = 0
+        while True:
+            # Keyset pagination: the lock is held per batch, not for the whole export
+            with self._lock:
+                rows = self.db.execute(query, [*params, last_id, EXPORT_BATCH_ROWS]).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            batch = []
+            for _, captured_at, row_username, kind, data in rows:
+                record = {
+                    "captured_at": datetime.fromtimestamp(captured_at, timezone.utc),
+                    "username": row_username,
+                }
+                if export_kind == "posts":
+                    record["is_repost"] = kind == "repost"
+                record.update(loads(data))
+                batch.append(record)
+            yield batch
+
+
+def utc_timestamp(value: datetime) -> float:
+    # Naive bounds are UTC, like post dates
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+ITEM_MODELS = {"profile": ProfileOutput, "post": PostData, "repost": PostData, "comment": CommentData, "like": LikeData}
+
+
+def item_key(kind: str, item: BaseModel) -> str:
+    """Stable identity of an item across versions: what the item is, not its counters.
+
+    Posts are their urn. A comment is the post it is on plus its own text and date
+    (several comments on one post stay apart); a like is the liked post's text and
+    date plus the action, none of which change when reaction counts do.
+    """
+    if kind == "profile":
+        return ""
+    if kind in ("post", "repost") and item.urn:
+        return item.urn
+    if kind == "comment":
+        parts = (item.postUrl, item.commentedDate, item.highlightedComments)
+    elif kind == "like":
+        parts = (item.text, item.postedDate, item.action)
+    else:
+        parts = (item.postedDate, item.text)
+    return hashlib.sha1("\x1f".join(part or "" for part in parts).encode("utf-8")).hexdigest()
+
+
+def result_items(result: BaseModel) -> Iterator[tuple[str, BaseModel]]:
+    if isinstance(result, ProfileOutput):
+        yield "profile", result
+    elif isinstance(result, PostOutput):
+        for post in result.posts:
+            yield "post", post
+        for post in result.reposts:
+            yield "repost", post
+    elif isinstance(result, RootModel):
+        for item in result.root:
+            yield ("comment" if isinstance(item, CommentData) else "like"), item
+
+
+def records_result(store_attribute: str):
+    """Decorator passing what a ``fetch_*_by_username(username, ...)`` method returns to
+    ``record(username, result)`` of the manager's ``store_attribute`` store, if it has one.
+
+    The async variant records in a worker thread so hashing and the SQLite write
+    never block the event loop.
+    """
+    def decorate(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, username, *args, **kwargs):
+                result = await method(self, username, *args, **kwargs)
+                store = getattr(self, store_attribute)
+                if store is not None:
+                    await asyncio.to_thread(store.record, username, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, username, *args, **kwargs):
+            result = method(self, username, *args, **kwargs)
+            store = getattr(self, store_attribute)
+            if store is not None:
+                store.record(username, result)
+            return result
+        return wrapper
+    return decorate
+
+
+snapshot = records_result("snapshot_store")
+
+
+def resolve_export_format(fmt: str) -> str:
+    if fmt == "auto":
+        return "parquet" if pyarrow is not None else "ndjson"
+    if fmt in ("parquet", "arrow") and pyarrow is None:
+        raise ValueError(f"{fmt} export needs pyarrow (pip install 'linkedin-extractor[export]')")
+    return fmt
+
+
+def export_chunks(batches: Iterator[list[dict]], export_kind: str, fmt: str) -> Iterator[bytes]:
+    """Encode record batches as one Parquet file, Arrow IPC stream or gzipped NDJSON, chunk by chunk."""
+    if fmt == "ndjson":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for batch in batches:
+            chunk = compressor.compress(b"".join(dumps(record) + b"\n" for record in batch))
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+        return
+
+    schema = _arrow_schema(export_kind)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema) if fmt == "parquet" else pyarrow.ipc.new_stream(sink, schema)
+    for batch in batches:
+        table = pyarrow.Table.from_pylist(batch, schema=schema)
+        writer.write_table(table)
+        yield from sink.drain()
+    writer.close()
+    yield from sink.drain()
+
+
+def _arrow_schema(export_kind: str):
+    _, model = EXPORT_KINDS[export_kind]
+    fields = [pyarrow.field("captured_at", pyarrow.timestamp("us", tz="UTC")), pyarrow.field("username", pyarrow.string())]
+    if export_kind == "posts":
+        fields.append(pyarrow.field("is_repost", pyarrow.bool_()))
+    for name, field in model.model_fields.items():
+        arrow_type = pyarrow.int64() if int in getattr(field.annotation, "__args__", (field.annotation,)) else pyarrow.string()
+        fields.append(pyarrow.field(name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+class _ChunkSink:
+    """Write-only file object the Arrow writers flush into; drained after every batch."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        if chunks:
+            yield b"".join(chunks)
+
+
+def build_snapshot_store() -> SnapshotStore | None:
+    if not settings.SNAPSHOTS_ENABLED:
+        return None
+    return SnapshotStore(settings.SNAPSHOT_DB_PATH)
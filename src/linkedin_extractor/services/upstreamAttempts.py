@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from src.linkedin_extractor.services.aggregation import DeadlineExceededError
+from src.linkedin_extractor.services.cache import conditional_headers, response_validators
+from src.linkedin_extractor.services.compression import request_encoding_headers
+from src.linkedin_extractor.services.logs import log_event
+from src.linkedin_extractor.services.metrics import UPSTREAM_REQUESTS, UPSTREAM_FAILURES, UPSTREAM_BYTES
+from src.linkedin_extractor.services.parsers import endpoint_type
+from src.linkedin_extractor.services.resilience import UpstreamHTTPError, UpstreamUnavailableError
+from src.linkedin_extractor.services.sharedState import SharedFlight
+
+
+class CallCounter:
+    """Upstream requests sent by a manager session (its credit usage); sections of
+    one session may fetch from several threads."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self):
+        with self._lock:
+            self.value += 1
+
+
+def cached_response(manager, path: str) -> tuple[bytes | None, tuple[bytes, dict] | None]:
+    """What the cache holds for ``path`` in the manager's cache mode: the body to
+    serve as is, else the stale ``(body, validators)`` to revalidate (or None)."""
+    if manager.deadline is not None and time.monotonic() >= manager.deadline:
+        raise DeadlineExceededError("Deadline passed before the request was sent")
+    if manager.cache is None:
+        return None, None
+    if manager.cache_mode == "use":
+        cached = manager.cache.get(path)
+        if cached is not None:
+            return cached, None
+    return None, manager.cache.stale(path) if manager.cache_mode != "bypass" else None
+
+
+def shared_flight(manager, path: str) -> SharedFlight | None:
+    # Only cacheable paths fetched in "use" mode can be taken from another worker's result
+    if manager.cache is None or manager.cache_mode != "use" or manager.cache.ttl_for(path) <= 0:
+        return None
+    return manager.shared_flight
+
+
+class UpstreamAttempts:
+    """Attempt policy of one upstream fetch, shared by the blocking and async managers.
+
+    The managers hold the scheduler slot, sleep and send the request; key
+    accounting, guard and retry decisions and what happens to the final response
+    (revalidation, errors, caching) are decided here.
+    """
+
+    def __init__(self, manager, path: str, stale: tuple[bytes, dict] | None = None):
+        self.manager = manager
+        self.path = path
+        self.stale = stale
+        self.endpoint = endpoint_type(path)
+        self.headers = {**manager.headers, **request_encoding_headers()}
+        if stale is not None:
+            self.headers.update(conditional_headers(stale[1]))
+        self.attempt = 0
+        self.key = None
+        # The async manager may run these steps in worker threads (see offloaded): whichever
+        # of failed, responded and abandoned takes the key first hands it back
+        self._key_lock = threading.Lock()
+        self.retry_after = None
+        self.error = None
+        self.status = None
+
+    def start(self) -> float:
+        """Begin an attempt; returns the seconds to wait for the rate limiter first."""
+        self.attempt += 1
+        self.retry_after = None
+        return self.manager.guard.before_attempt()
+
+    def request_headers(self) -> dict:
+        """Take an API key for the attempt and count its credit."""
+        key = self.manager.key_pool.acquire()
+        with self._key_lock:
+            self.key = key
+        self.manager.calls.add()
+        return {**self.headers, "x-rapidapi-key": key.value}
+
+    def _take_key(self):
+        with self._key_lock:
+            key, self.key = self.key, None
+        return key
+
+    def failed(self, error: Exception):
+        self.error = error
+        self.status = None
+        self.manager.key_pool.release(self._take_key())
+        UPSTREAM_REQUESTS.inc(endpoint=self.endpoint, status="error")
+        self.manager.guard.after_error()
+
+    def responded(self, status: int, headers) -> bool:
+        """True if the response is final, False if the attempt should be retried."""
+        rerouted = self.manager.key_pool.record(self._take_key(), status, headers)
+        UPSTREAM_REQUESTS.inc(endpoint=self.endpoint, status=str(status))
+        self.retry_after = headers.get("Retry-After")
+        if not self.manager.guard.after_response(status, self.retry_after, throttle_all=not rerouted):
+            return True
+        self.error = f"HTTP {status}"
+        self.status = status
+        return False
+
+    def abandoned(self):
+        """Hand back the key of an attempt that neither responded nor failed (it was cancelled)."""
+        key = self._take_key()
+        if key is not None:
+            self.manager.key_pool.release(key)
+
+    def retry_delay(self) -> float:
+        """Seconds to wait before the next attempt; raises once the retries are used up."""
+        delay = self.manager.guard.retry_delay(self.attempt, self.retry_after)
+        if delay is None:
+            UPSTREAM_FAILURES.inc(endpoint=self.endpoint)
+            log_event("upstream_failed", logging.WARNING, endpoint=self.endpoint, attempts=self.attempt, error=str(self.error))
+            raise UpstreamUnavailableError(f"API request failed: {self.error}", self.status)
+        return delay
+
+    def result(self, status: int, headers, data: bytes, wire_bytes: int) -> bytes:
+        """The body of the final response, from the revalidated cache copy on a 304."""
+        UPSTREAM_BYTES.inc(wire_bytes, endpoint=self.endpoint, stage="wire")
+        UPSTREAM_BYTES.inc(len(data), endpoint=self.endpoint, stage="decoded")
+        cache = self.manager.cache
+        if status == 304 and self.stale is not None:
+            cache.revalidated(self.path, *self.stale)
+            return self.stale[0]
+        if status != 200:
+            # Error bodies are neither parsed as data nor cached
+            UPSTREAM_FAILURES.inc(endpoint=self.endpoint)
+            log_event("upstream_failed", logging.WARNING, endpoint=self.endpoint, attempts=self.attempt, status=status)
+            raise UpstreamHTTPError(status)
+        if cache is not None and self.manager.cache_mode != "bypass":
+            cache.set(self.path, data, response_validators(headers))
+        return data
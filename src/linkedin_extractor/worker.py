@@ -0,0 +1,64 @@
+"""Standalone job worker: runs queued background jobs without serving the API.
+
+    JOB_WORKERS=0 uvicorn src.linkedin_extractor.main:app   # API only enqueues
+    python -m src.linkedin_extractor.worker --workers 8      # scale workers separately
+
+Workers share the job store (JOB_DB_PATH), so it must be on the same host or a
+shared volume. Set the same SHARED_STATE_BACKEND as the API so both draw from one
+rate limit and key quota.
+"""
+import argparse
+import asyncio
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.cache import build_response_cache
+from src.linkedin_extractor.services.extraction import extract_all_job_runner
+from src.linkedin_extractor.services.jobQueue import build_job_store, build_job_worker_pool
+from src.linkedin_extractor.services.keyPool import build_key_pool
+from src.linkedin_extractor.services.logs import configure_logging
+from src.linkedin_extractor.services.postStore import build_post_store
+from src.linkedin_extractor.services.resilience import build_upstream_guard
+from src.linkedin_extractor.services.scheduler import build_upstream_scheduler
+from src.linkedin_extractor.services.searchIndex import build_search_index
+from src.linkedin_extractor.services.sharedState import build_shared_state, shared_cache_tier
+from src.linkedin_extractor.services.snapshotStore import build_snapshot_store
+
+
+async def run(workers: int):
+    job_store = build_job_store()
+    if job_store is None:
+        raise SystemExit("JOBS_ENABLED is false")
+    shared_state = build_shared_state()
+    key_pool = build_key_pool(shared_state)
+    manager = AsyncLinkedInAPIManager(
+        cache=build_response_cache(shared_cache_tier(shared_state)),
+        guard=build_upstream_guard(len(key_pool), shared_state),
+        post_store=build_post_store(),
+        key_pool=key_pool,
+        snapshot_store=build_snapshot_store(),
+        state=shared_state,
+        scheduler=build_upstream_scheduler(),
+        search_index=build_search_index(),
+    )
+    pool = build_job_worker_pool(job_store, {"extract_all": extract_all_job_runner(manager)}, workers)
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await manager.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    args = parser.parse_args()
+    configure_logging()
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
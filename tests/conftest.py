@@ -0,0 +1,157 @@
+import http.server
+import os
+import tempfile
+import threading
+import time
+
+# Settings are read at import time: point every store at a scratch directory and
+# keep background workers and the rate limiter out of the way before the app loads.
+os.environ.update(
+    RAPIDAPI_KEY="test-key",
+    DATA_DIR=tempfile.mkdtemp(prefix="linkedin-extractor-tests-"),
+    RAPIDAPI_RATE_LIMIT="0",
+    JOB_WORKERS="0",
+    LOG_LEVEL="WARNING",
+)
+
+import httpx
+import pytest
+import uvicorn
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor import main
+from src.linkedin_extractor.services.apiManager import LinkedInAPIManager
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.cache import ResponseCache
+from src.linkedin_extractor.services.connectionPool import ConnectionPool
+from src.linkedin_extractor.services.keyPool import KeyPool
+from src.linkedin_extractor.services.postStore import PostStore
+from src.linkedin_extractor.services.resilience import RetryPolicy, UpstreamGuard
+from src.linkedin_extractor.services.scheduler import UpstreamScheduler
+from src.linkedin_extractor.services.searchIndex import SearchIndex
+
+CACHE_TTLS = {"profile": 3600, "posts": 3600, "comments": 3600, "likes": 3600, "post_comments": 3600}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def upstream():
+    """The mock RapidAPI upstream; ``upstream.state.requests`` counts requests per path."""
+    return create_app(latency=0, etags=True)
+
+
+class UpstreamHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every GET with ``server.respond(handler)``, a ``(status, headers, body)`` tuple."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append({"path": self.path, "headers": dict(self.headers), "port": self.client_address[1]})
+        status, headers, body = self.server.respond(self)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Close without a Connection: close header, like an upstream dropping an idle keep-alive socket
+        self.close_connection = self.server.drop_connections
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_upstream():
+    """A real HTTP/1.1 server for the blocking manager's connection pool; ``requests``
+    records each request's path, headers and client port."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    server.requests = []
+    server.drop_connections = False
+    server.respond = lambda handler: (200, {"Content-Type": "application/json"}, b'{"headline": "Engineer"}')
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def served_upstream(upstream):
+    """``upstream`` served over a real socket, for the blocking manager; ``url`` is its base URL."""
+    server = uvicorn.Server(uvicorn.Config(upstream, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    server.url = f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+    yield server
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(64 * 1024 * 1024, None, 0, CACHE_TTLS, revalidate_window=3600)
+
+
+@pytest.fixture
+def scheduler():
+    return UpstreamScheduler(0, {})
+
+
+@pytest.fixture
+def search_index(tmp_path):
+    return SearchIndex(str(tmp_path / "search.sqlite3"))
+
+
+@pytest.fixture
+def manager(upstream, cache, scheduler, search_index, tmp_path):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream), base_url="http://mock-upstream")
+    return AsyncLinkedInAPIManager(
+        client=client,
+        cache=cache,
+        guard=UpstreamGuard(None, RetryPolicy(3, 0.01, 0.01), None),
+        post_store=PostStore(str(tmp_path / "posts.sqlite3")),
+        key_pool=KeyPool([("test-key", 0)], None),
+        scheduler=scheduler,
+        search_index=search_index,
+    )
+
+
+@pytest.fixture
+def upstream_url(request):
+    """Base URL the blocking manager connects to: ``upstream`` served over a real socket."""
+    return request.getfixturevalue("served_upstream").url
+
+
+@pytest.fixture
+def blocking_manager(upstream_url, cache, scheduler, search_index, tmp_path):
+    """The blocking manager behind /extract-all-threading."""
+    manager = LinkedInAPIManager(
+        pool=ConnectionPool(upstream_url, max_connections=8, max_idle=8, timeout=5),
+        cache=cache,
+        guard=UpstreamGuard(None, RetryPolicy(3, 0.01, 0.01), None),
+        post_store=PostStore(str(tmp_path / "blocking-posts.sqlite3")),
+        key_pool=KeyPool([("test-key", 0)], None),
+        scheduler=scheduler,
+        search_index=search_index,
+    )
+    yield manager
+    manager.pool.close()
+
+
+@pytest.fixture
+async def api(manager, cache, scheduler, search_index, monkeypatch):
+    """Client for the app, with its module-level services swapped for the test's."""
+    monkeypatch.setattr(main, "api_manager", manager)
+    monkeypatch.setattr(main, "response_cache", cache)
+    monkeypatch.setattr(main, "upstream_scheduler", scheduler)
+    monkeypatch.setattr(main, "search_index", search_index)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+    await manager.aclose()
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor import main
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.aggregation import (
+    DeadlineExceededError,
+    gather_sections,
+    gather_sections_threaded,
+    section_timeouts
+)
+from src.linkedin_extractor.services.metrics import SECTION_OUTCOMES
+
+pytestmark = pytest.mark.anyio
+
+
+def returns(value, delay: float = 0):
+    async def section(*args):
+        await asyncio.sleep(delay)
+        return value if not args else (value, *args)
+    return section
+
+
+def fails(error: Exception):
+    async def section():
+        raise error
+    return section
+
+
+def statuses(aggregate) -> dict[str, str]:
+    return {name: entry["status"] for name, entry in aggregate.report.items()}
+
+
+async def test_slow_section_times_out_alone():
+    aggregate = await gather_sections(
+        {"fast": returns(1), "slow": returns(2, delay=1)}, {"fast": None, "slow": 0.05}
+    )
+
+    assert statuses(aggregate) == {"fast": "complete", "slow": "timed_out"}
+    assert aggregate.values == {"fast": 1}
+    assert aggregate.report["slow"]["error"] == "slow timed out"
+    assert aggregate.report["slow"]["elapsed_ms"] < 500
+
+
+async def test_overall_timeout_bounds_every_section():
+    started = time.monotonic()
+    aggregate = await gather_sections({"a": returns(1, delay=1), "b": returns(2, delay=1)}, {}, timeout=0.05)
+
+    assert statuses(aggregate) == {"a": "timed_out", "b": "timed_out"}
+    assert time.monotonic() - started < 0.5
+
+
+async def test_dependent_section_gets_the_value_or_is_skipped():
+    completed = []
+    aggregate = await gather_sections(
+        {"posts": returns("posts"), "threads": returns("threads"), "broken": fails(ValueError("boom")), "orphan": returns(0)},
+        {},
+        depends_on={"threads": "posts", "orphan": "broken"},
+        on_complete=lambda name, value: completed.append(name),
+    )
+
+    assert aggregate.values["threads"] == ("threads", "posts")
+    assert statuses(aggregate) == {"posts": "complete", "threads": "complete", "broken": "failed", "orphan": "skipped"}
+    assert aggregate.report["broken"]["error"] == "boom"
+    # Report in the order the sections were given, callbacks in completion order
+    assert list(aggregate.report) == ["posts", "threads", "broken", "orphan"]
+    assert completed == ["posts", "threads"]
+
+
+async def test_cancelling_the_caller_cancels_every_section():
+    cancelled = []
+
+    async def section():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    task = asyncio.create_task(gather_sections({"a": section, "b": section}, {}))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(cancelled) == 2
+
+
+async def test_raise_if_empty():
+    partial = await gather_sections({"ok": returns(1), "broken": fails(ValueError("boom"))}, {})
+    partial.raise_if_empty()
+
+    failed = await gather_sections({"slow": returns(1, delay=1), "broken": fails(ValueError("boom"))}, {"slow": 0.01})
+    with pytest.raises(ValueError, match="boom"):
+        failed.raise_if_empty()
+
+    timed_out = await gather_sections({"slow": returns(1, delay=1)}, {"slow": 0.01})
+    with pytest.raises(DeadlineExceededError):
+        timed_out.raise_if_empty()
+
+
+def test_threaded_sections_are_abandoned_at_their_deadline():
+    release = threading.Event()
+    deadlines = {}
+
+    def slow(deadline):
+        deadlines["slow"] = deadline
+        release.wait(5)
+        return "late"
+
+    def broken(deadline):
+        raise ValueError("boom")
+
+    started = time.monotonic()
+    aggregate = gather_sections_threaded(
+        {"fast": lambda deadline: "fast", "slow": slow, "broken": broken}, {"slow": 0.05}, timeout=2
+    )
+    release.set()
+
+    assert statuses(aggregate) == {"fast": "complete", "slow": "timed_out", "broken": "failed"}
+    assert aggregate.values == {"fast": "fast"}
+    assert time.monotonic() - started < 1
+    # The section is told its deadline: the smaller of its own and the overall one
+    assert deadlines["slow"] == pytest.approx(started + 0.05, abs=0.05)
+
+
+def test_section_timeouts_accept_either_section_name(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACT_SECTION_TIMEOUTS", "comments=5, reacted_posts=7,posts=0")
+
+    timeouts = section_timeouts(["profile", "posts", "commented_posts", "comments", "likes"], 3)
+
+    assert timeouts == {"profile": 3, "posts": None, "commented_posts": 5, "comments": 5, "likes": 7}
+
+
+class SlowPaths:
+    """Delays the mock upstream's responses for some paths."""
+
+    def __init__(self, app, delays: dict[str, float]):
+        self.app = app
+        self.delays = delays
+        self.state = app.state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await asyncio.sleep(self.delays.get(scope["path"], 0))
+        await self.app(scope, receive, send)
+
+
+class TestExtractAllDeadlines:
+    @pytest.fixture
+    def upstream(self):
+        return SlowPaths(create_app(latency=0), {"/get-profile-likes": 0.5, "/get-profile-comments": 0.5})
+
+    @pytest.fixture
+    def threaded(self, blocking_manager, monkeypatch):
+        monkeypatch.setattr(main, "threaded_api_manager", blocking_manager)
+
+    async def test_extract_all_reports_the_timed_out_section(self, api, monkeypatch):
+        monkeypatch.setattr(settings, "EXTRACT_SECTION_TIMEOUTS", "likes=0.1")
+
+        response = await api.get("/extract-all", params={"username": "alice", "sections": "profile,likes"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["profile"]["headline"]
+        assert body["sections"]["reacted_posts"]["status"] == "timed_out"
+
+    async def test_extract_all_answers_504_when_nothing_completes(self, api):
+        response = await api.get(
+            "/extract-all", params={"username": "alice", "sections": "comments,likes", "section_timeout": 0.1}
+        )
+
+        assert response.status_code == 504
+
+    async def test_threading_route_uses_the_same_section_timeouts(self, api, threaded, monkeypatch):
+        monkeypatch.setattr(settings, "EXTRACT_SECTION_TIMEOUTS", "reacted_posts=0.1")
+        before = {
+            labels["status"]: value for _, labels, value in SECTION_OUTCOMES.samples() if labels["section"] == "reacted_posts"
+        }
+
+        response = await api.get("/extract-all-threading", params={"username": "alice", "sections": "profile,likes"})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["profile"]["headline"]
+        assert body["sections"]["likes"]["status"] == "timed_out"
+        after = {
+            labels["status"]: value for _, labels, value in SECTION_OUTCOMES.samples() if labels["section"] == "reacted_posts"
+        }
+        assert after["timed_out"] == before.get("timed_out", 0) + 1
+
+    async def test_threading_route_answers_504_when_nothing_completes(self, api, threaded):
+        response = await api.get(
+            "/extract-all-threading", params={"username": "alice", "sections": "comments,likes", "section_timeout": 0.1}
+        )
+
+        assert response.status_code == 504
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def upstream():
+    # Slow enough to cancel a request while it is in flight
+    return create_app(latency=0.5)
+
+
+def in_flight(manager) -> int:
+    return sum(key["in_flight"] for key in manager.key_pool.stats()["keys"])
+
+
+async def test_cancelled_attempt_hands_its_key_back(manager, upstream):
+    # Without singleflight the caller's cancellation reaches the attempt itself
+    manager.singleflight = None
+    task = asyncio.create_task(manager.session("bypass").fetch_profile_data_by_username("alice"))
+    while not upstream.state.requests["/"]:
+        await asyncio.sleep(0.01)
+    assert in_flight(manager) == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert in_flight(manager) == 0
+
+
+async def test_section_timeout_does_not_leak_keys(api, manager):
+    manager.singleflight = None
+    response = await api.get(
+        "/extract-all", params={"username": "alice", "sections": "profile,posts", "section_timeout": 0.1}
+    )
+
+    assert response.status_code == 504
+    assert in_flight(manager) == 0
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from benchmarks.mock_upstream import create_app
+
+pytestmark = pytest.mark.anyio
+
+
+class PerUsername:
+    """Delays the mock upstream per username, and answers 404 for ``missing`` ones."""
+
+    def __init__(self, app, delays: dict[str, float], missing: set[str]):
+        self.app = app
+        self.delays = delays
+        self.missing = missing
+        self.state = app.state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            username = parse_qs(scope["query_string"].decode()).get("username", [None])[0]
+            if username in self.missing:
+                self.state.requests[scope["path"]] += 1
+                await send({"type": "http.response.start", "status": 404, "headers": []})
+                await send({"type": "http.response.body", "body": b"{}"})
+                return
+            await asyncio.sleep(self.delays.get(username, 0))
+        await self.app(scope, receive, send)
+
+
+@pytest.fixture
+def upstream():
+    return PerUsername(create_app(latency=0), {"slow": 0.2}, {"ghost"})
+
+
+@pytest.fixture
+def manager(manager, upstream):
+    manager.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream), base_url="http://mock-upstream")
+    return manager
+
+
+async def batch(api, usernames: list[str], concurrency: int) -> list[dict]:
+    response = await api.post(
+        "/extract-batch", json={"usernames": usernames, "concurrency": concurrency, "sections": "profile"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_records_arrive_in_completion_order(api):
+    records = await batch(api, ["slow", "alice", "bob"], concurrency=3)
+
+    assert [record["username"] for record in records][-1] == "slow"
+    assert {record["username"] for record in records} == {"slow", "alice", "bob"}
+    assert all(record["profile"]["headline"] for record in records)
+
+
+async def test_one_worker_keeps_the_request_order(api):
+    records = await batch(api, ["slow", "alice", "bob"], concurrency=1)
+
+    assert [record["username"] for record in records] == ["slow", "alice", "bob"]
+
+
+async def test_failed_username_gets_an_error_record(api, manager):
+    records = await batch(api, ["alice", "ghost", "bob"], concurrency=2)
+
+    by_username = {record["username"]: record for record in records}
+    assert len(records) == 3
+    assert by_username["ghost"] == {"username": "ghost", "error": "API request failed: HTTP 404", "credits_used": 1}
+    assert by_username["alice"]["profile"]["headline"]
+    assert by_username["bob"]["sections"]["profile"]["status"] == "complete"
+
+
+async def test_usernames_are_fetched_in_the_bulk_lane(api, scheduler):
+    await batch(api, ["alice", "bob"], concurrency=2)
+
+    lanes = scheduler.stats()["lanes"]
+    assert sum(lanes["bulk"]["admissions"].values()) == 2
+    assert sum(lanes["interactive"]["admissions"].values()) == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from src.linkedin_extractor.services.parsers import profile_path
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_repeated_request_is_served_from_cache(api, upstream, cache):
+    first = await api.get("/extract-profile", params={"username": "alice"})
+    second = await api.get("/extract-profile", params={"username": "alice"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert upstream.state.requests["/"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+async def test_bypass_neither_reads_nor_writes_the_cache(api, upstream, cache):
+    await api.get("/extract-profile", params={"username": "alice", "cache": "bypass"})
+    await api.get("/extract-profile", params={"username": "alice", "cache": "bypass"})
+
+    assert upstream.state.requests["/"] == 2
+    assert cache.get(profile_path("alice")) is None
+
+
+async def test_refresh_revalidates_with_a_conditional_request(api, upstream, cache):
+    stored = await api.get("/extract-profile", params={"username": "alice"})
+    refreshed = await api.get("/extract-profile", params={"username": "alice", "cache": "refresh"})
+
+    assert refreshed.status_code == 200
+    assert refreshed.json() == stored.json()
+    # The mock answers a matching If-None-Match with a 304: the cached body is renewed, not downloaded
+    assert upstream.state.requests["/"] == 2
+    assert cache.stats()["revalidations"] == 1
+    assert cache.get(profile_path("alice")) is not None
+
+
+async def test_posts_report_credits_per_request(api, upstream):
+    first = (await api.get("/extract-posts", params={"username": "alice", "max_posts": 5})).json()
+    second = (await api.get("/extract-posts", params={"username": "alice", "max_posts": 5})).json()
+
+    assert first["credits_used"] == 1
+    assert second["credits_used"] == 0
+    assert [post["urn"] for post in first["posts"]] == [post["urn"] for post in second["posts"]]
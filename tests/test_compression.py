@@ -0,0 +1,133 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services import compression
+from src.linkedin_extractor.services.compression import ContentDecoder, request_encoding_headers
+from src.linkedin_extractor.services.connectionPool import ConnectionPool
+from src.linkedin_extractor.services.parsers import profile_path
+from src.linkedin_extractor.services.resilience import UpstreamHTTPError
+
+PROFILE = json.dumps({"headline": "Engineer", "geo": {"full": "Berlin"}, "position": []}).encode()
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decode(encoding: str, body: bytes, chunk_size: int = 7) -> bytes:
+    decoder = ContentDecoder(encoding)
+    chunks = [decoder.decode(body[start:start + chunk_size]) for start in range(0, len(body), chunk_size)]
+    return b"".join(chunks) + decoder.flush()
+
+
+ENCODED = {
+    "gzip": gzip.compress(PROFILE),
+    "x-gzip": gzip.compress(PROFILE),
+    "deflate": zlib.compress(PROFILE),
+    "identity": PROFILE,
+    # Applied first to last: gzip, then deflate
+    "gzip, deflate": zlib.compress(gzip.compress(PROFILE)),
+}
+
+
+@pytest.mark.parametrize("encoding", ENCODED)
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_bodies_are_decoded_chunk_by_chunk(encoding, chunk_size):
+    assert decode(encoding, ENCODED[encoding], chunk_size) == PROFILE
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_raw_deflate_is_decoded_like_httpx_does(chunk_size):
+    assert decode("deflate", raw_deflate(PROFILE), chunk_size) == PROFILE
+
+
+def test_deflate_with_a_gzip_header_is_decoded():
+    assert decode("deflate", gzip.compress(PROFILE)) == PROFILE
+
+
+def test_brotli_is_decoded_when_installed():
+    brotli = pytest.importorskip("brotli")
+
+    assert decode("br", brotli.compress(PROFILE)) == PROFILE
+
+
+def test_unknown_encodings_are_rejected(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    with pytest.raises(ValueError):
+        ContentDecoder("br")
+    with pytest.raises(ValueError):
+        ContentDecoder("compress")
+
+
+def test_accept_encoding_follows_the_settings(monkeypatch):
+    assert request_encoding_headers() == {"Accept-Encoding": compression.ACCEPT_ENCODING}
+    assert ("br" in compression.ACCEPT_ENCODING) == (compression.brotli is not None)
+
+    monkeypatch.setattr(settings, "HTTP_COMPRESSION", False)
+    assert request_encoding_headers() == {"Accept-Encoding": "identity"}
+
+
+@pytest.mark.parametrize(
+    "encoding, body", [("gzip", gzip.compress(PROFILE)), ("deflate", raw_deflate(PROFILE))], ids=["gzip", "raw-deflate"]
+)
+def test_pool_decodes_and_counts_wire_bytes(http_upstream, encoding, body):
+    http_upstream.respond = lambda handler: (200, {"Content-Encoding": encoding}, body)
+    pool = ConnectionPool(http_upstream.url, max_connections=1, max_idle=1, timeout=5)
+
+    status, _, data, wire_bytes = pool.request("GET", "/", {})
+    pool.close()
+
+    assert (status, data, wire_bytes) == (200, PROFILE, len(body))
+
+
+@pytest.fixture
+def upstream_url(http_upstream):
+    return http_upstream.url
+
+
+class Upstream:
+    """``http_upstream`` responder: answers ``status``, with an ETag and a 304 for it."""
+
+    def __init__(self, status: int = 200, etag: str = '"v1"'):
+        self.status = status
+        self.etag = etag
+
+    def __call__(self, handler):
+        if handler.headers.get("If-None-Match") == self.etag:
+            return 304, {"ETag": self.etag}, b""
+        if self.status != 200:
+            return self.status, {"Content-Type": "application/json"}, b'{"message": "not found"}'
+        return 200, {"Content-Type": "application/json", "Content-Encoding": "gzip", "ETag": self.etag}, gzip.compress(PROFILE)
+
+
+def test_blocking_manager_revalidates_with_a_304(blocking_manager, http_upstream, cache):
+    http_upstream.respond = Upstream()
+
+    stored = blocking_manager.session().fetch_profile_data_by_username("alice")
+    refreshed = blocking_manager.session("refresh").fetch_profile_data_by_username("alice")
+
+    assert stored.headline == refreshed.headline == "Engineer"
+    assert http_upstream.requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidations"] == 1
+    assert cache.get(profile_path("alice")) == PROFILE
+
+
+def test_blocking_manager_does_not_cache_error_bodies(blocking_manager, http_upstream, cache):
+    upstream = http_upstream.respond = Upstream(status=404)
+
+    with pytest.raises(UpstreamHTTPError):
+        blocking_manager.session().fetch_profile_data_by_username("ghost")
+    assert cache.get(profile_path("ghost")) is None
+    assert cache.stale(profile_path("ghost")) is None
+
+    upstream.status = 200
+    profile = blocking_manager.session().fetch_profile_data_by_username("ghost")
+
+    assert profile.headline == "Engineer"
+    assert len(http_upstream.requests) == 2
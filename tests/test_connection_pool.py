@@ -0,0 +1,49 @@
+import threading
+
+from src.linkedin_extractor.services.connectionPool import ConnectionPool
+
+
+def test_sequential_requests_reuse_one_connection(http_upstream):
+    pool = ConnectionPool(http_upstream.url, max_connections=4, max_idle=4, timeout=5)
+    for _ in range(3):
+        status, _, body, _ = pool.request("GET", "/", {})
+        assert (status, body) == (200, b'{"headline": "Engineer"}')
+    pool.close()
+
+    assert len({request["port"] for request in http_upstream.requests}) == 1
+
+
+def test_dropped_keep_alive_connection_is_replaced(http_upstream):
+    http_upstream.drop_connections = True
+    pool = ConnectionPool(http_upstream.url, max_connections=1, max_idle=1, timeout=5)
+
+    results = [pool.request("GET", f"/?n={n}", {})[0] for n in range(3)]
+    pool.close()
+
+    # Each request after the first finds its idle socket closed and is resent on a new one
+    assert results == [200, 200, 200]
+    assert [request["path"] for request in http_upstream.requests] == ["/?n=0", "/?n=1", "/?n=2"]
+    assert len({request["port"] for request in http_upstream.requests}) == 3
+
+
+def test_connections_beyond_max_idle_are_closed(http_upstream):
+    pool = ConnectionPool(http_upstream.url, max_connections=4, max_idle=0, timeout=5)
+    for _ in range(2):
+        pool.request("GET", "/", {})
+
+    assert len(pool._idle) == 0
+    assert len({request["port"] for request in http_upstream.requests}) == 2
+
+
+def test_concurrent_requests_never_exceed_max_connections(http_upstream):
+    pool = ConnectionPool(http_upstream.url, max_connections=2, max_idle=2, timeout=5)
+    threads = [threading.Thread(target=pool.request, args=("GET", "/", {})) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert len(http_upstream.requests) == 8
+    # Sockets are only ever checked out by one thread; at most two were opened
+    assert len({request["port"] for request in http_upstream.requests}) <= 2
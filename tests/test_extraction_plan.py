@@ -0,0 +1,126 @@
+import pytest
+
+from src.linkedin_extractor.schemas.profile import (
+    CommentData,
+    CommentsOutput,
+    LikeData,
+    LikesOutput,
+    PostData,
+    PostOutput,
+    ProfileOutput
+)
+from src.linkedin_extractor.services.extractionPlan import ExtractionPlan
+
+pytestmark = pytest.mark.anyio
+
+PROFILE = ProfileOutput(headline="Engineer", location="Berlin", job_title="CTO", company_name="Acme")
+POST = PostData(postedDate="2025-01-10 12:00:00", totalReactionCount=3, commentsCount=1, urn="alice-1", text="hello")
+REPOST = PostData(postedDate="2025-01-09 12:00:00", totalReactionCount=0, commentsCount=0, urn="alice-2", text="shared")
+COMMENT = CommentData(
+    highlightedComments="nice", text="post", postedDate="2025-01-08", commentedDate="2025-01-09", postUrl="https://x/1"
+)
+LIKE = LikeData(text="liked", action="likes", postedDate="2025-01-05", totalReactionCount=1, commentsCount=0)
+
+
+def test_sections_default_to_all_and_accept_aliases():
+    assert ExtractionPlan.parse().sections == ("profile", "posts", "commented_posts", "reacted_posts")
+
+    plan = ExtractionPlan.parse("likes, profile,reacted_posts")
+
+    assert plan.sections == ("reacted_posts", "profile")
+    assert plan.wants("likes") and plan.wants("reacted_posts")
+    assert not plan.wants("posts") and not plan.wants("comments")
+
+
+def test_bare_fields_apply_to_every_planned_section_that_has_them():
+    plan = ExtractionPlan.parse("posts,likes,profile", "text,headline")
+
+    assert plan.fields == {"posts": {"text"}, "reacted_posts": {"text"}, "profile": {"headline"}}
+    assert plan.wants_field("likes", "text")
+    assert not plan.wants_field("posts", "urn")
+    # Sections without listed fields are returned whole, unplanned ones not at all
+    assert ExtractionPlan.parse("posts,profile", "posts.urn").wants_field("profile", "location")
+    assert not plan.wants_field("comments", "text")
+
+
+@pytest.mark.parametrize(
+    "sections, fields, error",
+    [
+        ("profile,followers", None, "Unknown section: followers"),
+        ("profile", "followers.count", "Unknown section in fields: followers"),
+        ("profile", "posts.urn", "not requested"),
+        ("posts", "posts.headline", "Unknown field for posts: headline"),
+        ("profile", "urn", "Unknown field: urn"),
+    ],
+)
+def test_unknown_names_are_rejected(sections, fields, error):
+    with pytest.raises(ValueError, match=error):
+        ExtractionPlan.parse(sections, fields)
+
+
+@pytest.mark.parametrize(
+    "route, params",
+    [
+        ("/extract-all", {"username": "alice", "sections": "profile,followers"}),
+        ("/extract-all", {"username": "alice", "fields": "posts.headline"}),
+        ("/extract-all-threading", {"username": "alice", "fields": "nope"}),
+    ],
+)
+async def test_routes_answer_422_for_a_bad_plan(api, route, params):
+    response = await api.get(route, params=params)
+
+    assert response.status_code == 422
+    assert "Unknown" in response.json()["detail"]
+
+
+async def test_posted_plans_are_checked_too(api):
+    batch = await api.post("/extract-batch", json={"usernames": ["alice"], "sections": "followers"})
+
+    assert batch.status_code == 422
+    assert batch.json()["detail"].startswith("Unknown section")
+
+
+def test_profile_is_projected_to_a_dict():
+    plan = ExtractionPlan.parse("profile", "headline,company_name")
+
+    assert plan.project("profile", PROFILE) == {"headline": "Engineer", "company_name": "Acme"}
+    assert plan.project("profile", None) is None
+
+
+def test_posts_output_keeps_its_split_and_page_count():
+    plan = ExtractionPlan.parse("posts", "posts.urn")
+
+    projected = plan.project("posts", PostOutput(posts=[POST], reposts=[REPOST], pages_fetched=2))
+
+    assert projected == {"posts": [{"urn": "alice-1"}], "reposts": [{"urn": "alice-2"}], "pages_fetched": 2}
+
+
+def test_posts_with_their_comment_threads_are_projected_as_dicts():
+    plan = ExtractionPlan.parse("posts", "urn,comments")
+
+    projected = plan.project("posts", [{**POST.model_dump(), "comments": [{"text": "hi"}]}])
+
+    assert projected == [{"urn": "alice-1", "comments": [{"text": "hi"}]}]
+
+
+@pytest.mark.parametrize(
+    "section, value, expected",
+    [
+        ("commented_posts", CommentsOutput([COMMENT]), [{"postUrl": "https://x/1"}]),
+        ("comments", [COMMENT], [{"postUrl": "https://x/1"}]),
+        ("reacted_posts", LikesOutput([LIKE]), [{"action": "likes"}]),
+        ("likes", [LIKE], [{"action": "likes"}]),
+    ],
+)
+def test_record_lists_are_projected(section, value, expected):
+    plan = ExtractionPlan.parse("comments,likes", "commented_posts.postUrl,likes.action")
+
+    assert plan.project(section, value) == expected
+
+
+def test_sections_asked_for_whole_are_returned_unchanged():
+    plan = ExtractionPlan.parse("profile,posts", "posts.urn")
+    output = PostOutput(posts=[POST], reposts=[])
+
+    assert plan.project("profile", PROFILE) is PROFILE
+    assert ExtractionPlan().project("posts", output) is output
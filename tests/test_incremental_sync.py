@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.services.postStore import SyncCursor
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def upstream():
+    # Four pages of posts, two days apart
+    return create_app(latency=0, post_pages=4, post_interval_hours=48, etags=True)
+
+
+async def sync(api, **params) -> dict:
+    response = await api.get("/extract-posts", params={"username": "alice", "incremental": "true", "cache": "bypass", **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_second_sync_stops_at_the_stored_cursor(api, upstream):
+    first = await sync(api)
+    second = await sync(api)
+
+    assert first["pages_fetched"] > 1
+    assert second["pages_fetched"] == 1
+    assert second["credits_used"] == 1
+    # The stored window answers for the pages that were not fetched again
+    assert [post["urn"] for post in second["posts"]] == [post["urn"] for post in first["posts"]]
+    assert upstream.state.requests["/get-profile-posts"] == first["pages_fetched"] + 1
+
+
+async def test_bounds_apply_to_the_stored_result(api):
+    await sync(api)
+    limited = await sync(api, max_posts=3)
+
+    assert limited["pages_fetched"] == 1
+    assert len(limited["posts"]) + len(limited["reposts"]) == 3
+
+
+async def test_since_before_the_window_walks_everything(api, monkeypatch):
+    monkeypatch.setattr(settings, "POSTS_WINDOW_DAYS", 10)
+    windowed = await sync(api)
+    older = await sync(api, since=(datetime.utcnow() - timedelta(days=60)).isoformat())
+
+    # The store only keeps the window; an older since is a full walk, not a clipped answer
+    assert len(older["posts"]) + len(older["reposts"]) > len(windowed["posts"]) + len(windowed["reposts"])
+    oldest = min(post["postedDate"] for post in older["posts"] + older["reposts"])
+    assert oldest[:10] < (datetime.utcnow() - timedelta(days=10)).strftime("%Y-%m-%d")
+
+
+async def test_without_incremental_every_page_is_fetched(api):
+    await sync(api)
+    full = (await api.get("/extract-posts", params={"username": "alice", "cache": "bypass"})).json()
+
+    assert full["pages_fetched"] > 1
+
+
+def test_cursor_reached_on_known_urn_or_watermark():
+    cursor = SyncCursor({"alice-3"}, "2025-01-10 00:00:00")
+
+    assert cursor.reached([{"urn": "alice-9", "postedDate": "2025-02-01 00:00:00"}, {"urn": "alice-3"}])
+    assert cursor.reached([{"urn": "alice-9", "postedDate": "2025-01-09 00:00:00.000 +0000 UTC"}])
+    assert not cursor.reached([{"urn": "alice-9", "postedDate": "2025-02-01 00:00:00.000 +0000 UTC"}])
+    assert not cursor.reached([])
+
+
+async def test_sync_revalidates_the_cached_first_page(api, upstream, cache):
+    await sync(api, cache="use")
+    upstream.state.published = 1
+
+    second = await sync(api, cache="use")
+
+    # Served from the cache the page would still be the one from before the new post
+    urns = [post["urn"] for post in second["posts"] + second["reposts"]]
+    assert urns[0] == "alice--1"
+    assert second["pages_fetched"] == 1
+    assert second["credits_used"] == 1
+
+
+async def test_unchanged_first_page_is_revalidated_not_downloaded(api, cache):
+    first = await sync(api, cache="use")
+    second = await sync(api, cache="use")
+
+    assert second["credits_used"] == 1
+    assert cache.stats()["revalidations"] == 1
+    assert second["posts"] == first["posts"]
+
+
+def test_blocking_manager_syncs_the_same_way(blocking_manager, upstream):
+    first = blocking_manager.session("bypass").fetch_recent_posts_by_username("alice", incremental=True)
+    upstream.state.published = 1
+    second = blocking_manager.session("bypass").fetch_recent_posts_by_username("alice", incremental=True)
+
+    assert first.pages_fetched > 1
+    assert second.pages_fetched == 1
+    assert [post.urn for post in second.posts + second.reposts][:2] == ["alice--1", "alice-0"]
+    assert upstream.state.requests["/get-profile-posts"] == first.pages_fetched + 1
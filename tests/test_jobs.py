@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+
+from src.linkedin_extractor import main
+from src.linkedin_extractor.services.extraction import extract_all_job_runner
+from src.linkedin_extractor.services.jobQueue import JobStore, JobWorkerPool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), max_attempts=2, retention_seconds=0)
+
+
+async def test_expired_lease_is_claimed_again(store):
+    job_id, _ = store.submit("extract_all", {"username": "alice"})
+    first = store.claim(lease_seconds=0.05)
+
+    # Leased: nobody else gets it
+    assert store.claim(lease_seconds=60) is None
+    await asyncio.sleep(0.1)
+    second = store.claim(lease_seconds=60)
+
+    assert first["id"] == second["id"] == job_id
+    assert (first["attempts"], second["attempts"]) == (1, 2)
+    assert store.status(job_id)["status"] == "running"
+
+
+async def test_job_fails_once_its_attempts_are_used_up(store):
+    job_id, _ = store.submit("extract_all", {"username": "alice"})
+    for _ in range(2):
+        assert store.claim(lease_seconds=0.01) is not None
+        await asyncio.sleep(0.05)
+
+    assert store.claim(lease_seconds=60) is None
+    status = store.status(job_id)
+    assert status["status"] == "failed"
+    assert status["error"] == "worker lost too many times"
+
+
+def test_renewed_lease_keeps_the_job(store):
+    store.submit("extract_all", {"username": "alice"})
+    job = store.claim(lease_seconds=0.05)
+    store.renew(job["id"], 60, {"sections_done": 1})
+    time.sleep(0.1)
+
+    assert store.claim(lease_seconds=60) is None
+    assert store.status(job["id"])["progress"] == {"sections_done": 1}
+
+
+def test_duplicate_submission_returns_the_queued_job(store):
+    job_id, deduplicated = store.submit("extract_all", {"username": "alice"})
+    again, again_deduplicated = store.submit("extract_all", {"username": "alice"})
+    other, _ = store.submit("extract_all", {"username": "bob"})
+
+    assert (deduplicated, again_deduplicated) == (False, True)
+    assert again == job_id
+    assert other != job_id
+
+
+async def test_worker_stop_hands_the_job_back(store):
+    started = asyncio.Event()
+
+    async def runner(params, progress):
+        started.set()
+        await asyncio.sleep(60)
+
+    pool = JobWorkerPool(store, {"extract_all": runner}, workers=1, poll_interval=0.01, lease_seconds=60)
+    job_id, _ = store.submit("extract_all", {"username": "alice"})
+    pool.start()
+    await asyncio.wait_for(started.wait(), 1)
+    await pool.stop()
+
+    # Released without spending an attempt, ready for the next worker
+    status = store.status(job_id)
+    assert (status["status"], status["attempts"]) == ("queued", 0)
+
+
+async def test_failed_runner_marks_the_job_failed(store):
+    async def runner(params, progress):
+        progress(step="profile")
+        raise ValueError("upstream down")
+
+    pool = JobWorkerPool(store, {"extract_all": runner}, workers=1, poll_interval=0.01, lease_seconds=60)
+    job_id, _ = store.submit("extract_all", {"username": "alice"})
+    pool.start()
+    try:
+        await wait_for_status(store, job_id, "failed")
+    finally:
+        await pool.stop()
+
+    status = store.status(job_id)
+    assert status["error"] == "upstream down"
+    assert status["progress"] == {"step": "profile"}
+
+
+async def test_extract_all_job_through_the_api(api, manager, store, monkeypatch):
+    pool = JobWorkerPool(
+        store, {"extract_all": extract_all_job_runner(manager)}, workers=1, poll_interval=0.01, lease_seconds=60
+    )
+    monkeypatch.setattr(main, "job_store", store)
+    monkeypatch.setattr(main, "job_workers", pool)
+    pool.start()
+    try:
+        submitted = await api.post("/jobs/extract-all", json={"username": "alice", "sections": "profile,posts"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        await wait_for_status(store, job_id, "done")
+        result = await api.get(f"/jobs/{job_id}/result")
+    finally:
+        await pool.stop()
+
+    assert result.status_code == 200
+    body = result.json()
+    assert body["profile"]["headline"]
+    assert body["posts"]
+    assert "commented_posts" not in body
+    assert (await api.get("/jobs/unknown")).status_code == 404
+
+
+async def wait_for_status(store: JobStore, job_id: str, status: str, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while store.status(job_id)["status"] != status:
+        assert time.monotonic() < deadline, f"job {job_id} never reached {status}"
+        await asyncio.sleep(0.01)
@@ -0,0 +1,177 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from src.linkedin_extractor.services import keyPool
+from src.linkedin_extractor.services.keyPool import THROTTLE_HALF_LIFE, ApiKey, KeyPool, KeyPoolExhaustedError
+from src.linkedin_extractor.services.sharedState import LocalRedis, RedisState, SQLiteState
+
+pytestmark = pytest.mark.anyio
+
+
+def picks(pool: KeyPool, times: int) -> Counter:
+    counts = Counter()
+    for _ in range(times):
+        key = pool.acquire()
+        pool.release(key)
+        counts[key.value] += 1
+    return counts
+
+
+def by_value(pool: KeyPool) -> dict[str, ApiKey]:
+    return {key.value: key for key in pool.keys}
+
+
+def test_keys_are_picked_by_quota_left():
+    random.seed(7)
+    pool = KeyPool([("big", 900), ("small", 100)], None)
+
+    counts = picks(pool, 2000)
+
+    assert 0.85 < counts["big"] / 2000 < 0.95
+
+
+def test_unknown_quota_counts_as_the_best_known_one():
+    random.seed(7)
+    pool = KeyPool([("known", 100), ("unknown", 0)], None)
+
+    counts = picks(pool, 2000)
+
+    assert 0.4 < counts["unknown"] / 2000 < 0.6
+
+
+def test_throttled_key_cools_down_for_its_retry_after():
+    pool = KeyPool([("a", 0), ("b", 0)], None)
+    a = by_value(pool)["a"]
+    pool.acquire()
+
+    rerouted = pool.record(a, 429, {"Retry-After": "30"})
+
+    # Another key can take the retry, so the shared limiter does not need to pause
+    assert rerouted
+    assert set(picks(pool, 50)) == {"b"}
+    assert pool.stats()["keys"][0]["throttled"]
+
+
+def test_every_key_throttled_uses_the_first_to_recover():
+    pool = KeyPool([("a", 0), ("b", 0)], None)
+    keys = by_value(pool)
+    pool.acquire()
+    pool.acquire()
+    pool.record(keys["a"], 429, {"Retry-After": "60"})
+    # No key left to reroute to: the shared limiter has to back off
+    assert not pool.record(keys["b"], 429, {"Retry-After": "5"})
+
+    assert set(picks(pool, 20)) == {"b"}
+
+
+def test_recent_429s_decay_with_the_half_life():
+    key = ApiKey("a", 100)
+    key.recent_429s = 4.0
+    key._decayed_at = 0.0
+
+    key.decay(THROTTLE_HALF_LIFE)
+    assert key.recent_429s == pytest.approx(2.0)
+    # Throttled keys get less traffic while the count is high
+    assert key.weight(100) == pytest.approx(100 / 3)
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_rejected_key_is_retired_until_the_next_period(status):
+    pool = KeyPool([("revoked", 0), ("good", 0)], None)
+    revoked = by_value(pool)["revoked"]
+    pool.acquire()
+
+    pool.record(revoked, status, {})
+
+    assert revoked.retired_until == keyPool.next_period_start(time.time())
+    assert set(picks(pool, 50)) == {"good"}
+
+
+def test_key_with_no_requests_remaining_is_retired_until_its_reset():
+    pool = KeyPool([("a", 0)], None)
+    key = pool.acquire()
+
+    pool.record(key, 200, {"x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "120"})
+
+    with pytest.raises(KeyPoolExhaustedError) as error:
+        pool.acquire()
+    assert 110 < error.value.retry_after <= 120
+    assert pool.stats()["keys"][0]["retired"]
+
+
+def test_configured_quota_runs_out():
+    pool = KeyPool([("a", 2)], None)
+    for _ in range(2):
+        pool.record(pool.acquire(), 200, {})
+
+    with pytest.raises(KeyPoolExhaustedError) as error:
+        pool.acquire()
+    # Back at the start of next month
+    assert error.value.retry_after == pytest.approx(keyPool.next_period_start(time.time()) - time.time(), abs=5)
+
+
+def test_new_period_resets_usage_and_retirements(tmp_path, monkeypatch):
+    pool = KeyPool([("a", 2), ("b", 0)], str(tmp_path / "keys.sqlite3"))
+    keys = by_value(pool)
+    for _ in range(2):
+        pool.acquire()
+        pool.record(keys["a"], 200, {})
+    pool.acquire()
+    pool.record(keys["b"], 403, {})
+
+    monkeypatch.setattr(keyPool, "current_period", lambda now=None: "2099-01")
+    pool.release(pool.acquire())
+
+    assert pool.period == "2099-01"
+    assert (keys["a"].used, keys["b"].used) == (0, 0)
+    assert keys["b"].retired_until is None
+
+
+def test_usage_survives_a_restart_in_sqlite(tmp_path):
+    path = str(tmp_path / "keys.sqlite3")
+    pool = KeyPool([("a", 0), ("b", 0)], path)
+    keys = by_value(pool)
+    for _ in range(3):
+        pool.acquire()
+        pool.record(keys["a"], 200, {"x-ratelimit-requests-remaining": "97"})
+    pool.acquire()
+    pool.record(keys["b"], 401, {})
+
+    restarted = by_value(KeyPool([("a", 0), ("b", 0)], path))
+
+    assert (restarted["a"].used, restarted["a"].remaining) == (3, 97)
+    assert restarted["b"].retired_until == keys["b"].retired_until
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis"])
+def test_workers_share_usage_through_shared_state(tmp_path, backend):
+    state = SQLiteState(str(tmp_path / "state.sqlite3")) if backend == "sqlite" else RedisState(LocalRedis())
+    first = KeyPool([("a", 0), ("b", 0)], None, state, sync_interval=0)
+    second = KeyPool([("a", 0), ("b", 0)], None, state, sync_interval=0)
+    for _ in range(2):
+        first.acquire()
+        first.record(by_value(first)["a"], 200, {})
+    second.acquire()
+    second.record(by_value(second)["a"], 200, {})
+    first.acquire()
+    first.record(by_value(first)["b"], 403, {})
+
+    # The other worker's next acquire re-reads the shared totals
+    assert set(picks(second, 20)) == {"a"}
+    assert by_value(second)["a"].used == 3
+    assert by_value(second)["b"].retired_until is not None
+    assert by_value(KeyPool([("a", 0), ("b", 0)], None, state))["a"].used == 3
+
+
+async def test_exhausted_pool_answers_503(api, manager):
+    manager.key_pool = KeyPool([("a", 1)], None)
+    manager.key_pool.record(manager.key_pool.acquire(), 200, {})
+
+    response = await api.get("/extract-profile", params={"username": "alice"})
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "All RapidAPI keys are out of quota"
+    assert int(response.headers["Retry-After"]) >= 1
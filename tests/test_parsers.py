@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.mock_upstream import load_fixture
+from src.linkedin_extractor.config.config import settings
+from src.linkedin_extractor.schemas.profile import PostData
+from src.linkedin_extractor.services import parsers
+from src.linkedin_extractor.services.metrics import SCHEMA_MISMATCHES
+
+
+def parse_fixtures():
+    posts, reposts = [], []
+    parsers.parse_posts_page(
+        load_fixture("profile_posts")["data"], datetime.utcnow() - timedelta(days=36500), posts, reposts
+    )
+    return [
+        parsers.parse_profile(load_fixture("profile")),
+        *posts,
+        *reposts,
+        parsers.parse_profile_comments(load_fixture("profile_comments")),
+        parsers.parse_profile_likes(load_fixture("profile_likes")),
+        *parsers.parse_post_comment_records(load_fixture("post_comments")["data"], 10),
+    ]
+
+
+def test_trusted_and_strict_builds_dump_the_same(monkeypatch):
+    monkeypatch.setattr(parsers, "TRUSTED", False)
+    strict = parse_fixtures()
+    monkeypatch.setattr(parsers, "TRUSTED", True)
+    trusted = parse_fixtures()
+
+    assert [type(model) for model in trusted] == [type(model) for model in strict]
+    assert [model.model_dump_json() for model in trusted] == [model.model_dump_json() for model in strict]
+
+
+def test_trusted_build_still_validates_a_sample(monkeypatch):
+    monkeypatch.setattr(parsers, "TRUSTED", True)
+    monkeypatch.setattr(settings, "SCHEMA_VALIDATION_SAMPLE_RATE", 1.0)
+    before = {labels["model"]: value for _, labels, value in SCHEMA_MISMATCHES.samples()}
+
+    post = parsers.build(PostData, {"postedDate": "2025-01-01", "totalReactionCount": "many"})
+
+    assert post.totalReactionCount == "many"
+    after = {labels["model"]: value for _, labels, value in SCHEMA_MISMATCHES.samples()}
+    assert after["PostData"] == before.get("PostData", 0) + 1
+
+
+def test_strict_build_rejects_bad_items(monkeypatch):
+    monkeypatch.setattr(parsers, "TRUSTED", False)
+
+    with pytest.raises(ValueError):
+        parsers.build(PostData, {"postedDate": "2025-01-01", "totalReactionCount": "many"})
@@ -0,0 +1,133 @@
+from urllib.parse import parse_qs
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+
+pytestmark = pytest.mark.anyio
+
+COMMENTS_PATH = "/get-profile-posts-comments"
+# The mock upstream answers 3 comments a page, 3 pages per post
+THREAD_LENGTH = 9
+
+
+class MissingPosts:
+    """Answers 404 for the comments of ``missing`` posts."""
+
+    def __init__(self, app, missing: set[str]):
+        self.app = app
+        self.missing = missing
+        self.state = app.state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and parse_qs(scope["query_string"].decode()).get("urn", [None])[0] in self.missing:
+            self.state.requests[scope["path"]] += 1
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+            return
+        await self.app(scope, receive, send)
+
+
+@pytest.fixture
+def upstream():
+    return MissingPosts(create_app(latency=0), {"ghost-1"})
+
+
+@pytest.fixture
+def walks(monkeypatch):
+    """(urn, count) of every thread walked upstream, as opposed to served from the thread cache."""
+    walked = []
+    walk = AsyncLinkedInAPIManager._walk_post_comments
+
+    async def counted(self, urn, count, parse):
+        walked.append((urn, count))
+        return await walk(self, urn, count, parse)
+
+    monkeypatch.setattr(AsyncLinkedInAPIManager, "_walk_post_comments", counted)
+    return walked
+
+
+def counts(result) -> dict:
+    return {key: result[key] for key in ("requested", "unique", "cached", "fetched", "failures")}
+
+
+async def test_repeated_urns_are_fetched_once(manager, upstream, walks):
+    result = await manager.session().fetch_comment_records_by_post_urns(["alice-1", "alice-2", "alice-1"], count=3)
+
+    assert counts(result) == {"requested": 3, "unique": 2, "cached": 0, "fetched": 2, "failures": 0}
+    assert list(result["threads"]) == ["alice-1", "alice-2"]
+    assert all("(alice-2 p1)" in comment.text for comment in result["threads"]["alice-2"])
+    assert sorted(walks) == [("alice-1", 3), ("alice-2", 3)]
+    assert upstream.state.requests[COMMENTS_PATH] == 2
+
+
+async def test_first_page_failures_are_reported_per_urn(manager, walks):
+    result = await manager.session().fetch_comment_records_by_post_urns(["alice-1", "ghost-1"], count=3)
+
+    assert counts(result) == {"requested": 2, "unique": 2, "cached": 0, "fetched": 1, "failures": 1}
+    assert list(result["threads"]) == ["alice-1"]
+    assert list(result["failed"]) == ["ghost-1"]
+
+
+async def test_cached_thread_serves_smaller_counts_only(manager, walks):
+    session = manager.session()
+    await session.fetch_comment_records_by_post_urns(["alice-1"], count=5)
+
+    smaller = await session.fetch_comment_records_by_post_urns(["alice-1"], count=2)
+    larger = await session.fetch_comment_records_by_post_urns(["alice-1"], count=6)
+
+    assert counts(smaller)["cached"] == 1
+    assert len(smaller["threads"]["alice-1"]) == 2
+    # Five comments were stored and the post had more: six needs a new walk
+    assert counts(larger)["cached"] == 0
+    assert len(larger["threads"]["alice-1"]) == 6
+    assert walks == [("alice-1", 5), ("alice-1", 6)]
+
+
+async def test_exhausted_thread_serves_any_count(manager, walks):
+    session = manager.session()
+    first = await session.fetch_comment_records_by_post_urns(["alice-1"], count=20)
+
+    again = await session.fetch_comment_records_by_post_urns(["alice-1"], count=50)
+
+    assert len(first["threads"]["alice-1"]) == THREAD_LENGTH
+    assert counts(again)["cached"] == 1
+    assert again["threads"]["alice-1"] == first["threads"]["alice-1"]
+    assert walks == [("alice-1", 20)]
+
+
+async def test_bypass_neither_reads_nor_stores_threads(manager, upstream, walks):
+    await manager.session().fetch_comment_records_by_post_urns(["alice-1"], count=20)
+    before = upstream.state.requests[COMMENTS_PATH]
+
+    bypassed = await manager.session("bypass").fetch_comment_records_by_post_urns(["alice-1", "alice-2"], count=20)
+
+    assert counts(bypassed)["cached"] == 0
+    assert upstream.state.requests[COMMENTS_PATH] == before + 2 * 3
+    after = await manager.session().fetch_comment_records_by_post_urns(["alice-2"], count=20)
+    assert counts(after)["cached"] == 0
+    assert walks == [("alice-1", 20), ("alice-1", 20), ("alice-2", 20), ("alice-2", 20)]
+
+
+async def test_refresh_refetches_and_stores_threads(manager, upstream, walks):
+    await manager.session().fetch_comment_records_by_post_urns(["alice-1"], count=2)
+
+    refreshed = await manager.session("refresh").fetch_comment_records_by_post_urns(["alice-1"], count=20)
+    served = await manager.session().fetch_comment_records_by_post_urns(["alice-1"], count=50)
+
+    assert counts(refreshed)["cached"] == 0
+    assert len(refreshed["threads"]["alice-1"]) == THREAD_LENGTH
+    # The refreshed thread was stored whole, so it now serves any count
+    assert counts(served)["cached"] == 1
+    assert walks == [("alice-1", 2), ("alice-1", 20)]
+
+
+async def test_batch_endpoint_reports_the_dedupe(api, upstream):
+    response = await api.post("/extract-post-comments-batch", json={"urns": ["alice-1", "alice-1", "alice-2"], "count": 3})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert counts(body) == {"requested": 3, "unique": 2, "cached": 0, "fetched": 2, "failures": 0}
+    assert body["threads"]["alice-1"][0]["text"].endswith("(alice-1 p1)")
+    assert body["credits_used"] == upstream.state.requests[COMMENTS_PATH] == 2
@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.apiManager import LinkedInAPIManager
+
+pytestmark = pytest.mark.anyio
+
+POSTS_PATH = "/get-profile-posts"
+
+
+@pytest.fixture(params=["async", "blocking"])
+def iterating_manager(request):
+    return request.getfixturevalue("manager" if request.param == "async" else "blocking_manager")
+
+
+async def iterate(manager, **kwargs) -> list[str]:
+    posts = manager.session("bypass").iter_posts_by_username("alice", **kwargs)
+    if isinstance(manager, LinkedInAPIManager):
+        return [post.urn for post in posts]
+    return [post.urn async for post in posts]
+
+
+def is_repost(urn: str) -> bool:
+    # The third fixture post of every five is a repost
+    return int(urn.rsplit("-", 1)[1]) % 5 == 2
+
+
+async def test_iterator_fetches_only_the_pages_it_yields(iterating_manager, upstream):
+    urns = await iterate(iterating_manager, max_items=3)
+
+    assert urns == ["alice-0", "alice-1", "alice-2"]
+    assert upstream.state.requests[POSTS_PATH] == 1
+
+
+async def test_iterator_walks_every_page(iterating_manager, upstream):
+    urns = await iterate(iterating_manager)
+
+    assert len(urns) == 200
+    assert upstream.state.requests[POSTS_PATH] == 4
+
+
+async def test_iterator_stops_at_since(iterating_manager, upstream):
+    # Posts are 12 hours apart
+    urns = await iterate(iterating_manager, since=datetime.utcnow() - timedelta(hours=30))
+
+    assert urns == ["alice-0", "alice-1", "alice-2"]
+    assert upstream.state.requests[POSTS_PATH] == 1
+
+
+@pytest.mark.parametrize("reposts", ["exclude", "only"])
+async def test_iterator_filters_reposts(iterating_manager, reposts):
+    urns = await iterate(iterating_manager, max_items=10, reposts=reposts)
+
+    assert len(urns) == 10
+    assert all(is_repost(urn) == (reposts == "only") for urn in urns)
+
+
+async def test_stream_endpoint_sends_ndjson(api, upstream):
+    response = await api.get("/extract-posts-stream", params={"username": "alice", "max_posts": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["urn"] for line in response.text.splitlines()] == ["alice-0", "alice-1", "alice-2"]
+
+
+async def test_stream_endpoint_with_no_posts_is_empty(api):
+    response = await api.get("/extract-posts-stream", params={"username": "alice", "since": "2999-01-01T00:00:00"})
+
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+class TestUpstreamFailure:
+    @pytest.fixture
+    def upstream(self):
+        # Every request is a 503
+        return create_app(latency=0, error_rate=1.0)
+
+    async def test_stream_endpoint_answers_502(self, api):
+        response = await api.get("/extract-posts-stream", params={"username": "alice"})
+
+        assert response.status_code == 502
+        assert response.json()["upstream_status"] == 503
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.asyncApiManager import CommentPrefetcher
+
+pytestmark = pytest.mark.anyio
+
+COMMENTS_PATH = "/get-profile-posts-comments"
+
+
+@pytest.fixture
+def upstream():
+    # One page of comments per post
+    return create_app(latency=0.05, comment_pages=1)
+
+
+async def test_prefetched_threads_are_not_fetched_again(manager, upstream):
+    done = []
+    prefetcher = CommentPrefetcher(manager.session("bypass"), count=2, on_done=lambda: done.append(1))
+    prefetcher.schedule(["urn-a", "urn-b"])
+    prefetcher.schedule(["urn-a"])
+
+    threads = await prefetcher.gather(["urn-b", "urn-c", "urn-a"])
+
+    assert [thread[0].split("(")[1] for thread in threads] == ["urn-b p1)", "urn-c p1)", "urn-a p1)"]
+    assert prefetcher.scheduled == 3
+    assert len(done) == 3
+    assert upstream.state.requests[COMMENTS_PATH] == 3
+    assert await prefetcher.gather(["urn-a", "urn-b"]) == [threads[2], threads[0]]
+    assert upstream.state.requests[COMMENTS_PATH] == 3
+
+
+async def test_cancel_drops_unfinished_threads(manager):
+    done = []
+    prefetcher = CommentPrefetcher(manager.session("bypass"), count=2, on_done=lambda: done.append(1))
+    prefetcher.schedule(["urn-a", "urn-b"])
+    await asyncio.sleep(0.01)
+
+    prefetcher.cancel()
+    await asyncio.sleep(0.1)
+
+    assert prefetcher.completed(["urn-a", "urn-b"]) == [None, None]
+    assert done == []
+
+
+async def test_completed_keeps_finished_threads(manager):
+    prefetcher = CommentPrefetcher(manager.session("bypass"), count=2, concurrency=1)
+    prefetcher.schedule(["urn-a", "urn-b"])
+    # One fetch at a time: urn-b is still in flight when urn-a finishes
+    while prefetcher.completed(["urn-a"]) == [None]:
+        await asyncio.sleep(0.005)
+    prefetcher.cancel()
+
+    first, second = prefetcher.completed(["urn-a", "urn-b"])
+    assert first and second is None
+
+
+async def test_extract_all_uses_the_prefetched_threads(api, upstream):
+    response = await api.get(
+        "/extract-all",
+        params={"username": "alice", "sections": "posts", "extract_comments": "yes", "count": 2, "max_posts": 3},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["posts"] and all(len(post["comments"]) == 2 for post in body["posts"])
+    # Scheduled during pagination and gathered after it: one request per post (reposts have no thread)
+    assert upstream.state.requests[COMMENTS_PATH] == len(body["posts"])
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from src.linkedin_extractor.services.aggregation import DeadlineExceededError
+from src.linkedin_extractor.services.scheduler import UpstreamBusyError, UpstreamScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+async def hold(scheduler: UpstreamScheduler, lane: str, started: asyncio.Event, release: asyncio.Event):
+    async with scheduler.async_slot(lane):
+        started.set()
+        await release.wait()
+
+
+async def test_reserved_slots_only_go_to_the_interactive_lane():
+    scheduler = UpstreamScheduler(2, {}, reserved=1)
+    release = asyncio.Event()
+    started = [asyncio.Event() for _ in range(3)]
+    first_bulk = asyncio.create_task(hold(scheduler, "bulk", started[0], release))
+    second_bulk = asyncio.create_task(hold(scheduler, "bulk", started[1], release))
+    await started[0].wait()
+    await asyncio.sleep(0.01)
+
+    # The second bulk attempt waits for a slot; an interactive one takes the reserved slot
+    assert not started[1].is_set()
+    interactive = asyncio.create_task(hold(scheduler, "interactive", started[2], release))
+    await asyncio.wait_for(started[2].wait(), 1)
+    lanes = scheduler.stats()["lanes"]
+    assert lanes["bulk"]["in_flight"] == 1 and lanes["bulk"]["queued"] == 1
+    assert lanes["interactive"]["in_flight"] == 1
+
+    release.set()
+    await asyncio.gather(first_bulk, second_bulk, interactive)
+    assert scheduler.stats()["lanes"]["bulk"]["admissions"] == {"immediate": 1, "queued": 1, "rejected": 0}
+
+
+async def test_freed_slots_go_to_the_heavier_lane_first():
+    scheduler = UpstreamScheduler(1, {"interactive": 8, "bulk": 1})
+    order = []
+    release = asyncio.Event()
+    started = asyncio.Event()
+    holder = asyncio.create_task(hold(scheduler, "bulk", started, release))
+    await started.wait()
+
+    async def attempt(lane: str):
+        async with scheduler.async_slot(lane):
+            order.append(lane)
+
+    waiters = [asyncio.create_task(attempt("bulk"))]
+    await asyncio.sleep(0.01)
+    waiters.append(asyncio.create_task(attempt("interactive")))
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert order == ["interactive", "bulk"]
+
+
+async def test_full_queue_answers_503(api, manager):
+    manager.scheduler = UpstreamScheduler(1, {}, {"interactive": 1})
+    release = asyncio.Event()
+    started = asyncio.Event()
+    holder = asyncio.create_task(hold(manager.scheduler, "interactive", started, release))
+    await started.wait()
+
+    queued = asyncio.create_task(api.get("/extract-profile", params={"username": "alice"}))
+    await asyncio.sleep(0.05)
+    refused = await api.get("/extract-profile", params={"username": "bob"})
+
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "1"
+    assert refused.json()["lane"] == "interactive"
+    release.set()
+    assert (await queued).status_code == 200
+    await holder
+    assert manager.scheduler.stats()["lanes"]["interactive"]["admissions"]["rejected"] == 1
+
+
+async def test_queue_limit_is_per_lane():
+    scheduler = UpstreamScheduler(1, {}, {"interactive": 1})
+    release = asyncio.Event()
+    started = asyncio.Event()
+    holder = asyncio.create_task(hold(scheduler, "interactive", started, release))
+    await started.wait()
+    waiting = asyncio.create_task(hold(scheduler, "interactive", asyncio.Event(), release))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(UpstreamBusyError):
+        async with scheduler.async_slot("interactive"):
+            pass
+    # bulk has no queue limit
+    bulk = asyncio.create_task(hold(scheduler, "bulk", asyncio.Event(), release))
+    await asyncio.sleep(0.01)
+    assert scheduler.stats()["lanes"]["bulk"]["queued"] == 1
+
+    release.set()
+    await asyncio.gather(holder, waiting, bulk)
+
+
+async def test_slot_wait_stops_at_the_deadline():
+    scheduler = UpstreamScheduler(1, {})
+    release = asyncio.Event()
+    started = asyncio.Event()
+    holder = asyncio.create_task(hold(scheduler, "interactive", started, release))
+    await started.wait()
+
+    with pytest.raises(DeadlineExceededError):
+        async with scheduler.async_slot("interactive", time.monotonic() + 0.05):
+            pass
+    assert scheduler.stats()["lanes"]["interactive"]["queued"] == 0
+
+    release.set()
+    await holder
+    assert scheduler.stats()["lanes"]["interactive"]["in_flight"] == 0
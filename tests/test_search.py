@@ -0,0 +1,112 @@
+import pytest
+
+from src.linkedin_extractor.schemas.profile import (
+    CommentData,
+    CommentsOutput,
+    LikeData,
+    LikesOutput,
+    PostData,
+    PostOutput
+)
+from src.linkedin_extractor.services.searchIndex import SearchIndex
+from src.linkedin_extractor.services.snapshotStore import RecordedResults
+
+pytestmark = pytest.mark.anyio
+
+
+def post(urn: str, text: str, reactions: int = 1) -> PostData:
+    return PostData(postedDate="2025-01-10 12:00:00", totalReactionCount=reactions, commentsCount=0, urn=urn, text=text)
+
+
+def like(reactions: int) -> LikesOutput:
+    return LikesOutput([LikeData(
+        text="Scaling postgres at work", action="likes", postedDate="2025-01-05 08:00:00",
+        totalReactionCount=reactions, commentsCount=1,
+    )])
+
+
+def fts_rows(index: SearchIndex, word: str) -> int:
+    return index.db.execute("SELECT COUNT(*) FROM documents_fts WHERE documents_fts MATCH ?", (word,)).fetchone()[0]
+
+
+def test_changed_post_replaces_its_document(search_index):
+    search_index.record("alice", PostOutput(posts=[post("alice-1", "kubernetes rollout notes")], reposts=[]))
+    search_index.record("alice", PostOutput(posts=[post("alice-1", "postgres migration notes")], reposts=[]))
+
+    # The update trigger swaps the FTS row: the old text no longer matches
+    assert search_index.search("kubernetes") == []
+    assert [hit["item"]["urn"] for hit in search_index.search("postgres")] == ["alice-1"]
+    assert search_index.stats()["post"] == 1
+    assert fts_rows(search_index, "notes") == 1
+
+
+def test_deleted_document_leaves_the_fts_table(search_index):
+    search_index.record("alice", PostOutput(posts=[post("alice-1", "kubernetes rollout")], reposts=[]))
+    search_index.db.execute("DELETE FROM documents WHERE item_key = 'alice-1'")
+
+    assert fts_rows(search_index, "kubernetes") == 0
+    assert search_index.search("kubernetes") == []
+
+
+def test_unchanged_content_is_not_rewritten(search_index):
+    search_index.record("alice", PostOutput(posts=[post("alice-1", "kubernetes rollout")], reposts=[]))
+    indexed_at = search_index.db.execute("SELECT indexed_at FROM documents").fetchone()[0]
+    # Forget the result-level digest so the row-level check is what skips the write
+    search_index.recorded = RecordedResults()
+    search_index.record("alice", PostOutput(posts=[post("alice-1", "kubernetes rollout")], reposts=[]))
+
+    assert search_index.db.execute("SELECT indexed_at FROM documents").fetchone()[0] == indexed_at
+
+
+def test_like_counter_changes_keep_one_document(search_index):
+    for reactions in (1, 2, 3):
+        search_index.record("alice", like(reactions))
+
+    hits = search_index.search("postgres")
+    assert len(hits) == 1
+    assert hits[0]["item"]["totalReactionCount"] == 3
+
+
+def test_comments_on_one_post_are_separate_documents(search_index):
+    comments = CommentsOutput([
+        CommentData(
+            highlightedComments=text, text="Release notes", postedDate="2025-01-01 09:00:00",
+            commentedDate=date, postUrl="https://www.linkedin.com/feed/update/urn:li:activity:1/",
+        )
+        for text, date in (("first rollout question", "2025-01-02 10:00:00"), ("second rollout question", "2025-01-02 11:00:00"))
+    ])
+    search_index.record("alice", comments)
+
+    assert len(search_index.search("rollout")) == 2
+
+
+def test_old_like_keys_are_merged_on_open(tmp_path):
+    path = str(tmp_path / "search.sqlite3")
+    index = SearchIndex(path)
+    index.record("alice", like(1))
+    # Keys as the first version wrote them: one document per content hash
+    index.db.execute(
+        "INSERT INTO documents (username, kind, item_key, item_date, body, content_hash, data, indexed_at)"
+        " SELECT username, kind, 'legacy', item_date, body, 'legacy', data, indexed_at - 1 FROM documents"
+    )
+    index.db.execute("PRAGMA user_version = 0")
+
+    reopened = SearchIndex(path)
+    assert reopened.stats()["like"] == 1
+    assert len(reopened.search("postgres")) == 1
+
+
+async def test_extracted_activity_is_searchable(api, upstream):
+    await api.get("/extract-likes", params={"username": "alice"})
+    await api.get("/extract-comments", params={"username": "alice"})
+    requests_before = sum(upstream.state.requests.values())
+
+    likes = (await api.get("/search", params={"q": "python", "type": "like"})).json()
+    comments = (await api.get("/search", params={"q": "coalescing", "username": "alice"})).json()
+
+    assert likes["count"] >= 1
+    assert {hit["kind"] for hit in likes["results"]} == {"like"}
+    assert [hit["kind"] for hit in comments["results"]] == ["comment"]
+    # Search answers from the local index only
+    assert sum(upstream.state.requests.values()) == requests_before
+    assert (await api.get("/search-stats")).json()["comment"] >= 1
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from src.linkedin_extractor.services.asyncApiManager import AsyncLinkedInAPIManager
+from src.linkedin_extractor.services.cache import ResponseCache
+from src.linkedin_extractor.services.keyPool import KeyPool
+from src.linkedin_extractor.services.resilience import RetryPolicy, UpstreamGuard
+from src.linkedin_extractor.services.sharedState import (
+    LocalRedis,
+    RedisState,
+    SharedCacheTier,
+    SharedFlight,
+    SharedTokenBucket,
+    SQLiteState
+)
+
+pytestmark = pytest.mark.anyio
+
+TTL = 0.1
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def state(request, tmp_path):
+    return SQLiteState(str(tmp_path / "state.sqlite3")) if request.param == "sqlite" else RedisState(LocalRedis())
+
+
+def expire():
+    time.sleep(TTL * 1.5)
+
+
+def test_set_expires_after_its_ttl(state):
+    state.set("a", b"1", ttl=TTL)
+    state.set("b", b"2")
+
+    assert state.get_many(["a", "b", "c"]) == [b"1", b"2", None]
+    expire()
+    assert state.get_many(["a", "b"]) == [None, b"2"]
+
+
+def test_set_if_absent_takes_free_or_expired_keys(state):
+    assert state.set_if_absent("lock", b"first", ttl=TTL)
+    assert not state.set_if_absent("lock", b"second", ttl=TTL)
+    assert state.get("lock") == b"first"
+
+    expire()
+    assert state.set_if_absent("lock", b"third", ttl=TTL)
+    assert state.get("lock") == b"third"
+
+
+def test_incr_sets_the_ttl_only_when_creating_the_key(state):
+    assert state.incr("n", 2, ttl=TTL) == 2
+    time.sleep(TTL / 2)
+    # A later incr does not push the expiry back
+    assert state.incr("n", 3, ttl=TTL) == 5
+
+    time.sleep(TTL)
+    assert state.get("n") is None
+    assert state.incr("n", 1, ttl=TTL) == 1
+
+
+def test_delete_if_equal_only_deletes_a_matching_value(state):
+    state.set("owner", b"me")
+
+    assert not state.delete_if_equal("owner", b"someone-else")
+    assert state.get("owner") == b"me"
+    assert state.delete_if_equal("owner", b"me")
+    assert state.get("owner") is None
+
+
+def test_token_bucket_is_shared_between_instances(state):
+    # Two workers, 10 requests per second between them, no burst
+    first = SharedTokenBucket(state, "upstream", rate=10, burst=1)
+    second = SharedTokenBucket(state, "upstream", rate=10, burst=1)
+
+    waits = [bucket.reserve() for bucket in (first, second, first, second)]
+
+    assert waits[0] == 0
+    assert waits[1:] == pytest.approx([0.1, 0.2, 0.3], abs=0.02)
+
+
+def test_token_bucket_pause_applies_to_every_instance(state):
+    first = SharedTokenBucket(state, "upstream", rate=1000, burst=10)
+    second = SharedTokenBucket(state, "upstream", rate=1000, burst=10)
+
+    first.pause(0.5)
+
+    assert second.reserve() == pytest.approx(0.5, abs=0.05)
+    # A shorter pause does not cut a longer one short
+    second.pause(0.1)
+    assert first.reserve() == pytest.approx(0.5, abs=0.05)
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, path, count_miss=True):
+        return self.values.get(path)
+
+
+def test_flight_waiter_takes_the_claimant_s_result(state):
+    owner, waiter = SharedFlight(state, lease=5, poll_interval=0.01), SharedFlight(state, lease=5, poll_interval=0.01)
+    cache = FakeCache()
+    assert owner.wait("/path", cache) is None
+
+    threading.Timer(0.05, lambda: cache.values.update({"/path": b"body"})).start()
+
+    assert waiter.wait("/path", cache) == b"body"
+
+
+def test_flight_is_claimed_again_after_release_or_lease_expiry(state):
+    owner, waiter = SharedFlight(state, lease=TTL), SharedFlight(state, lease=TTL)
+    assert owner.claim("/a") and owner.claim("/b")
+    assert not waiter.claim("/a")
+
+    # Releasing someone else's claim does nothing
+    waiter.release("/a")
+    assert not waiter.claim("/a")
+    owner.release("/a")
+    assert waiter.claim("/a")
+
+    expire()
+    assert waiter.claim("/b")
+
+
+async def test_async_flight_waiter_takes_the_claimant_s_result(state):
+    owner, waiter = SharedFlight(state, lease=5, poll_interval=0.01), SharedFlight(state, lease=5, poll_interval=0.01)
+    cache = FakeCache()
+    assert await owner.async_wait("/path", cache) is None
+
+    task = asyncio.create_task(waiter.async_wait("/path", cache))
+    await asyncio.sleep(0.05)
+    cache.values["/path"] = b"body"
+
+    assert await task == b"body"
+    await owner.async_release("/path")
+    assert await waiter.async_wait("/path", cache) is None
+
+
+class SlowRedis:
+    """LocalRedis with a round trip's latency on every call, like a remote server."""
+
+    def __init__(self, latency: float):
+        self.client = LocalRedis()
+        self.latency = latency
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            self.calls += 1
+            time.sleep(self.latency)
+            return method(*args, **kwargs)
+        return call
+
+
+def shared_manager(upstream, scheduler, state) -> AsyncLinkedInAPIManager:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream), base_url="http://mock-upstream")
+    return AsyncLinkedInAPIManager(
+        client=client,
+        cache=ResponseCache(1024 * 1024, None, 0, {"profile": 3600}, shared_tier=SharedCacheTier(state)),
+        guard=UpstreamGuard(SharedTokenBucket(state, "upstream", 1000, 10), RetryPolicy(3, 0.01, 0.01), None),
+        key_pool=KeyPool([("test-key", 0)], None, state, sync_interval=0),
+        scheduler=scheduler,
+        state=state,
+    )
+
+
+async def loop_lag(work) -> float:
+    """Longest the event loop went without running a 5ms ticker while ``work`` ran."""
+    lag = 0.0
+    done = False
+
+    async def tick():
+        nonlocal lag
+        while not done:
+            before = time.monotonic()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.monotonic() - before - 0.005)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        await work
+    finally:
+        done = True
+        await ticker
+    return lag
+
+
+@pytest.mark.parametrize("offload", [True, False])
+async def test_shared_state_calls_do_not_block_the_loop(upstream, scheduler, offload):
+    redis = SlowRedis(latency=0.05)
+    manager = shared_manager(upstream, scheduler, RedisState(redis))
+    manager.offload = offload
+
+    lag = await loop_lag(manager.fetch_profile_data_by_username("alice"))
+
+    # Cache lookup, flight claim, rate limiter, key pool and cache write all went to the state
+    assert redis.calls >= 8
+    if offload:
+        assert lag < 0.04
+    else:
+        assert lag >= 0.05
+    await manager.aclose()
+
+
+async def test_cancelled_flight_claim_is_released(upstream, scheduler):
+    redis = SlowRedis(latency=0.1)
+    state = RedisState(redis)
+    flight = SharedFlight(state, lease=30)
+
+    task = asyncio.create_task(flight.async_wait("/path", FakeCache()))
+    await asyncio.sleep(0.02)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The claim went through in its thread after the cancellation and is handed back
+    await asyncio.sleep(0.4)
+    assert redis.client.get("linkedin_extractor:flight:/path") is None
+
+
+async def test_key_taken_after_a_cancellation_is_handed_back(upstream, scheduler):
+    manager = shared_manager(upstream, scheduler, RedisState(LocalRedis()))
+    manager.singleflight = None
+    acquiring = threading.Event()
+    acquire = manager.key_pool.acquire
+
+    def slow_acquire():
+        acquiring.set()
+        time.sleep(0.1)
+        return acquire()
+
+    manager.key_pool.acquire = slow_acquire
+    task = asyncio.create_task(manager.session("bypass").fetch_profile_data_by_username("alice"))
+    while not acquiring.is_set():
+        await asyncio.sleep(0.005)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await asyncio.sleep(0.2)
+    assert [key["in_flight"] for key in manager.key_pool.stats()["keys"]] == [0]
+    await manager.aclose()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_upstream import create_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def upstream():
+    # Slow enough that concurrent requests overlap
+    return create_app(latency=0.05)
+
+
+async def test_concurrent_identical_requests_share_one_upstream_call(api, upstream, manager):
+    responses = await asyncio.gather(*(
+        api.get("/extract-profile", params={"username": "alice", "cache": "bypass"}) for _ in range(5)
+    ))
+
+    assert {response.status_code for response in responses} == {200}
+    assert upstream.state.requests["/"] == 1
+    stats = (await api.get("/coalescing-stats")).json()["async"]
+    # One fetch_profile execution and the upstream path it requested
+    assert stats["executions"] == 2
+    assert stats["coalesced_by_kind"] == {"fetch_profile_data_by_username": 4}
+    assert stats == manager.singleflight.stats()
+
+
+async def test_different_usernames_are_not_coalesced(api, upstream):
+    await asyncio.gather(*(
+        api.get("/extract-profile", params={"username": name, "cache": "bypass"}) for name in ("alice", "bob")
+    ))
+
+    assert upstream.state.requests["/"] == 2
+
+
+async def test_lanes_are_not_coalesced(manager, upstream):
+    await asyncio.gather(
+        manager.session("bypass", "interactive").fetch_profile_data_by_username("alice"),
+        manager.session("bypass", "interactive").fetch_profile_data_by_username("alice"),
+        manager.session("bypass", "bulk").fetch_profile_data_by_username("alice"),
+    )
+
+    # One call per lane: an interactive caller never waits on a bulk attempt
+    assert upstream.state.requests["/"] == 2
+    assert manager.singleflight.stats()["coalesced"] == 1
+
+
+async def test_each_session_counts_its_own_credits(manager):
+    sessions = [manager.session("bypass") for _ in range(3)]
+    await asyncio.gather(*(session.fetch_profile_data_by_username("alice") for session in sessions))
+
+    # The leader paid for the shared call; followers used no credits
+    assert sorted(session.get_credit_usage() for session in sessions) == [0, 0, 1]
+
+
+async def test_calls_differing_only_in_callbacks_are_coalesced(manager, upstream):
+    pages = []
+    await asyncio.gather(*(
+        manager.session("bypass").fetch_recent_posts_by_username(
+            "alice", max_posts=5, on_page=lambda posts: pages.append(posts)
+        )
+        for _ in range(2)
+    ))
+
+    assert upstream.state.requests["/get-profile-posts"] == 1
+    assert manager.singleflight.stats()["coalesced_by_kind"]["fetch_recent_posts_by_username"] == 1
+    # Only the leader's callback ran
+    assert len(pages) == 1
+
+
+async def test_concurrent_extract_all_with_comments_walks_posts_once(api, upstream):
+    params = {"username": "alice", "sections": "posts", "extract_comments": "yes", "count": 2, "max_posts": 3}
+    first, second = await asyncio.gather(*(api.get("/extract-all", params=params) for _ in range(2)))
+
+    assert first.json()["posts"] == second.json()["posts"]
+    assert upstream.state.requests["/get-profile-posts"] == 1
@@ -0,0 +1,139 @@
+import gzip
+import io
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.linkedin_extractor.schemas.profile import LikeData, LikesOutput, PostData, PostOutput, ProfileOutput
+from src.linkedin_extractor.services import snapshotStore
+from src.linkedin_extractor.services.snapshotStore import SnapshotStore, export_chunks, resolve_export_format
+
+pytestmark = pytest.mark.anyio
+
+
+def post(urn: str, text: str, reactions: int = 1) -> PostData:
+    return PostData(postedDate="2025-01-10 12:00:00", totalReactionCount=reactions, commentsCount=0, urn=urn, text=text)
+
+
+def posts(*items: PostData, reposts: tuple[PostData, ...] = ()) -> PostOutput:
+    return PostOutput(posts=list(items), reposts=list(reposts))
+
+
+def versions(store: SnapshotStore, item_key: str) -> list[str]:
+    rows = store.db.execute("SELECT data FROM snapshots WHERE item_key = ? ORDER BY id", (item_key,)).fetchall()
+    return [json.loads(data)["text"] for data, in rows]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+
+
+def test_unchanged_items_are_recorded_once(store):
+    store.record("alice", posts(post("alice-1", "hello"), post("alice-2", "world")))
+    store.record("alice", posts(post("alice-1", "hello"), post("alice-2", "world!")))
+
+    assert versions(store, "alice-1") == ["hello"]
+    assert versions(store, "alice-2") == ["world", "world!"]
+
+
+def test_content_that_comes_back_is_a_new_version(store):
+    for text in ("first", "edited", "first"):
+        store.record("alice", posts(post("alice-1", text)))
+
+    assert versions(store, "alice-1") == ["first", "edited", "first"]
+
+
+def test_items_are_versioned_per_username_and_kind(store):
+    store.record("alice", posts(post("shared-1", "hello")))
+    store.record("bob", posts(post("shared-1", "hello")))
+    store.record("alice", posts(reposts=(post("shared-1", "hello"),)))
+
+    assert len(versions(store, "shared-1")) == 3
+
+
+def test_stores_with_unique_content_hashes_are_migrated(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE snapshots ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT, captured_at REAL NOT NULL, username TEXT NOT NULL,"
+        " kind TEXT NOT NULL, item_key TEXT NOT NULL, content_hash TEXT NOT NULL, data TEXT NOT NULL,"
+        " UNIQUE (username, kind, item_key, content_hash))"
+    )
+    db.execute(
+        "INSERT INTO snapshots (captured_at, username, kind, item_key, content_hash, data) VALUES (?, ?, ?, ?, ?, ?)",
+        (time.time(), "alice", "post", "alice-1", "old-hash", post("alice-1", "first").model_dump_json()),
+    )
+    db.execute(f"PRAGMA user_version = {snapshotStore.ITEM_KEY_VERSION}")
+    db.commit()
+    db.close()
+
+    store = SnapshotStore(path)
+    store.record("alice", posts(post("alice-1", "edited")))
+    store.record("alice", posts(post("alice-1", "first")))
+
+    assert store.db.execute("PRAGMA user_version").fetchone()[0] == snapshotStore.LATEST_VERSION_DEDUPE
+    assert versions(store, "alice-1") == ["first", "edited", "first"]
+
+
+async def test_managers_record_what_they_fetch(manager, store):
+    manager.snapshot_store = store
+
+    await manager.session("bypass").fetch_profile_data_by_username("alice")
+
+    kind, username, data = store.db.execute("SELECT kind, username, data FROM snapshots").fetchone()
+    assert (kind, username) == ("profile", "alice")
+    assert json.loads(data)["headline"]
+
+
+def ndjson_rows(chunks) -> list[dict]:
+    return [json.loads(line) for line in gzip.decompress(b"".join(chunks)).splitlines()]
+
+
+def test_ndjson_export_flattens_the_snapshots(store):
+    store.record("alice", posts(post("alice-1", "hello"), reposts=(post("alice-2", "shared"),)))
+    store.record("bob", posts(post("bob-1", "hi")))
+
+    rows = ndjson_rows(export_chunks(store.iter_rows("posts", username="alice"), "posts", "ndjson"))
+
+    assert [(row["urn"], row["is_repost"], row["username"]) for row in rows] == [
+        ("alice-1", False, "alice"),
+        ("alice-2", True, "alice"),
+    ]
+    assert datetime.fromisoformat(rows[0]["captured_at"]) <= datetime.now(timezone.utc)
+
+
+def test_export_is_batched_and_bounded_by_capture_time(store, monkeypatch):
+    monkeypatch.setattr(snapshotStore, "EXPORT_BATCH_ROWS", 2)
+    store.record("alice", posts(*(post(f"alice-{index}", "hello") for index in range(5))))
+    store.record("alice", LikesOutput([LikeData(
+        text="liked", action="likes", postedDate="2025-01-05 08:00:00", totalReactionCount=1, commentsCount=0
+    )]))
+
+    batches = list(store.iter_rows("posts"))
+    later = list(store.iter_rows("posts", since=datetime.utcnow() + timedelta(minutes=1)))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert later == []
+    assert [row["action"] for row in ndjson_rows(export_chunks(store.iter_rows("likes"), "likes", "ndjson"))] == ["likes"]
+
+
+def test_parquet_export_round_trips(store):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    store.record("alice", ProfileOutput(headline="Engineer", location=None, job_title=None, company_name=None))
+
+    table = parquet.read_table(io.BytesIO(b"".join(export_chunks(store.iter_rows("profiles"), "profiles", "parquet"))))
+
+    assert table.column("headline").to_pylist() == ["Engineer"]
+
+
+def test_arrow_formats_need_pyarrow(monkeypatch):
+    monkeypatch.setattr(snapshotStore, "pyarrow", None)
+
+    assert resolve_export_format("auto") == "ndjson"
+    with pytest.raises(ValueError):
+        resolve_export_format("parquet")
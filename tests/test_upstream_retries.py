@@ -0,0 +1,85 @@
+import httpx
+import pytest
+
+from benchmarks.mock_upstream import create_app
+from src.linkedin_extractor.services.resilience import CircuitBreaker, RetryPolicy, UpstreamGuard, UpstreamUnavailableError
+
+pytestmark = pytest.mark.anyio
+
+
+class FailFirst:
+    """Answers the first ``failures`` requests with ``status``, then hands over to the mock upstream."""
+
+    def __init__(self, app, failures: int, status: int = 503):
+        self.app = app
+        self.failures = failures
+        self.status = status
+        self.state = app.state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.failures > 0:
+            self.failures -= 1
+            self.state.requests[scope["path"]] += 1
+            await send({"type": "http.response.start", "status": self.status, "headers": [(b"retry-after", b"0")]})
+            await send({"type": "http.response.body", "body": b"{}"})
+            return
+        await self.app(scope, receive, send)
+
+
+def use_upstream(manager, upstream):
+    manager.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream), base_url="http://mock-upstream")
+
+
+async def test_transient_errors_are_retried(manager):
+    upstream = FailFirst(create_app(latency=0), failures=2)
+    use_upstream(manager, upstream)
+    session = manager.session("bypass")
+
+    profile = await session.fetch_profile_data_by_username("alice")
+
+    assert profile.headline
+    assert upstream.state.requests["/"] == 3
+    assert session.get_credit_usage() == 3
+
+
+async def test_retries_stop_after_the_last_attempt(manager):
+    upstream = FailFirst(create_app(latency=0), failures=10)
+    use_upstream(manager, upstream)
+
+    with pytest.raises(UpstreamUnavailableError, match="HTTP 503"):
+        await manager.session("bypass").fetch_profile_data_by_username("alice")
+    assert upstream.state.requests["/"] == 3
+
+
+async def test_client_errors_are_not_retried(api, manager):
+    upstream = FailFirst(create_app(latency=0), failures=10, status=404)
+    use_upstream(manager, upstream)
+
+    response = await api.get("/extract-profile", params={"username": "alice"})
+
+    assert response.status_code == 404
+    assert response.json()["upstream_status"] == 404
+    assert upstream.state.requests["/"] == 1
+
+
+async def test_exhausted_retries_answer_502(api, manager):
+    use_upstream(manager, FailFirst(create_app(latency=0), failures=10))
+
+    for path in ("/extract-profile", "/extract-posts"):
+        response = await api.get(path, params={"username": "alice"})
+        assert response.status_code == 502
+        assert response.json() == {"detail": "API request failed: HTTP 503", "upstream_status": 503}
+
+
+async def test_open_circuit_answers_503_with_retry_after(api, manager):
+    use_upstream(manager, FailFirst(create_app(latency=0), failures=10))
+    manager.guard = UpstreamGuard(None, RetryPolicy(3, 0.01, 0.01), CircuitBreaker(2, 30))
+
+    first = await api.get("/extract-profile", params={"username": "alice"})
+    second = await api.get("/extract-profile", params={"username": "bob"})
+
+    # Two failures open the circuit during the first request's retries
+    for response in (first, second):
+        assert response.status_code == 503
+        assert 1 <= int(response.headers["Retry-After"]) <= 30
+        assert response.json()["detail"] == "API request failed: upstream circuit is open"